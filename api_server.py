@@ -0,0 +1,418 @@
+"""
+Local HTTP JSON API for Pathfinder data.
+
+Serves the core filter engine, scoring engine and search index with a fixed pool
+of worker threads. Two ways to run it:
+
+- Inside the app (PATHFINDER_API=1 streamlit run app.py): the server runs in the
+  Streamlit process. It reads the datasets from the core.datasets module cache,
+  which the app's loaders also read from, so the data files are loaded once.
+- On its own, for use without the app:
+
+    python api_server.py serve [--host HOST] [--port PORT] [--workers N]
+    python api_server.py loadtest [--url URL] [--requests N] [--concurrency N]
+
+  This process loads its own copy of the datasets through core.datasets.
+
+Endpoints:
+    GET  /health
+    GET  /filter?states=CA,NY&control_types=Public&adm_rate=0,0.5&limit=50&offset=0&fields=UNITID,INSTNM
+    POST /filter                 JSON body with the same filter spec as core.filters
+    GET  /institution/<unitid>
+    GET  /trend/<unitid>?columns=ADM_RATE,TUITIONFEE_IN
+    GET  /search?q=ucla&limit=10
+    POST /match                  JSON body with a core.scoring profile, plus optional "limit"
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+import numpy as np
+from config import (
+    API_HOST, API_PORT, API_WORKERS, API_DEFAULT_LIMIT, API_MAX_LIMIT,
+    API_RECORD_COLUMNS, API_MATCH_COLUMNS, FILTER_RANGE_COLUMNS, SEARCH_RESULT_LIMIT
+)
+from core.aggregations import institution_trend
+from core.datasets import default_datasets
+from core.filters import filter_mask
+from core.scoring import score
+from core.search import default_search_index, search_index
+
+class CoreDataSource:
+    """
+    Datasets and search index from the core library, for a server run on its own.
+    """
+    def datasets(self):
+        return default_datasets()
+
+    def search_index(self):
+        return default_search_index()
+
+class ApiError(Exception):
+    """
+    An error returned to the client as a JSON body with an HTTP status.
+    """
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+def to_records(df, columns):
+    """
+    Convert the given columns of df to JSON-ready dicts, with None for missing values.
+    """
+    df = df[[col for col in columns if col in df.columns]]
+    return df.astype(object).where(df.notna(), None).to_dict('records')
+
+def json_default(value):
+    """
+    Serialize numpy scalars and anything else json can't handle.
+    """
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+def parse_limit(params, default=API_DEFAULT_LIMIT):
+    """
+    Read a bounded limit parameter.
+    """
+    try:
+        limit = int(params.get('limit', default))
+    except (TypeError, ValueError):
+        raise ApiError(400, "limit must be an integer")
+    return max(0, min(limit, API_MAX_LIMIT))
+
+def parse_unitid(value):
+    """
+    Read a UNITID path segment.
+    """
+    try:
+        return int(value)
+    except ValueError:
+        raise ApiError(400, f"Invalid UNITID: {value}")
+
+def parse_filters(params):
+    """
+    Build a core.filters spec from query string parameters.
+    """
+    filters = {}
+    for key in ['states', 'control_types']:
+        if key in params:
+            filters[key] = [value for value in params[key].split(',') if value]
+    for key in FILTER_RANGE_COLUMNS:
+        if key in params:
+            try:
+                low, high = (float(value) for value in params[key].split(','))
+            except ValueError:
+                raise ApiError(400, f"{key} must be two numbers: low,high")
+            filters[key] = (low, high)
+    if 'test_policy' in params:
+        filters['test_policy'] = params['test_policy']
+    return filters
+
+def handle_health(source, params, body, *segments):
+    """
+    Report the loaded dataset version and size.
+    """
+    datasets = source.datasets()
+    return {
+        'status': 'ok',
+        'dataset_version': datasets['version'],
+        'institutions': len(datasets['institutions'])
+    }
+
+def handle_filter(source, params, body, *segments):
+    """
+    Return one page of institutions that pass the filters.
+    """
+    data = source.datasets()['institutions']
+    filters = body if body is not None else parse_filters(params)
+    try:
+        mask = filter_mask(data, filters)
+    except (TypeError, ValueError, IndexError) as e:
+        raise ApiError(400, f"Invalid filters: {e}")
+
+    limit = parse_limit(params)
+    try:
+        offset = max(0, int(params.get('offset', 0)))
+    except ValueError:
+        raise ApiError(400, "offset must be an integer")
+    fields = params['fields'].split(',') if 'fields' in params else API_RECORD_COLUMNS
+    rows = data[mask].iloc[offset:offset + limit]
+    return {
+        'count': int(mask.sum()),
+        'offset': offset,
+        'limit': limit,
+        'results': to_records(rows, fields)
+    }
+
+def handle_institution(source, params, body, unitid=None, *segments):
+    """
+    Return every loaded column for one institution.
+    """
+    if unitid is None:
+        raise ApiError(404, "Use /institution/<unitid>")
+    data = source.datasets()['institutions']
+    rows = data[data['UNITID'] == parse_unitid(unitid)]
+    if rows.empty:
+        raise ApiError(404, f"No institution with UNITID {unitid}")
+    return to_records(rows, [col for col in rows.columns if not col.endswith('_BIN')])[0]
+
+def handle_trend(source, params, body, unitid=None, *segments):
+    """
+    Return one institution's historical values by year.
+    """
+    if unitid is None:
+        raise ApiError(404, "Use /trend/<unitid>")
+    historical = source.datasets()['historical']
+    columns = params['columns'].split(',') if 'columns' in params else None
+    history = institution_trend(historical, parse_unitid(unitid), columns)
+    return {
+        'unitid': parse_unitid(unitid),
+        'years': to_records(history, list(history.columns))
+    }
+
+def handle_search(source, params, body, *segments):
+    """
+    Return fuzzy name search matches.
+    """
+    query = params.get('q', '')
+    matches = search_index(source.search_index(), query, parse_limit(params, SEARCH_RESULT_LIMIT))
+    return {
+        'query': query,
+        'results': [
+            {'UNITID': unitid, 'INSTNM': name, 'CITY': city, 'score': round(match_score, 4)}
+            for unitid, name, city, match_score in matches
+        ]
+    }
+
+def handle_match(source, params, body, *segments):
+    """
+    Return the best Find My Fit matches for a profile.
+    """
+    if body is None:
+        raise ApiError(405, "POST a JSON profile to /match")
+    profile = dict(body)
+    limit = parse_limit(profile, API_DEFAULT_LIMIT)
+    profile.pop('limit', None)
+    datasets = source.datasets()
+    try:
+        matches = score(profile, datasets['institutions'], datasets['fos'], limit=limit)
+    except (KeyError, TypeError, ValueError) as e:
+        raise ApiError(400, f"Invalid profile: {e}")
+    return {
+        'count': len(matches),
+        'results': to_records(matches, API_RECORD_COLUMNS + API_MATCH_COLUMNS)
+    }
+
+ROUTES = {
+    'health': handle_health,
+    'filter': handle_filter,
+    'institution': handle_institution,
+    'trend': handle_trend,
+    'search': handle_search,
+    'match': handle_match
+}
+
+class ApiRequestHandler(BaseHTTPRequestHandler):
+    """
+    Dispatches GET and POST requests to the route handlers.
+    """
+    server_version = "PathfinderAPI/1.0"
+
+    def do_GET(self):
+        self.dispatch(None)
+
+    def do_POST(self):
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            body = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            self.send_json(400, {'error': "Request body must be JSON"})
+            return
+        if not isinstance(body, dict):
+            self.send_json(400, {'error': "Request body must be a JSON object"})
+            return
+        self.dispatch(body)
+
+    def dispatch(self, body):
+        url = urlsplit(self.path)
+        segments = [segment for segment in url.path.split('/') if segment]
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        handler = ROUTES.get(segments[0]) if segments else None
+        if handler is None:
+            self.send_json(404, {'error': f"Unknown endpoint: {url.path}"})
+            return
+        try:
+            self.send_json(200, handler(self.server.source, params, body, *segments[1:]))
+        except ApiError as e:
+            self.send_json(e.status, {'error': e.message})
+        except Exception as e:
+            self.send_json(500, {'error': f"Internal error: {e}"})
+
+    def send_json(self, status, payload):
+        data = json.dumps(payload, default=json_default).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        # Keep load tests quiet; errors still go to stderr
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+class PooledHTTPServer(HTTPServer):
+    """
+    HTTP server that hands each connection to a fixed pool of worker threads.
+    """
+    def __init__(self, address, handler, workers=API_WORKERS, verbose=False, source=None):
+        # Created first: a failed bind calls server_close, which shuts the pool down
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="api-worker")
+        super().__init__(address, handler)
+        self.verbose = verbose
+        self.source = source or CoreDataSource()
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self.process_request_thread, request, client_address)
+
+    def process_request_thread(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown(wait=True)
+
+def create_server(host=API_HOST, port=API_PORT, workers=API_WORKERS, verbose=False, source=None):
+    """
+    Load the datasets and search index, then bind a server. Port 0 picks a free port.
+    source provides datasets() and search_index(); the core library's by default.
+    """
+    source = source or CoreDataSource()
+    source.datasets()
+    source.search_index()
+    return PooledHTTPServer((host, port), ApiRequestHandler, workers, verbose, source)
+
+def fetch(url, body=None):
+    """
+    Send one request and return (status, seconds).
+    """
+    data = json.dumps(body).encode('utf-8') if body is not None else None
+    request = urllib.request.Request(url, data=data, headers={'Content-Type': 'application/json'})
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=30) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except OSError:
+        status = 0
+    return status, time.perf_counter() - start
+
+def default_scenario(base_url):
+    """
+    A request mix covering every endpoint, using a UNITID the server knows.
+    """
+    with urllib.request.urlopen(f"{base_url}/filter?limit=1", timeout=30) as response:
+        unitid = json.loads(response.read())['results'][0]['UNITID']
+    return [
+        (f"{base_url}/filter?control_types=Public&adm_rate=0,0.6&limit=50", None),
+        (f"{base_url}/institution/{unitid}", None),
+        (f"{base_url}/trend/{unitid}?columns=ADM_RATE,TUITIONFEE_IN", None),
+        (f"{base_url}/search?q=state+university", None),
+        (f"{base_url}/match", {'test_score_type': 'SAT', 'sat_score': 1250, 'limit': 30})
+    ]
+
+def run_loadtest(base_url, n_requests, concurrency):
+    """
+    Send n_requests across the default scenario and return throughput and latency stats.
+    """
+    scenario = default_scenario(base_url)
+    jobs = [scenario[i % len(scenario)] for i in range(n_requests)]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda job: fetch(*job), jobs))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(seconds * 1000 for _, seconds in results)
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    return {
+        'requests': n_requests,
+        'concurrency': concurrency,
+        'errors': sum(1 for status, _ in results if status != 200),
+        'seconds': round(elapsed, 3),
+        'requests_per_second': round(n_requests / elapsed, 1),
+        'latency_ms': {
+            'mean': round(statistics.fmean(latencies), 2),
+            'p50': round(quantiles[49], 2),
+            'p95': round(quantiles[94], 2),
+            'p99': round(quantiles[98], 2)
+        }
+    }
+
+def main(argv=None):
+    """
+    Command line entry point.
+    """
+    parser = argparse.ArgumentParser(description="Pathfinder JSON API")
+    commands = parser.add_subparsers(dest='command')
+
+    serve = commands.add_parser('serve', help="Run the API server")
+    serve.add_argument('--host', default=API_HOST)
+    serve.add_argument('--port', type=int, default=API_PORT)
+    serve.add_argument('--workers', type=int, default=API_WORKERS)
+    serve.add_argument('--verbose', action='store_true', help="Log every request")
+
+    loadtest = commands.add_parser('loadtest', help="Measure requests per second")
+    loadtest.add_argument('--url', help="Base URL of a running server; starts one in-process if omitted")
+    loadtest.add_argument('--requests', type=int, default=500)
+    loadtest.add_argument('--concurrency', type=int, default=16)
+    loadtest.add_argument('--workers', type=int, default=API_WORKERS, help="Workers for the in-process server")
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'loadtest':
+        server = None
+        base_url = args.url
+        if base_url is None:
+            server = create_server(port=0, workers=args.workers)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            base_url = f"http://{server.server_address[0]}:{server.server_address[1]}"
+        try:
+            print(json.dumps(run_loadtest(base_url.rstrip('/'), args.requests, args.concurrency), indent=2))
+        finally:
+            if server is not None:
+                server.shutdown()
+                server.server_close()
+        return 0
+
+    host = getattr(args, 'host', API_HOST)
+    port = getattr(args, 'port', API_PORT)
+    server = create_server(host, port, getattr(args, 'workers', API_WORKERS), getattr(args, 'verbose', False))
+    print(f"Pathfinder API listening on http://{host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
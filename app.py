@@ -5,15 +5,23 @@ Pathfinder - A tool to help students explore and shortlist universities.
 import streamlit as st
 
 # Import configuration
-from config import COLUMNS_TO_LOAD, NUMERIC_COLUMNS
+from config import COLUMNS_TO_LOAD, NUMERIC_COLUMNS, API_IN_APP
 
 # Import data loading functions
 from data_loader import (
     load_institution_data,
     load_historical_data,
     load_field_of_study_data,
+    get_dataset_version,
+    start_api_server,
 )
 
+# Import the filter engine
+from core.filters import apply_filters
+
+# Import performance instrumentation
+from perf import start_rerun, finish_rerun, timed, display_perf_panel
+
 # Import utility functions
 from utils import (
     initialize_session_state,
@@ -21,7 +29,7 @@ from utils import (
 )
 
 # Import UI components
-from ui.sidebar import display_sidebar_filters
+from ui.sidebar import display_sidebar_filters, display_roi_assumptions
 from ui.explore import display_main_content
 from ui.details import display_university_details
 from ui.find_my_fit import display_find_my_fit
@@ -44,11 +52,25 @@ def main():
     # Initialize session state
     initialize_session_state()
 
+    # Collect timings for the debug panel when instrumentation is on
+    start_rerun()
+    try:
+        display_app()
+    finally:
+        summary = finish_rerun()
+    display_perf_panel(summary)
+
+def display_app():
+    """Loads the data and displays the active page."""
     # Load the data (using full dataset)
-    data = load_institution_data(COLUMNS_TO_LOAD, NUMERIC_COLUMNS)
+    data = load_institution_data(COLUMNS_TO_LOAD, NUMERIC_COLUMNS, get_dataset_version())
     historical_data = load_historical_data()
     fos_data = load_field_of_study_data()
 
+    # The optional JSON API reads the same core.datasets cache as these loaders
+    if API_IN_APP:
+        start_api_server()
+
     if not data.empty:
         # Check if we need to show university details
         if st.session_state.active_tab == "Details" and st.session_state.selected_university_id is not None:
@@ -75,53 +97,11 @@ def main():
         else:
             # Display sidebar filters and get selections
             filter_options = display_sidebar_filters(data)
+            display_roi_assumptions()
 
             # Apply Filters
-            filtered_data = data[
-                (data['STABBR'].isin(filter_options["states"])) &
-                (data['CONTROL_TYPE'].isin(filter_options["control_types"]))
-            ]
-
-            # Apply admission rate filter
-            if 'ADM_RATE' in filtered_data.columns and filtered_data['ADM_RATE'].notna().any():
-                filtered_data = filtered_data[
-                    (filtered_data['ADM_RATE'] >= filter_options["adm_rate"][0]) &
-                    (filtered_data['ADM_RATE'] <= filter_options["adm_rate"][1]) |
-                    (filtered_data['ADM_RATE'].isna())
-                ]
-
-            # Apply SAT score filter if available
-            if filter_options["sat"] is not None and 'SAT_AVG' in filtered_data.columns:
-                filtered_data = filtered_data[
-                    (filtered_data['SAT_AVG'] >= filter_options["sat"][0]) &
-                    (filtered_data['SAT_AVG'] <= filter_options["sat"][1]) |
-                    (filtered_data['SAT_AVG'].isna())
-                ]
-
-            # Apply tuition filter if available
-            if filter_options["tuition"] is not None and 'TUITIONFEE_IN' in filtered_data.columns:
-                filtered_data = filtered_data[
-                    (filtered_data['TUITIONFEE_IN'] >= filter_options["tuition"][0]) &
-                    (filtered_data['TUITIONFEE_IN'] <= filter_options["tuition"][1]) |
-                    (filtered_data['TUITIONFEE_IN'].isna())
-                ]
-
-            # Apply graduation rate filter if available
-            if filter_options["grad_rate"] is not None and 'C150_4' in filtered_data.columns:
-                filtered_data = filtered_data[
-                    (filtered_data['C150_4'] >= filter_options["grad_rate"][0]) &
-                    (filtered_data['C150_4'] <= filter_options["grad_rate"][1]) |
-                    (filtered_data['C150_4'].isna())
-                ]
-
-            # Apply test score policy filter if available
-            if filter_options["test_policy"] != "Any" and 'ADMCON7' in filtered_data.columns:
-                # Convert the selected policy to integer for comparison
-                selected_policy = int(filter_options["test_policy"])
-                filtered_data = filtered_data[
-                    (filtered_data['ADMCON7'] == selected_policy) |
-                    (filtered_data['ADMCON7'].isna())  # Include universities with missing data
-                ]
+            with timed("apply_filters", "filter"):
+                filtered_data = apply_filters(data, filter_options)
 
             # Display welcome header with emoji
             st.title("🎓 Pathfinder")
@@ -162,7 +142,8 @@ def main():
                     filtered_data,
                     data,
                     historical_data,
-                    fos_data
+                    fos_data,
+                    filter_options
                 )
 
             # Find My Fit Tab
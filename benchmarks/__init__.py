@@ -0,0 +1,8 @@
+"""
+Offline benchmark suite for Pathfinder.
+
+    python -m benchmarks run [--scenario PATTERN ...] [--repeat N] [--output results.json]
+    python -m benchmarks compare baseline.json results.json [--threshold 0.1]
+    python -m benchmarks sessions [--sessions N] [--iterations N] [--output sessions.json]
+    python -m benchmarks imports [--repeat N]
+"""
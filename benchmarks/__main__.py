@@ -0,0 +1,229 @@
+"""
+Command line runner for the Pathfinder benchmark suite.
+"""
+
+import argparse
+import fnmatch
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def time_scenario(run, reset, repeat, warmup):
+    """
+    Time run after warmup calls and measure its peak traced memory on one extra call.
+    """
+    for _ in range(warmup):
+        if reset:
+            reset()
+        run()
+
+    timings = []
+    for _ in range(repeat):
+        if reset:
+            reset()
+        start = time.perf_counter()
+        run()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    # Measure memory separately, since tracing slows the run down
+    if reset:
+        reset()
+    tracemalloc.start()
+    try:
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'repeat': repeat,
+        'min_ms': round(min(timings), 3),
+        'median_ms': round(statistics.median(timings), 3),
+        'mean_ms': round(statistics.fmean(timings), 3),
+        'max_ms': round(max(timings), 3),
+        'peak_kib': round(peak / 1024, 1)
+    }
+
+def run_benchmarks(args):
+    """
+    Run the selected scenarios and write the results as JSON.
+    """
+    # The data directory must be set before config is imported
+    if args.data_dir:
+        os.environ['PATHFINDER_DATA_DIR'] = args.data_dir
+    from benchmarks.scenarios import SCENARIOS, build_context
+
+    patterns = args.scenario or ['*']
+    names = [name for name in SCENARIOS if any(fnmatch.fnmatch(name, pattern) for pattern in patterns)]
+    if args.list:
+        print("\n".join(names))
+        return 0
+    if not names:
+        print(f"No scenarios match {patterns}", file=sys.stderr)
+        return 2
+
+    ctx = build_context(args.data_dir)
+    institutions = ctx['datasets']['institutions']
+    results = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'dataset_version': ctx['datasets']['version'],
+            'institution_rows': len(institutions)
+        },
+        'scenarios': {}
+    }
+
+    print(f"{'scenario':<36}{'median ms':>12}{'min ms':>12}{'peak KiB':>12}")
+    for name in names:
+        try:
+            run, reset = SCENARIOS[name](ctx)
+            stats = time_scenario(run, reset, args.repeat, args.warmup)
+        except Exception as e:
+            stats = {'error': f"{type(e).__name__}: {e}"}
+            print(f"{name:<36}  failed: {stats['error']}")
+        else:
+            print(f"{name:<36}{stats['median_ms']:>12.2f}{stats['min_ms']:>12.2f}{stats['peak_kib']:>12.1f}")
+        results['scenarios'][name] = stats
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Wrote {args.output}")
+    return 0
+
+def compare_results(args):
+    """
+    Compare two result files and flag scenarios that got slower or use more memory.
+    """
+    with open(args.baseline) as f:
+        baseline = json.load(f)['scenarios']
+    with open(args.current) as f:
+        current = json.load(f)['scenarios']
+
+    regressions = []
+    print(f"{'scenario':<36}{'base ms':>12}{'now ms':>12}{'change':>10}{'mem':>10}")
+    for name in sorted(set(baseline) & set(current)):
+        before, after = baseline[name], current[name]
+        if 'error' in before or 'error' in after:
+            print(f"{name:<36}  skipped (failed run)")
+            continue
+
+        time_change = after['median_ms'] / before['median_ms'] - 1 if before['median_ms'] else 0.0
+        mem_change = after['peak_kib'] / before['peak_kib'] - 1 if before['peak_kib'] else 0.0
+        slower = time_change > args.threshold and after['median_ms'] - before['median_ms'] > args.min_delta_ms
+        bigger = mem_change > args.memory_threshold
+        flag = "  REGRESSION" if slower or bigger else ""
+        if slower or bigger:
+            regressions.append(name)
+        print(f"{name:<36}{before['median_ms']:>12.2f}{after['median_ms']:>12.2f}"
+              f"{time_change:>+10.1%}{mem_change:>+10.1%}{flag}")
+
+    for name in sorted(set(baseline) ^ set(current)):
+        print(f"{name:<36}  only in {'baseline' if name in baseline else 'current'}")
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1
+    print("\nNo regressions")
+    return 0
+
+def run_sessions(args):
+    """
+    Load test the app with concurrent sessions against synthetic data.
+    """
+    # Never touch the real data: generate the synthetic set on first use
+    marker = os.path.join(args.data_dir, "Most-Recent-Cohorts-Institution.parquet")
+    if not os.path.exists(marker):
+        print(f"Generating synthetic data in {args.data_dir}")
+        subprocess.run([sys.executable, os.path.join(ROOT, "generate_synthetic_data.py"),
+                        "--output-dir", args.data_dir, "--scale", str(args.scale)], check=True)
+    os.environ['PATHFINDER_DATA_DIR'] = args.data_dir
+    from benchmarks.scenarios import APP_PATH
+    from benchmarks.sessions import run_load_test, print_report
+
+    report = run_load_test(APP_PATH, args.sessions, args.iterations, args.mode)
+    report['meta'] = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'data_dir': args.data_dir
+    }
+    print_report(report)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {args.output}")
+    return 1 if report['errors'] else 0
+
+def report_imports(args):
+    """
+    Report how long importing the app takes and what it loads.
+    """
+    from benchmarks.imports import import_report, print_report
+
+    report = import_report(ROOT, args.repeat, args.top)
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {args.output}")
+    return 0
+
+def main(argv=None):
+    """
+    Parse arguments and run a command.
+    """
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Pathfinder benchmarks")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help="Run benchmark scenarios")
+    run.add_argument('--scenario', action='append', help="Scenario name or glob, e.g. 'filter_*' (repeatable)")
+    run.add_argument('--repeat', type=int, default=5)
+    run.add_argument('--warmup', type=int, default=1)
+    run.add_argument('--data-dir', help="Directory with the parquet files (default: DATA_DIR)")
+    run.add_argument('--output', help="Write results to this JSON file")
+    run.add_argument('--list', action='store_true', help="List the matching scenarios and exit")
+
+    compare = commands.add_parser('compare', help="Flag regressions against a baseline")
+    compare.add_argument('baseline')
+    compare.add_argument('current')
+    compare.add_argument('--threshold', type=float, default=0.10, help="Allowed median slowdown (0.10 = 10%%)")
+    compare.add_argument('--memory-threshold', type=float, default=0.20, help="Allowed peak memory growth")
+    compare.add_argument('--min-delta-ms', type=float, default=1.0, help="Ignore slowdowns smaller than this")
+
+    sessions = commands.add_parser('sessions', help="Load test the app with concurrent user sessions")
+    sessions.add_argument('--sessions', type=int, default=8, help="Concurrent sessions")
+    sessions.add_argument('--iterations', type=int, default=2, help="Journeys per session")
+    sessions.add_argument('--mode', choices=['threads', 'processes'], default='threads',
+                          help="Share one process like a server, or run one process per session")
+    sessions.add_argument('--data-dir', default=os.path.join("data", "synthetic"),
+                          help="Synthetic data directory, generated if missing")
+    sessions.add_argument('--scale', type=float, default=1, help="Scale passed to the generator when generating")
+    sessions.add_argument('--output', help="Write the report to this JSON file")
+
+    imports = commands.add_parser('imports', help="Report app import time")
+    imports.add_argument('--repeat', type=int, default=5)
+    imports.add_argument('--top', type=int, default=15, help="Number of slowest modules to list")
+    imports.add_argument('--output', help="Write the report to this JSON file")
+
+    args = parser.parse_args(argv)
+    if args.command == 'run':
+        return run_benchmarks(args)
+    if args.command == 'sessions':
+        return run_sessions(args)
+    if args.command == 'imports':
+        return report_imports(args)
+    return compare_results(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
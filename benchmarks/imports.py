@@ -0,0 +1,82 @@
+"""
+Import-time report for the Pathfinder app.
+
+Imports app.py in fresh interpreters with -X importtime, the way a new pod starts
+cold, and reports the total time, the slowest modules and which heavy optional
+modules were loaded at startup rather than on first use.
+"""
+
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+# Modules that should only load once a chart or image export needs them
+DEFERRED_MODULES = ['plotly.express', 'kaleido', 'ui.visualizations.academic', 'ui.visualizations.cost',
+                    'ui.visualizations.outcomes', 'ui.visualizations.institution', 'ui.visualizations.diversity']
+
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+def import_times(root, target="app"):
+    """
+    Import target in a fresh interpreter and return {module: (self_us, cumulative_us, depth)}.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=root, capture_output=True, text=True, env={**os.environ, 'PYTHONDONTWRITEBYTECODE': '1'}
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    times = {}
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            times[module] = (int(self_us), int(cumulative_us), len(indent) // 2)
+    return times
+
+def import_report(root, repeat=5, top=15):
+    """
+    Import app.py repeat times and summarize total, per-module and deferred-module timings.
+    """
+    runs = [import_times(root) for _ in range(repeat)]
+    total_ms = [sum(self_us for self_us, _, _ in times.values()) / 1000 for times in runs]
+
+    # Self time summed per top-level package, e.g. all of plotly.* under plotly
+    packages = {}
+    for times in runs:
+        run_totals = {}
+        for module, (self_us, _, _) in times.items():
+            package = module.split('.')[0]
+            run_totals[package] = run_totals.get(package, 0) + self_us / 1000
+        for package, ms in run_totals.items():
+            packages.setdefault(package, []).append(ms)
+    slowest = sorted(
+        ((package, statistics.median(values)) for package, values in packages.items()),
+        key=lambda item: -item[1]
+    )[:top]
+
+    return {
+        'repeat': repeat,
+        'total_ms': {
+            'median': round(statistics.median(total_ms), 1),
+            'min': round(min(total_ms), 1),
+            'max': round(max(total_ms), 1)
+        },
+        'slowest_ms': {module: round(ms, 1) for module, ms in slowest},
+        'loaded_at_startup': [module for module in DEFERRED_MODULES if module in runs[0]]
+    }
+
+def print_report(report):
+    """
+    Print an import report as a table.
+    """
+    total = report['total_ms']
+    print(f"import app: median {total['median']} ms (min {total['min']}, max {total['max']}) over {report['repeat']} runs")
+    print(f"\n{'package':<40}{'ms':>14}")
+    for module, ms in report['slowest_ms'].items():
+        print(f"{module:<40}{ms:>14.1f}")
+    loaded = report['loaded_at_startup']
+    print(f"\nDeferred modules loaded at startup: {', '.join(loaded) if loaded else 'none'}")
@@ -0,0 +1,173 @@
+"""
+Named benchmark scenarios for Pathfinder.
+
+Each scenario is a setup function that receives the shared context and returns
+(run, reset): run is the timed callable and reset, if not None, runs untimed
+before each repetition (for example to clear Streamlit caches).
+"""
+
+import os
+from functools import partial
+import pandas as pd
+from core import datasets
+from core.export import export_bytes
+from core.filters import apply_filters
+from core.scoring import score
+
+SCENARIOS = {}
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+def scenario(name):
+    """
+    Register a setup function under a scenario name.
+    """
+    def register(setup):
+        SCENARIOS[name] = setup
+        return setup
+    return register
+
+def build_context(data_dir=None):
+    """
+    Load the datasets once for every scenario that needs them warm.
+    """
+    loaded = datasets.load_datasets(data_dir)
+    data = loaded['institutions']
+    has_ugds = data['UGDS'].notna() if 'UGDS' in data.columns else pd.Series(True, index=data.index)
+    return {
+        'data_dir': data_dir,
+        'datasets': loaded,
+        'median_unitid': int(data['UNITID'].iloc[len(data) // 2]),
+        'compare_unitids': [int(unitid) for unitid in data.loc[has_ugds, 'UNITID']]
+    }
+
+# Loading
+
+@scenario("load_cold")
+def setup_load_cold(ctx):
+    return partial(datasets.load_datasets, ctx['data_dir']), None
+
+@scenario("load_warm")
+def setup_load_warm(ctx):
+    datasets.default_datasets(ctx['data_dir'])
+    return partial(datasets.default_datasets, ctx['data_dir']), None
+
+# Sidebar filters, one dimension at a time and all together
+
+SIDEBAR_FILTERS = {
+    'states': ["CA", "NY", "TX", "FL", "MA", "PA", "IL", "OH"],
+    'control_types': ["Public", "Private nonprofit"],
+    'adm_rate': (0.1, 0.6),
+    'sat': (1000, 1400),
+    'tuition': (5000, 40000),
+    'grad_rate': (0.3, 0.9),
+    'test_policy': "1"
+}
+
+def setup_filter(filters, ctx):
+    return partial(apply_filters, ctx['datasets']['institutions'], filters), None
+
+for _key, _value in SIDEBAR_FILTERS.items():
+    scenario(f"filter_{_key}")(partial(setup_filter, {_key: _value}))
+scenario("filter_all")(partial(setup_filter, SIDEBAR_FILTERS))
+
+# Find My Fit, per selectivity preference
+
+FIND_MY_FIT_MODES = {
+    'all': "All",
+    'safety': "Safety Schools",
+    'target': "Target Schools",
+    'reach': "Reach Schools"
+}
+
+def setup_score(selectivity_pref, ctx):
+    profile = {
+        'test_score_type': "SAT",
+        'sat_score': 1250,
+        'family_income': "$48,001-$75,000",
+        'max_net_price': 30000,
+        'selectivity_pref': selectivity_pref
+    }
+    loaded = ctx['datasets']
+    return partial(score, profile, loaded['institutions'], loaded['fos']), None
+
+for _name, _mode in FIND_MY_FIT_MODES.items():
+    scenario(f"score_{_name}")(partial(setup_score, _mode))
+
+def quiet_streamlit():
+    """
+    Silence the warnings Streamlit logs when charts run outside a browser session.
+    """
+    from streamlit import config
+    from streamlit.logger import set_log_level
+    config.set_option("logger.level", "error")
+    set_log_level("error")
+
+# Charts, with their Streamlit caches cleared before each run
+
+CHARTS = [
+    'plot_selectivity_scatter', 'plot_sat_distribution', 'plot_tuition_distribution',
+    'plot_tuition_vs_size', 'plot_graduation_rate_histogram', 'plot_debt_earnings_scatter'
+]
+
+def setup_chart(chart_name, ctx):
+    quiet_streamlit()
+    import ui.visualizations as viz
+    chart = getattr(viz, chart_name)
+    return partial(chart, ctx['datasets']['institutions']), chart.clear
+
+for _chart in CHARTS:
+    scenario(f"chart_{_chart[len('plot_'):]}")(partial(setup_chart, _chart))
+
+# Full app runs: the details page and compare with N universities
+
+def clear_chart_caches():
+    """
+    Clear the cached visualization functions but keep the data caches warm.
+    """
+    import ui.visualizations as viz
+    for name in dir(viz):
+        if name.startswith('plot_'):
+            getattr(viz, name).clear()
+
+def setup_app(session_state, ctx):
+    quiet_streamlit()
+    from streamlit.testing.v1 import AppTest
+
+    def run():
+        app = AppTest.from_file(APP_PATH, default_timeout=600)
+        for key, value in session_state(ctx).items():
+            app.session_state[key] = value
+        app.run()
+        if app.exception:
+            raise RuntimeError(app.exception[0].message)
+
+    # Prime the data caches so only rendering is timed
+    run()
+    return run, clear_chart_caches
+
+@scenario("app_explore")
+def setup_app_explore(ctx):
+    return setup_app(lambda ctx: {}, ctx)
+
+@scenario("app_details")
+def setup_app_details(ctx):
+    return setup_app(lambda ctx: {
+        'active_tab': "Details",
+        'selected_university_id': ctx['median_unitid']
+    }, ctx)
+
+def compare_state(n, ctx):
+    unitids = ctx['compare_unitids'][:n]
+    return {'shortlisted_universities': list(unitids), 'selected_universities': list(unitids)}
+
+for _n in [2, 4, 8, 50]:
+    scenario(f"app_compare_{_n}")(partial(setup_app, partial(compare_state, _n)))
+
+# Exports
+
+def setup_export(fmt, ctx):
+    return partial(export_bytes, ctx['datasets']['institutions'], fmt), None
+
+for _fmt in ['CSV', 'Parquet']:
+    scenario(f"export_{_fmt.lower()}")(partial(setup_export, _fmt))
@@ -0,0 +1,253 @@
+"""
+Concurrent-session load test for the Pathfinder app.
+
+Runs N simulated user sessions at once through a scripted journey: open the app,
+apply filters, run Find My Fit, open a details page, add to the shortlist and
+compare. Each session is an AppTest instance, in one of two modes:
+- threads: all sessions share one process and its caches, like a Streamlit
+  server. AppTest swaps global runtime state on every run, so runs take turns
+  under a lock; with a CPU-bound script the GIL serializes a real server much the
+  same way. The time spent waiting for the lock is reported as queueing.
+- processes: one process per session, so runs overlap but nothing is shared.
+"""
+
+import gc
+import multiprocessing
+import os
+import pickle
+import resource
+import statistics
+import threading
+import time
+import numpy as np
+
+def find_button(app, label=None, key=None):
+    """
+    Return the first button whose label contains label, or whose key is key.
+    """
+    for button in app.button:
+        if (key is not None and button.key == key) or (label is not None and label in button.label):
+            return button
+    raise LookupError(f"No button {label or key!r} on the page")
+
+def rerun(app, session):
+    """
+    Run the script for a session, waiting for its turn when sessions share a process.
+    """
+    lock = session['lock']
+    start = time.perf_counter()
+    with lock:
+        session['wait_ms'] += (time.perf_counter() - start) * 1000
+        app.run()
+    if app.exception:
+        raise RuntimeError(app.exception[0].message)
+
+def step_open(app, session):
+    rerun(app, session)
+
+def step_filter(app, session):
+    # Narrow the admission rate range and submit the sidebar form
+    slider = next(slider for slider in app.slider if slider.label == "Admission Rate")
+    slider.set_value((0.1 + 0.05 * (session['index'] % 4), 0.8))
+    find_button(app, label="Apply Filters").click()
+    rerun(app, session)
+
+def step_find_my_fit(app, session):
+    find_button(app, label="Find My Matches").click()
+    rerun(app, session)
+    matches = app.session_state.find_my_fit_matches
+    if matches is None or len(matches['unitids']) == 0:
+        raise RuntimeError("Find My Fit returned no matches")
+    session['matches'] = [int(unitid) for unitid in matches['unitids']]
+
+def step_details(app, session):
+    app.session_state.active_tab = "Details"
+    app.session_state.selected_university_id = session['matches'][0]
+    rerun(app, session)
+
+def step_shortlist(app, session):
+    unitid = session['matches'][0]
+    find_button(app, key=f"add_shortlist_{unitid}").click()
+    rerun(app, session)
+
+def step_compare(app, session):
+    # Back to the tabs with two more matches shortlisted and selected for comparison
+    unitids = session['matches'][:3]
+    app.session_state.active_tab = "Explore"
+    app.session_state.selected_university_id = None
+    app.session_state.shortlisted_universities = list(unitids)
+    app.session_state.selected_universities = list(unitids)
+    rerun(app, session)
+
+JOURNEY = [
+    ('open', step_open),
+    ('filter', step_filter),
+    ('find_my_fit', step_find_my_fit),
+    ('details', step_details),
+    ('shortlist', step_shortlist),
+    ('compare', step_compare)
+]
+
+def session_state_bytes(app):
+    """
+    Approximate the memory a session holds by pickling its session state.
+    """
+    total = 0
+    for key in app.session_state:
+        try:
+            total += len(pickle.dumps(app.session_state[key]))
+        except Exception:
+            pass
+    return total
+
+def run_session(index, app_path, iterations, barrier, lock, warmup=False):
+    """
+    Run the journey iterations times in one session and return step timings and errors.
+    """
+    from streamlit.testing.v1 import AppTest
+
+    session = {'index': index, 'lock': lock, 'wait_ms': 0.0}
+    timings = []
+    errors = []
+    state_bytes = 0
+
+    for iteration in range(-1 if warmup else 0, iterations):
+        if iteration == 0:
+            barrier.wait()
+        app = AppTest.from_file(app_path, default_timeout=600)
+        for name, step in JOURNEY:
+            session['wait_ms'] = 0.0
+            start = time.perf_counter()
+            try:
+                step(app, session)
+            except Exception as e:
+                if iteration < 0:
+                    raise
+                errors.append({'step': name, 'error': f"{type(e).__name__}: {e}"})
+                break
+            finally:
+                if iteration >= 0:
+                    timings.append((name, (time.perf_counter() - start) * 1000, session['wait_ms']))
+        state_bytes = max(state_bytes, session_state_bytes(app))
+
+    return {'timings': timings, 'errors': errors, 'session_state_bytes': state_bytes, 'peak_rss_mib': max_rss_mib()}
+
+def _process_session(args):
+    from benchmarks.scenarios import quiet_streamlit
+    quiet_streamlit()
+    index, app_path, iterations, barrier = args
+    return run_session(index, app_path, iterations, barrier, threading.Lock(), warmup=True)
+
+def percentiles(values):
+    """
+    Return mean, p50, p95 and p99 of values in milliseconds.
+    """
+    values = np.asarray(values)
+    return {
+        'mean': round(float(values.mean()), 1),
+        'p50': round(float(np.percentile(values, 50)), 1),
+        'p95': round(float(np.percentile(values, 95)), 1),
+        'p99': round(float(np.percentile(values, 99)), 1)
+    }
+
+def max_rss_mib():
+    """
+    Peak resident memory of this process so far.
+    """
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if os.uname().sysname == "Darwin" else rss / 1024
+
+def run_load_test(app_path, n_sessions, iterations, mode='threads'):
+    """
+    Run n_sessions concurrent sessions and summarize latency, throughput and memory.
+    """
+    from benchmarks.scenarios import quiet_streamlit
+    quiet_streamlit()
+
+    if mode == 'threads':
+        # Warm the shared caches with one session so the test measures steady state
+        lock = threading.Lock()
+        run_session(-1, app_path, 0, None, lock, warmup=True)
+        gc.collect()
+        rss_before = max_rss_mib()
+
+        results = [None] * n_sessions
+        barrier = threading.Barrier(n_sessions + 1)
+
+        def worker(index):
+            results[index] = run_session(index, app_path, iterations, barrier, lock, warmup=False)
+
+        threads = [threading.Thread(target=worker, args=(i,), name=f"session-{i}") for i in range(n_sessions)]
+        for thread in threads:
+            thread.start()
+        barrier.wait()
+        start = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        memory = {
+            'peak_rss_mib': round(max_rss_mib(), 1),
+            'rss_growth_per_session_mib': round((max_rss_mib() - rss_before) / n_sessions, 2)
+        }
+    else:
+        # Each process warms its own caches before the barrier releases them together
+        context = multiprocessing.get_context('spawn')
+        with context.Manager() as manager, context.Pool(n_sessions) as pool:
+            barrier = manager.Barrier(n_sessions + 1)
+            pending = pool.map_async(_process_session, [(i, app_path, iterations, barrier) for i in range(n_sessions)])
+            barrier.wait()
+            start = time.perf_counter()
+            results = pending.get()
+            elapsed = time.perf_counter() - start
+        memory = {
+            'peak_rss_mib_per_session': round(statistics.fmean(result['peak_rss_mib'] for result in results), 1)
+        }
+
+    by_step = {}
+    waits = {}
+    for result in results:
+        for name, ms, wait_ms in result['timings']:
+            by_step.setdefault(name, []).append(ms)
+            waits.setdefault(name, []).append(wait_ms)
+    journeys = n_sessions * iterations
+    steps = sum(len(values) for values in by_step.values())
+    errors = [error for result in results for error in result['errors']]
+    memory['session_state_kib'] = round(statistics.fmean(result['session_state_bytes'] for result in results) / 1024, 1)
+
+    return {
+        'mode': mode,
+        'sessions': n_sessions,
+        'iterations': iterations,
+        'seconds': round(elapsed, 2),
+        'journeys_per_second': round((journeys - len(errors)) / elapsed, 3),
+        'steps_per_second': round(steps / elapsed, 2),
+        'errors': errors,
+        'latency_ms': {name: percentiles(values) for name, values in by_step.items()},
+        'queue_ms': {name: round(statistics.fmean(values), 1) for name, values in waits.items()},
+        'all_steps_ms': percentiles([ms for values in by_step.values() for ms in values]),
+        'memory': memory
+    }
+
+def print_report(report):
+    """
+    Print a load test report as a table.
+    """
+    print(f"{report['sessions']} sessions ({report['mode']}) x {report['iterations']} journeys in {report['seconds']}s: "
+          f"{report['journeys_per_second']} journeys/s, {report['steps_per_second']} steps/s, "
+          f"{len(report['errors'])} errors")
+    print(f"\n{'step':<16}{'mean':>10}{'p50':>10}{'p95':>10}{'p99':>10}{'queued':>10}  (ms)")
+    for name, stats in report['latency_ms'].items():
+        print(f"{name:<16}{stats['mean']:>10.1f}{stats['p50']:>10.1f}{stats['p95']:>10.1f}{stats['p99']:>10.1f}"
+              f"{report['queue_ms'][name]:>10.1f}")
+    stats = report['all_steps_ms']
+    print(f"{'all':<16}{stats['mean']:>10.1f}{stats['p50']:>10.1f}{stats['p95']:>10.1f}{stats['p99']:>10.1f}")
+
+    memory = report['memory']
+    if 'peak_rss_mib' in memory:
+        print(f"\nPeak RSS {memory['peak_rss_mib']} MiB, +{memory['rss_growth_per_session_mib']} MiB per session, ", end="")
+    else:
+        print(f"\nPeak RSS {memory['peak_rss_mib_per_session']} MiB per session process, ", end="")
+    print(f"{memory['session_state_kib']} KiB of session state per session")
+    for error in report['errors'][:5]:
+        print(f"  error in {error['step']}: {error['error']}")
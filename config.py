@@ -2,10 +2,17 @@
 Configuration settings for the University Scout application.
 """
 
+import os
+
 # Define file paths and patterns
-INSTITUTION_DATA_URL = "data/Most-Recent-Cohorts-Institution.parquet"
-HISTORICAL_DATA_PATTERN = "data/MERGED*.parquet"  # Pattern for historical cohort files
-FOS_DATA_PATTERN = "data/FieldOfStudyData*.parquet"  # Pattern for Field of Study files
+DATA_DIR = os.environ.get("PATHFINDER_DATA_DIR", "data")  # Override to point jobs at another data copy
+INSTITUTION_DATA_URL = os.path.join(DATA_DIR, "Most-Recent-Cohorts-Institution.parquet")
+HISTORICAL_DATA_PATTERN = os.path.join(DATA_DIR, "MERGED*.parquet")  # Pattern for historical cohort files
+FOS_DATA_PATTERN = os.path.join(DATA_DIR, "FieldOfStudyData*.parquet")  # Pattern for Field of Study files
+HISTORICAL_DATA_FILES = [
+    f"MERGED{year}_{(year + 1) % 100:02d}_PP.parquet" for year in range(2015, 2023)
+]  # Cohorts from 2015-16 onwards, relative to DATA_DIR
+FOS_DATA_FILE = "FieldOfStudyData1819_1920_PP.parquet"  # Most recent Field of Study file, relative to DATA_DIR
 
 # Define columns to load initially for main institution data
 COLUMNS_TO_LOAD = [
@@ -165,4 +172,162 @@ GENDER_MAPPING = {
     'IRPS_WOMEN': 'Female Staff'
 }
 
+# Server-side binning for histograms and distribution charts
+HISTOGRAM_BINS = 30  # Number of bins when edges are derived from the filtered data
+
+# Precompute fixed-edge histogram bins once per dataset version. Each row gets a bin
+# index at load time, so the counts for any filter are a bincount over the filtered rows.
+USE_PRECOMPUTED_BINS = True
+FIXED_BIN_EDGES = {
+    'C150_4': (0.0, 1.0, 30),  # (start, stop, number of bins)
+}
+
+# Large scatter plots switch to WebGL traces above the first threshold and to a
+# server-computed 2D density above the second
+SCATTER_WEBGL_THRESHOLD = 1000
+SCATTER_DENSITY_THRESHOLD = 5000
+SCATTER_DENSITY_BINS = 40  # Bins per axis for the density fallback
+
+# Batch widget changes into a single submit. Filters and Find My Fit inputs are collected
+# in the browser and sent together, so intermediate slider positions never cause a rerun.
+BATCH_FILTER_SUBMIT = True
+BATCH_FIND_MY_FIT_SUBMIT = True
+
+# Data exports are generated only when a download is requested and written in chunks
+EXPORT_FORMATS = {
+    'CSV': ('csv', 'text/csv'),
+    'Parquet': ('parquet', 'application/vnd.apache.parquet'),
+    'Arrow': ('arrow', 'application/vnd.apache.arrow.file')
+}
+EXPORT_CHUNK_ROWS = 5000  # Rows serialized per chunk
+
+# Explore table pagination. Only the visible page is sliced and sent to the browser.
+EXPLORE_PAGE_SIZES = [25, 50, 100, 250]
+EXPLORE_DEFAULT_PAGE_SIZE = 50
+
+# Institution name search
+SEARCH_RESULT_LIMIT = 10
+SEARCH_STOPWORDS = {'of', 'the', 'at', 'and', 'in', 'for'}  # Skipped when building acronyms
+
+# Derived columns computed once at load time
+TEST_POLICY_LABELS = {
+    1: "Required",
+    2: "Recommended",
+    3: "Neither Required nor Recommended",
+    4: "Unknown",
+    5: "Considered but not Required"
+}
+PERCENT_COLUMNS = ['ADM_RATE', 'C150_4']  # Each gets a <col>_PCT column on a 0-100 scale
+
+# Net price column prefixes by family income bracket. The loader combines the public and
+# private columns into one effective net price per bracket (<prefix>_EFF) and overall (NPT4_EFF).
+NET_PRICE_BRACKETS = {
+    '$0-$30,000': 'NPT41',
+    '$30,001-$48,000': 'NPT42',
+    '$48,001-$75,000': 'NPT43',
+    '$75,001-$110,000': 'NPT44',
+    '$110,001+': 'NPT45'
+}
+
+# Range filters in the core query API: filter key -> column. Rows with missing values pass.
+FILTER_RANGE_COLUMNS = {
+    'adm_rate': 'ADM_RATE',
+    'sat': 'SAT_AVG',
+    'tuition': 'TUITIONFEE_IN',
+    'grad_rate': 'C150_4'
+}
+
+# Find My Fit scoring
+MATCH_RESULT_LIMIT = 30  # Top matches returned by core.scoring.score
+
+# Return on investment (core/roi.py): earnings start at MD_EARN_WNE_P10 and grow by
+# salary_growth a year over horizon years, against the yearly cost paid for years years.
+# The sidebar edits these per session; Explore, Find My Fit and Details all use them.
+ROI_COST_BASES = {
+    'net_price': "Net price",
+    'in_state': "In-state tuition",
+    'out_of_state': "Out-of-state tuition"
+}
+ROI_DEFAULT_ASSUMPTIONS = {
+    'cost_basis': 'net_price',  # Key of ROI_COST_BASES
+    'family_income': None,  # Key of NET_PRICE_BRACKETS, or None for the all-students net price
+    'years': 4,  # Years of paying for the degree
+    'annual_aid': 0,  # Subtracted from the yearly cost; net price already includes grant aid
+    'salary_growth': 0.02,
+    'horizon': 10  # Years of earnings counted
+}
+
+# Monte Carlo ROI and debt repayment (core/simulation.py), on top of the ROI assumptions.
+# Every institution uses the same random draws (common random numbers), so its results do not
+# depend on which other institutions are simulated with it.
+SIMULATION_SCENARIOS = 4000
+SIMULATION_SEED = 2024
+SIMULATION_BATCH_SIZE = 1_000_000  # Institution x scenario cells per NumPy batch
+SIMULATION_PERCENTILES = [10, 50, 90]
+SIMULATION_PARAMS = {
+    'salary_growth_sd': 0.01,  # Spread of the yearly salary growth rate around the assumption
+    'salary_sigma': 0.35,  # Lognormal spread of starting salary around MD_EARN_WNE_P10
+    'debt_sigma': 0.4,  # Lognormal spread of debt around the median
+    'default_completion': 0.5,  # Completion chance where C150_4 is not reported
+    'noncompleter_earnings': 0.75,  # Non-completers' salary as a share of the median
+    'noncompleter_years': 0.5,  # Share of the degree's years non-completers pay for
+    'loan_rate': 0.055,  # Yearly interest on student debt
+    'repayment_share': 0.10,  # Share of salary paid toward debt each year
+    'max_repay_years': 30  # Longer repayments count as not repaid
+}
+
+# Pareto skyline (core/skyline.py): universities no other university beats on every chosen
+# criterion. Column -> (label, lower values are better).
+SKYLINE_CRITERIA = {
+    'NPT4_EFF': ("Net Price", True),
+    'C150_4': ("Graduation Rate", False),
+    'MD_EARN_WNE_P10': ("Median Earnings", False),
+    'DEBT_MDN': ("Median Debt", True),
+    'ADM_RATE': ("Admission Rate", False)  # Higher is better: easier to get in
+}
+SKYLINE_DEFAULT_CRITERIA = ['NPT4_EFF', 'C150_4', 'MD_EARN_WNE_P10', 'DEBT_MDN']
+SKYLINE_BLOCK_SIZE = 256  # Candidates checked per vectorized dominance test
+
+# Local HTTP JSON API (api_server.py)
+API_HOST = "127.0.0.1"
+API_PORT = 8502
+API_WORKERS = 8  # Requests handled concurrently by the worker pool
+API_IN_APP = os.environ.get("PATHFINDER_API", "") == "1"  # Start the API inside the Streamlit process
+API_DEFAULT_LIMIT = 50
+API_MAX_LIMIT = 1000
+API_RECORD_COLUMNS = [
+    'UNITID', 'INSTNM', 'CITY', 'STABBR', 'CONTROL_TYPE', 'ADM_RATE', 'SAT_AVG',
+    'TUITIONFEE_IN', 'TUITIONFEE_OUT', 'NPT4_EFF', 'C150_4', 'MD_EARN_WNE_P10', 'UGDS'
+]  # Columns returned for each institution in list responses
+API_MATCH_COLUMNS = [
+    'Match_Score', 'Academic_Match', 'Selectivity_Match', 'Preference_Match', 'Financial_Match',
+    'Location_Match', 'Major_Match', 'TestPolicy_Match'
+]  # Extra columns returned by /match
+
+# Comparison view. Up to COMPARE_CARD_LIMIT universities get side-by-side cards and one line
+# per university; larger selections default to a compact view with a ranked heatmap and table
+# and one trace per trend chart.
+COMPARE_CARD_LIMIT = 6
+COMPARE_METRICS = {
+    'ADM_RATE_PCT': ("Admission Rate (%)", True),  # column -> (label, lower values rank first)
+    'SAT_AVG': ("Average SAT", False),
+    'TUITIONFEE_IN': ("In-State Tuition ($)", True),
+    'NPT4_EFF': ("Net Price ($)", True),
+    'C150_4_PCT': ("Graduation Rate (%)", False),
+    'MD_EARN_WNE_P10': ("Median Earnings ($)", False),
+    'DEBT_MDN': ("Median Debt ($)", True),
+    'UGDS': ("Undergraduates", False)
+}
+
+# Shortlist persistence (shortlist_store.py): off unless PATHFINDER_SHORTLIST_DB names a local
+# SQLite file. Each browser is identified by an anonymous token in the URL.
+SHORTLIST_DB_PATH = os.environ.get("PATHFINDER_SHORTLIST_DB", "")
+SHORTLIST_TOKEN_PARAM = "shortlist"
+SHORTLIST_FLUSH_INTERVAL = 0.5  # Seconds to collect changes before one batched write
 
+# Performance instrumentation (perf.py): PATHFINDER_PERF=1 instruments every session,
+# PATHFINDER_PERF_URL=1 lets a session opt in with ?perf=1. Off otherwise.
+PERF_ENABLED = os.environ.get("PATHFINDER_PERF", "") == "1"
+PERF_URL_ENABLED = os.environ.get("PATHFINDER_PERF_URL", "") == "1"
+PERF_LOG_PATH = os.environ.get("PATHFINDER_PERF_LOG", "")  # JSON lines, one per rerun; unset to only show the panel
+PERF_LOG_MAX_BYTES = 5 * 1024 * 1024  # Rotated to PERF_LOG_PATH + ".1" past this size
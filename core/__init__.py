@@ -0,0 +1,29 @@
+"""
+Streamlit-free core library for Pathfinder.
+
+Scripts, notebooks and jobs can use it without starting the app:
+
+    from core import query, score
+    ids = query({"states": ["CA"], "adm_rate": (0.0, 0.3)})
+    matches = score({"test_score_type": "SAT", "sat_score": 1350})
+"""
+
+from core.datasets import (
+    load_institution_data,
+    load_historical_data,
+    load_field_of_study_data,
+    load_datasets,
+    default_datasets,
+    get_dataset_version,
+    add_derived_columns
+)
+
+from core.filters import filter_mask, apply_filters, query
+
+from core.scoring import filter_candidates, score_candidates, score, compact_matches, expand_matches
+
+from core.aggregations import group_means, top_groups, institution_trend, summarize
+
+from core.roi import compute_roi
+
+from core.idset import IdSet
@@ -0,0 +1,36 @@
+"""
+Aggregations over the Pathfinder datasets, shared by charts and the core API.
+"""
+
+import pandas as pd
+
+def group_means(data, by, columns):
+    """
+    Returns the mean of columns for each value of by, one row per group.
+    """
+    return data.groupby(by, observed=True)[columns].mean().reset_index()
+
+def top_groups(data, by, column, n=10):
+    """
+    Returns the n groups with the highest mean of column.
+    """
+    means = group_means(data.dropna(subset=[column, by]), by, column)
+    return means.sort_values(column, ascending=False).head(n)
+
+def institution_trend(historical_data, unitid, columns=None):
+    """
+    Returns one institution's historical rows sorted by YEAR.
+    """
+    if historical_data.empty:
+        return pd.DataFrame()
+    history = historical_data[historical_data['UNITID'] == unitid]
+    if columns is not None:
+        history = history[['YEAR'] + [col for col in columns if col in history.columns]]
+    return history.sort_values('YEAR')
+
+def summarize(data, columns):
+    """
+    Returns count, median, min and max for each column present in data.
+    """
+    columns = [col for col in columns if col in data.columns]
+    return data[columns].agg(['count', 'median', 'min', 'max']).T
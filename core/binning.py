@@ -0,0 +1,87 @@
+"""
+Server-side binning helpers for the Pathfinder application.
+
+Charts send bin edges and counts (or box statistics) to the browser instead of
+every filtered row, so the payload grows with the number of bins, not rows.
+"""
+
+import numpy as np
+from config import HISTOGRAM_BINS
+
+def fixed_bin_edges(start, stop, n_bins):
+    """
+    Return evenly spaced bin edges for a fixed (start, stop, n_bins) spec.
+    """
+    return np.linspace(start, stop, n_bins + 1)
+
+def assign_bins(values, edges):
+    """
+    Assign each value to a bin index. Missing or out-of-range values get -1.
+    """
+    values = np.asarray(values, dtype=float)
+    bin_idx = np.searchsorted(edges, values, side='right') - 1
+
+    # The last bin is closed on the right, like np.histogram
+    bin_idx[values == edges[-1]] = len(edges) - 2
+    bin_idx[np.isnan(values) | (values < edges[0]) | (values > edges[-1])] = -1
+
+    return bin_idx.astype(np.int16)
+
+def counts_from_bins(bin_idx, n_bins):
+    """
+    Count rows per bin from precomputed bin indices.
+    """
+    bin_idx = np.asarray(bin_idx)
+    bin_idx = bin_idx[bin_idx >= 0]
+    return np.bincount(bin_idx, minlength=n_bins)[:n_bins]
+
+def compute_histogram(values, bins=HISTOGRAM_BINS):
+    """
+    Bin values with NumPy and return (edges, counts), ignoring missing values.
+    """
+    values = np.asarray(values, dtype=float)
+    values = values[~np.isnan(values)]
+    if values.size == 0:
+        return np.array([]), np.array([], dtype=int)
+
+    counts, edges = np.histogram(values, bins=bins)
+    return edges, counts
+
+def compute_box_stats(values):
+    """
+    Compute the statistics Plotly needs to draw a box without the raw points.
+    Returns None when there are no values.
+    """
+    values = np.asarray(values, dtype=float)
+    values = values[~np.isnan(values)]
+    if values.size == 0:
+        return None
+
+    q1, median, q3 = np.percentile(values, [25, 50, 75])
+    iqr = q3 - q1
+
+    # Whiskers extend to the most extreme values within 1.5 IQR, as in Plotly
+    lower_fence = values[values >= q1 - 1.5 * iqr].min()
+    upper_fence = values[values <= q3 + 1.5 * iqr].max()
+
+    return {
+        'q1': q1,
+        'median': median,
+        'q3': q3,
+        'lowerfence': lower_fence,
+        'upperfence': upper_fence,
+        'mean': values.mean(),
+        'count': int(values.size)
+    }
+
+def compute_histogram_2d(x, y, bins):
+    """
+    Bin paired values into a 2D grid and return (x_edges, y_edges, counts).
+    Pairs with a missing value are ignored.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    valid = ~np.isnan(x) & ~np.isnan(y)
+
+    counts, x_edges, y_edges = np.histogram2d(x[valid], y[valid], bins=bins)
+    return x_edges, y_edges, counts
@@ -0,0 +1,71 @@
+"""
+Comparison data for a selection of institutions, for the Pathfinder core library.
+"""
+
+import numpy as np
+import pandas as pd
+from config import COMPARE_METRICS
+
+# Historical metrics that get a years x universities matrix
+TREND_METRICS = ['UGDS', 'TUITIONFEE_IN', 'ADM_RATE', 'SAT_AVG', 'C150_4']
+
+def _line_arrays(trend):
+    # Flatten a years x universities frame into one polyline: each university's reported
+    # years in order, followed by a NaN point that breaks the line before the next one
+    values = trend.to_numpy(dtype=float)
+    values = np.vstack([values, np.full((1, values.shape[1]), np.nan)])
+    x = np.tile(np.append(trend.index.to_numpy(dtype=float), np.nan), values.shape[1])
+    y = values.T.ravel()
+    positions = np.repeat(np.arange(values.shape[1]), values.shape[0])
+
+    # Drop unreported years so each line joins its reported points, but keep the breaks
+    keep = ~np.isnan(y) | np.isnan(x)
+    return x[keep], y[keep], positions[keep]
+
+class ComparisonPanel:
+    """
+    Everything the comparison view draws for one selection, built in one pass:
+    - table: the selected institutions' rows in selection order, indexed by UNITID
+    - trends: metric -> frame of YEAR rows by UNITID columns, NaN where not reported
+    - lines: metric -> (x, y, positions) arrays that draw every trend as one line trace;
+      positions index into unitids, and NaN points separate the universities
+    - metrics, ranks, scores: COMPARE_METRICS values, rank within the selection (1 = best)
+      and the same on a 0-1 scale (1 = best), NaN where not reported
+    - names: UNITID -> INSTNM
+    Panels are shared between sessions, so treat them as read-only.
+    """
+
+    def __init__(self, data, historical_data, unitids, trend_metrics=TREND_METRICS, metrics=COMPARE_METRICS):
+        positions = pd.Index(data['UNITID']).get_indexer([int(unitid) for unitid in unitids])
+        self.table = data.iloc[positions[positions >= 0]].set_index('UNITID', drop=False)
+        self.table.index.name = None
+        self.unitids = self.table['UNITID'].tolist()
+        self.names = dict(zip(self.unitids, self.table['INSTNM']))
+
+        # Filter the history once for the whole selection, then pivot each metric
+        self.trends = {}
+        if not historical_data.empty and self.unitids:
+            history = historical_data[historical_data['UNITID'].isin(self.unitids)]
+            for metric in trend_metrics:
+                if metric in history.columns:
+                    self.trends[metric] = history.pivot_table(
+                        index='YEAR', columns='UNITID', values=metric, aggfunc='mean'
+                    ).reindex(columns=self.unitids).sort_index()
+        self.lines = {metric: _line_arrays(trend) for metric, trend in self.trends.items()}
+
+        # Flip the sign of metrics where higher is better, so an ascending rank puts the best first
+        columns = [column for column in metrics if column in self.table.columns]
+        self.metrics = self.table[columns].astype(float)
+        signs = np.array([1.0 if metrics[column][1] else -1.0 for column in columns])
+        self.ranks = (self.metrics * signs).rank(method='min')
+        counts = self.metrics.count().clip(lower=2)
+        self.scores = 1 - (self.ranks - 1) / (counts - 1)
+
+    def __len__(self):
+        return len(self.unitids)
+
+    def trend(self, metric):
+        """
+        Returns the years x universities frame for metric, empty if there is no history.
+        """
+        return self.trends.get(metric, pd.DataFrame(columns=self.unitids))
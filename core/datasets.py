@@ -0,0 +1,221 @@
+"""
+Dataset loading and cleaning for the Pathfinder core library.
+
+Nothing here imports Streamlit: loaders raise on failure and callers decide how
+to report it. Paths default to DATA_DIR, which PATHFINDER_DATA_DIR overrides.
+"""
+
+import os
+import logging
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+from config import (
+    DATA_DIR, INSTITUTION_DATA_URL, HISTORICAL_DATA_FILES, FOS_DATA_FILE,
+    COLUMNS_TO_LOAD, NUMERIC_COLUMNS, STATE_NAMES, USE_PRECOMPUTED_BINS,
+    FIXED_BIN_EDGES, TEST_POLICY_LABELS, PERCENT_COLUMNS, NET_PRICE_BRACKETS
+)
+from core.binning import assign_bins, fixed_bin_edges
+
+logger = logging.getLogger(__name__)
+
+# Values the Scorecard uses for missing or suppressed data
+NULL_MARKERS = ['PrivacySuppressed', 'NULL']
+
+# Columns kept from each historical cohort file
+HISTORICAL_COLUMNS = [
+    'UNITID', 'INSTNM', 'STABBR', 'CONTROL',
+    'ADM_RATE', 'TUITIONFEE_IN', 'TUITIONFEE_OUT',
+    'SAT_AVG', 'ACTCMMID', 'C150_4', 'UGDS',
+    # Student debt information
+    'DEBT_MDN', 'GRAD_DEBT_MDN', 'WDRAW_DEBT_MDN',
+    'FEMALE_DEBT_MDN', 'MALE_DEBT_MDN',
+    'FIRSTGEN_DEBT_MDN', 'NOTFIRSTGEN_DEBT_MDN',
+    # Student diversity columns
+    'UGDS_WHITE', 'UGDS_BLACK', 'UGDS_HISP', 'UGDS_ASIAN',
+    'UGDS_AIAN', 'UGDS_NHPI', 'UGDS_2MOR', 'UGDS_NRA', 'UGDS_UNKN',
+    # Gender columns
+    'UGDS_MEN', 'UGDS_WOMEN'
+]
+HISTORICAL_NUMERIC_COLUMNS = [col for col in HISTORICAL_COLUMNS if col not in ('INSTNM', 'STABBR')]
+
+# Columns kept from the Field of Study file
+FOS_COLUMNS = ['UNITID', 'INSTNM', 'CIPCODE', 'CIPDESC', 'CREDLEV', 'CREDDESC', 'EARN_MDN_HI_1YR']
+FOS_NUMERIC_COLUMNS = ['EARN_MDN_HI_1YR']
+
+CONTROL_LABELS = {1: 'Public', 2: 'Private nonprofit', 3: 'Private for-profit'}
+
+def get_dataset_version(path=INSTITUTION_DATA_URL):
+    """
+    Returns a token that changes whenever the institution data file changes.
+    """
+    try:
+        stat = os.stat(path)
+        return f"{stat.st_mtime_ns}-{stat.st_size}"
+    except OSError:
+        return "missing"
+
+def clean_values(df, numeric_columns):
+    """
+    Replaces null markers with NaN and coerces the numeric columns.
+    """
+    df = df.replace(NULL_MARKERS, np.nan, regex=True)
+    for col in numeric_columns:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+    return df
+
+def add_derived_columns(df):
+    """
+    Adds columns derived from the raw data so views only read them.
+    """
+    # Readable test score policy labels
+    if 'ADMCON7' in df.columns:
+        labels = list(dict.fromkeys(TEST_POLICY_LABELS.values()))
+        df['TEST_POLICY'] = pd.Categorical(
+            df['ADMCON7'].map(TEST_POLICY_LABELS).fillna("Unknown"),
+            categories=labels
+        )
+
+    # Rates on a 0-100 scale for display
+    for col in PERCENT_COLUMNS:
+        if col in df.columns:
+            df[f"{col}_PCT"] = (df[col] * 100).astype(np.float32)
+
+    # Debt-to-earnings ratio, using DEBT_MDN if available, otherwise GRAD_DEBT_MDN
+    debt_col = 'DEBT_MDN' if 'DEBT_MDN' in df.columns else 'GRAD_DEBT_MDN'
+    if debt_col in df.columns and 'MD_EARN_WNE_P10' in df.columns:
+        df['DEBT_TO_EARNINGS'] = (df[debt_col] / df['MD_EARN_WNE_P10']).astype(np.float32)
+
+    # Effective net price overall and per income bracket: the public column for
+    # public institutions and the private column otherwise, falling back to the
+    # other one when only that is reported
+    if 'CONTROL' in df.columns:
+        is_public = (df['CONTROL'] == 1).to_numpy()
+        for prefix in ['NPT4'] + list(NET_PRICE_BRACKETS.values()):
+            pub_col, priv_col = f"{prefix}_PUB", f"{prefix}_PRIV"
+            if pub_col in df.columns and priv_col in df.columns:
+                public = df[pub_col].fillna(df[priv_col])
+                private = df[priv_col].fillna(df[pub_col])
+                df[f"{prefix}_EFF"] = np.where(is_public, public, private).astype(np.float32)
+
+    # Assign fixed-edge histogram bins
+    if USE_PRECOMPUTED_BINS:
+        for col, (start, stop, n_bins) in FIXED_BIN_EDGES.items():
+            if col in df.columns:
+                df[f"{col}_BIN"] = assign_bins(df[col], fixed_bin_edges(start, stop, n_bins))
+
+    return df
+
+def load_institution_data(columns_to_load=None, numeric_columns=None, path=None):
+    """
+    Loads the most recent institution-level data, selects specific columns, and cleans it.
+    Raises FileNotFoundError if the file is missing.
+    """
+    if columns_to_load is None:
+        columns_to_load = COLUMNS_TO_LOAD
+
+    if numeric_columns is None:
+        numeric_columns = NUMERIC_COLUMNS
+
+    df = pd.read_parquet(path or INSTITUTION_DATA_URL, columns=columns_to_load)
+    df = clean_values(df, numeric_columns)
+
+    # Basic cleaning: Drop rows where essential identifiers are missing
+    df.dropna(subset=['UNITID', 'INSTNM'], inplace=True)
+
+    # Map CONTROL codes to meaningful labels
+    if 'CONTROL' in df.columns:
+        df['CONTROL_TYPE'] = df['CONTROL'].map(CONTROL_LABELS).fillna('Unknown')
+
+    # Add full state names
+    if 'STABBR' in df.columns:
+        df['STATE_NAME'] = df['STABBR'].map(STATE_NAMES).fillna(df['STABBR'])
+
+    return add_derived_columns(df)
+
+def load_historical_data(data_dir=None, on_error=None):
+    """
+    Loads and concatenates the historical cohort files.
+    Files that fail to load are skipped and passed to on_error(path, error).
+    """
+    data_dir = data_dir or DATA_DIR
+    if on_error is None:
+        on_error = lambda path, error: logger.warning("Skipping historical file %s: %s", path, error)
+
+    all_dfs = []
+    for name in HISTORICAL_DATA_FILES:
+        path = os.path.join(data_dir, name)
+        try:
+            # Start year of the cohort, e.g. 2018 for MERGED2018_19
+            year = int(name.split('MERGED')[1][:4])
+
+            # Read only the columns we need, plus YEAR if the file has one
+            available = set(pq.read_schema(path).names)
+            columns = [col for col in HISTORICAL_COLUMNS + ['YEAR'] if col in available]
+            df = pd.read_parquet(path, columns=columns)
+
+            if 'YEAR' in df.columns:
+                df['YEAR'] = pd.to_numeric(df['YEAR'], errors='coerce')
+            else:
+                df['YEAR'] = year
+
+            all_dfs.append(clean_values(df, HISTORICAL_NUMERIC_COLUMNS))
+        except Exception as e:
+            on_error(path, e)
+
+    if not all_dfs:
+        return pd.DataFrame()
+
+    historical_data = pd.concat(all_dfs, ignore_index=True)
+    historical_data.dropna(subset=['UNITID', 'YEAR'], inplace=True)  # Need UNITID and YEAR
+    return historical_data
+
+def load_field_of_study_data(data_dir=None):
+    """
+    Loads the most recent Field of Study file.
+    Raises FileNotFoundError if the file is missing.
+    """
+    path = os.path.join(data_dir or DATA_DIR, FOS_DATA_FILE)
+
+    # Only read the columns the file actually has
+    available = set(pq.read_schema(path).names)
+    df = pd.read_parquet(path, columns=[col for col in FOS_COLUMNS if col in available])
+    df = clean_values(df, FOS_NUMERIC_COLUMNS)
+
+    df.dropna(subset=['UNITID', 'CIPCODE', 'CREDLEV'], inplace=True)
+    return df
+
+def load_datasets(data_dir=None):
+    """
+    Loads every dataset from data_dir into a dict keyed by name.
+    Missing historical or Field of Study files give empty frames.
+    """
+    data_dir = data_dir or DATA_DIR
+    institution_path = os.path.join(data_dir, os.path.basename(INSTITUTION_DATA_URL))
+
+    try:
+        fos = load_field_of_study_data(data_dir)
+    except FileNotFoundError as e:
+        logger.warning("Field of Study data not loaded: %s", e)
+        fos = pd.DataFrame()
+
+    return {
+        'institutions': load_institution_data(path=institution_path),
+        'historical': load_historical_data(data_dir),
+        'fos': fos,
+        'version': get_dataset_version(institution_path)
+    }
+
+@lru_cache(maxsize=1)
+def _cached_datasets(data_dir, version):
+    return load_datasets(data_dir)
+
+def default_datasets(data_dir=None):
+    """
+    Returns the datasets for data_dir, reloading them when the data file changes.
+    """
+    data_dir = data_dir or DATA_DIR
+    version = get_dataset_version(os.path.join(data_dir, os.path.basename(INSTITUTION_DATA_URL)))
+    return _cached_datasets(data_dir, version)
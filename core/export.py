@@ -0,0 +1,95 @@
+"""
+Data export helpers for the Pathfinder application.
+
+Nothing is serialized until a download is actually requested. The file is then
+built chunk by chunk, so only one chunk of rows is converted to text or Arrow at
+a time instead of the whole dataframe. Streamlit serves the finished file from
+memory, so the file itself is held in memory while it is downloaded.
+"""
+
+import io
+import pyarrow as pa
+import pyarrow.parquet as pq
+from config import EXPORT_FORMATS, EXPORT_CHUNK_ROWS
+
+def iter_chunks(df, chunk_rows=EXPORT_CHUNK_ROWS):
+    """
+    Yield consecutive row slices of the dataframe.
+    """
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+def _prepare_for_arrow(df):
+    """
+    Give every column a type Arrow can write. Leftover object columns become strings.
+    """
+    df = df.infer_objects()
+    object_cols = df.select_dtypes(include='object').columns
+    if len(object_cols) > 0:
+        df = df.astype({col: 'string' for col in object_cols})
+    return df
+
+def write_csv(df, out, chunk_rows=EXPORT_CHUNK_ROWS):
+    """
+    Write the dataframe to a binary file as CSV, one chunk at a time.
+    """
+    # Header only for an empty dataframe
+    if df.empty:
+        out.write(df.to_csv(index=False).encode('utf-8'))
+        return
+
+    for i, chunk in enumerate(iter_chunks(df, chunk_rows)):
+        out.write(chunk.to_csv(index=False, header=(i == 0)).encode('utf-8'))
+
+def write_parquet(df, out, chunk_rows=EXPORT_CHUNK_ROWS):
+    """
+    Write the dataframe to a binary file as Parquet, one row group per chunk.
+    """
+    df = _prepare_for_arrow(df)
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+
+    with pq.ParquetWriter(out, schema) as writer:
+        for chunk in iter_chunks(df, chunk_rows):
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+
+def write_arrow(df, out, chunk_rows=EXPORT_CHUNK_ROWS):
+    """
+    Write the dataframe to a binary file in the Arrow IPC file format, one batch per chunk.
+    """
+    df = _prepare_for_arrow(df)
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+
+    with pa.ipc.new_file(out, schema) as writer:
+        for chunk in iter_chunks(df, chunk_rows):
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+
+EXPORT_WRITERS = {
+    'CSV': write_csv,
+    'Parquet': write_parquet,
+    'Arrow': write_arrow
+}
+
+def export_dataframe(df, export_format='CSV'):
+    """
+    Export the dataframe in the given format and return a file object positioned at the start.
+    """
+    if export_format not in EXPORT_WRITERS:
+        raise ValueError(f"Unsupported export format: {export_format}")
+
+    out = io.BytesIO()
+    EXPORT_WRITERS[export_format](df, out)
+    out.seek(0)
+    return out
+
+def export_filename(file_stem, export_format):
+    """
+    Return the file name for an export, with the extension for its format.
+    """
+    extension, _ = EXPORT_FORMATS[export_format]
+    return f"{file_stem}.{extension}"
+
+def export_bytes(df, export_format='CSV'):
+    """
+    Export the dataframe and return the file contents as bytes.
+    """
+    return export_dataframe(df, export_format).getvalue()
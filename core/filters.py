@@ -0,0 +1,59 @@
+"""
+Filter engine for the Pathfinder core library.
+
+A filter spec is a plain dict, the same one the sidebar returns:
+    {
+        "states": ["CA", "NY"],          # STABBR values
+        "control_types": ["Public"],     # CONTROL_TYPE values
+        "adm_rate": (0.0, 0.5),          # any key of FILTER_RANGE_COLUMNS, inclusive bounds
+        "test_policy": "1",              # ADMCON7 code, or "Any"
+    }
+Missing keys (or None) leave that dimension unfiltered. Range and test policy
+filters keep rows where the value is missing, like the app always has.
+"""
+
+import numpy as np
+from config import FILTER_RANGE_COLUMNS
+from core.datasets import default_datasets
+
+def filter_mask(data, filters):
+    """
+    Returns a boolean array marking the rows of data that pass the filters.
+    """
+    mask = np.ones(len(data), dtype=bool)
+
+    # Category filters: an empty list matches nothing
+    if filters.get("states") is not None:
+        mask &= data['STABBR'].isin(filters["states"]).to_numpy()
+    if filters.get("control_types") is not None:
+        mask &= data['CONTROL_TYPE'].isin(filters["control_types"]).to_numpy()
+
+    # Inclusive ranges, keeping rows with missing values
+    for key, col in FILTER_RANGE_COLUMNS.items():
+        bounds = filters.get(key)
+        if bounds is not None and col in data.columns:
+            values = data[col]
+            mask &= (values.between(bounds[0], bounds[1]) | values.isna()).to_numpy()
+
+    # Test score policy, keeping rows with missing data
+    test_policy = filters.get("test_policy", "Any")
+    if test_policy not in (None, "Any") and 'ADMCON7' in data.columns:
+        policy = data['ADMCON7']
+        mask &= ((policy == int(test_policy)) | policy.isna()).to_numpy()
+
+    return mask
+
+def apply_filters(data, filters):
+    """
+    Returns the rows of data that pass the filters.
+    """
+    return data[filter_mask(data, filters)]
+
+def query(filters, data=None):
+    """
+    Returns the UNITIDs of the institutions that pass the filters.
+    Uses the default datasets when data is not given.
+    """
+    if data is None:
+        data = default_datasets()['institutions']
+    return data['UNITID'].to_numpy()[filter_mask(data, filters)]
@@ -0,0 +1,129 @@
+"""
+Ordered set of institution ids for the Pathfinder core library.
+
+Used for the shortlist and the comparison selection: membership, add and remove
+are O(1), iteration keeps insertion order, and bulk changes are one call.
+"""
+
+def _unitid(value):
+    return int(value)
+
+class IdSet:
+    """
+    Insertion-ordered set of UNITIDs, stored as ints.
+    on_change, if set, is called with the set after every call that changes it.
+    """
+    __slots__ = ('_ids', 'on_change')
+
+    def __init__(self, unitids=(), on_change=None):
+        self._ids = dict.fromkeys(_unitid(unitid) for unitid in unitids)
+        self.on_change = on_change
+
+    def __contains__(self, unitid):
+        try:
+            return _unitid(unitid) in self._ids
+        except (TypeError, ValueError):
+            return False
+
+    def __iter__(self):
+        return iter(self._ids)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __repr__(self):
+        return f"IdSet({list(self._ids)})"
+
+    def __getstate__(self):
+        return list(self._ids)
+
+    def __setstate__(self, state):
+        self._ids = dict.fromkeys(state)
+        self.on_change = None
+
+    def _changed(self, changed=True):
+        if changed and self.on_change is not None:
+            self.on_change(self)
+
+    def _add_all(self, unitids):
+        added = []
+        for unitid in map(_unitid, unitids):
+            if unitid not in self._ids:
+                self._ids[unitid] = None
+                added.append(unitid)
+        return added
+
+    def _remove_all(self, unitids):
+        # Values are all None, so pop returns None only for ids that were present
+        return [unitid for unitid in map(_unitid, unitids) if self._ids.pop(unitid, False) is None]
+
+    def add(self, unitid):
+        """
+        Appends unitid if it is not already in the set.
+        """
+        self._changed(bool(self._add_all([unitid])))
+
+    def discard(self, unitid):
+        """
+        Removes unitid if it is in the set.
+        """
+        self._changed(bool(self._remove_all([unitid])))
+
+    def toggle(self, unitid):
+        """
+        Adds unitid if it is missing, removes it otherwise. Returns whether it is now in the set.
+        """
+        unitid = _unitid(unitid)
+        if unitid in self._ids:
+            del self._ids[unitid]
+        else:
+            self._ids[unitid] = None
+        self._changed()
+        return unitid in self._ids
+
+    def update(self, unitids):
+        """
+        Appends every new id in unitids, in order. Returns the ids that were added.
+        """
+        added = self._add_all(unitids)
+        self._changed(bool(added))
+        return added
+
+    def difference_update(self, unitids):
+        """
+        Removes every id in unitids. Returns the ids that were removed.
+        """
+        removed = self._remove_all(unitids)
+        self._changed(bool(removed))
+        return removed
+
+    def diff(self, unitids):
+        """
+        Returns (added, removed): what changes turn this set into unitids.
+        """
+        target = IdSet(unitids)
+        return [unitid for unitid in target if unitid not in self._ids], [unitid for unitid in self if unitid not in target]
+
+    def apply(self, added=(), removed=()):
+        """
+        Removes then adds ids in one step, e.g. the result of diff. Returns (added, removed)
+        with only the ids that actually changed.
+        """
+        removed = self._remove_all(removed)
+        added = self._add_all(added)
+        self._changed(bool(added or removed))
+        return added, removed
+
+    def clear(self):
+        changed = bool(self._ids)
+        self._ids.clear()
+        self._changed(changed)
+
+    def copy(self):
+        """
+        Returns a copy of the ids, without on_change.
+        """
+        return IdSet(self._ids)
+
+    def to_list(self):
+        return list(self._ids)
@@ -0,0 +1,77 @@
+"""
+Return on investment for the Pathfinder core library.
+
+Every formula is closed form and works on whole columns, so ROI for the full dataset
+under new assumptions is a handful of array operations:
+
+    from core import load_institution_data, compute_roi
+    roi = compute_roi(load_institution_data(), {"cost_basis": "in_state", "salary_growth": 0.03})
+"""
+
+import numpy as np
+import pandas as pd
+from config import ROI_DEFAULT_ASSUMPTIONS
+from core.scoring import net_price_column
+
+# Cost basis -> yearly cost column; net price depends on the income bracket
+COST_COLUMNS = {
+    'in_state': 'TUITIONFEE_IN',
+    'out_of_state': 'TUITIONFEE_OUT'
+}
+
+ROI_COLUMNS = ['ROI_Cost', 'ROI_Earnings', 'ROI_Net', 'ROI_Pct', 'ROI_Rank']
+
+def resolve_assumptions(assumptions=None):
+    """
+    Returns ROI_DEFAULT_ASSUMPTIONS updated with assumptions.
+    """
+    return {**ROI_DEFAULT_ASSUMPTIONS, **(assumptions or {})}
+
+def cost_column(cost_basis, family_income=None):
+    """
+    Returns the yearly cost column for a cost basis.
+    """
+    if cost_basis == 'net_price':
+        return net_price_column(family_income) if family_income else 'NPT4_EFF'
+    return COST_COLUMNS[cost_basis]
+
+def growth_factor(salary_growth, horizon):
+    """
+    Returns the sum of (1 + salary_growth) ** year over horizon years: total earnings
+    per dollar of starting salary. salary_growth may be an array.
+    """
+    salary_growth = np.asarray(salary_growth, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        factor = ((1 + salary_growth) ** horizon - 1) / salary_growth
+    return np.where(salary_growth == 0, float(horizon), factor)
+
+def compute_roi(data, assumptions=None):
+    """
+    Returns a frame aligned to data with ROI_COLUMNS:
+    - ROI_Cost: total cost, (yearly cost - annual aid) * years, never below 0
+    - ROI_Earnings: total earnings over the horizon
+    - ROI_Net: earnings minus cost
+    - ROI_Pct: net return as a percentage of cost, NaN when the cost is 0
+    - ROI_Rank: rank by ROI_Pct within data, 1 = best
+    Rows missing the cost or earnings get NaN.
+    """
+    assumptions = resolve_assumptions(assumptions)
+    column = cost_column(assumptions['cost_basis'], assumptions['family_income'])
+
+    yearly_cost = data[column].to_numpy(dtype=float) if column in data.columns else np.full(len(data), np.nan)
+    cost = np.maximum(yearly_cost - assumptions['annual_aid'], 0) * assumptions['years']
+    earnings = data['MD_EARN_WNE_P10'].to_numpy(dtype=float) * growth_factor(
+        assumptions['salary_growth'], assumptions['horizon']
+    )
+    net = earnings - cost
+    with np.errstate(divide='ignore', invalid='ignore'):
+        roi = np.where(cost > 0, net / cost * 100, np.nan)
+
+    result = pd.DataFrame({
+        'ROI_Cost': cost,
+        'ROI_Earnings': earnings,
+        'ROI_Net': net,
+        'ROI_Pct': roi
+    }, index=data.index)
+    result['ROI_Rank'] = result['ROI_Pct'].rank(ascending=False, method='min')
+    return result
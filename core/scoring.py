@@ -0,0 +1,234 @@
+"""
+Find My Fit scoring engine for the Pathfinder core library.
+
+A profile is a plain dict with the Find My Fit form fields:
+    {
+        "test_score_type": "SAT",            # "SAT", "ACT" or "None"
+        "sat_score": 1200, "act_score": None,
+        "location_pref": ["California"],     # STATE_NAME values, empty for any
+        "institution_type": ["Public"],      # CONTROL_TYPE values, empty for any
+        "major_interest": "Any",             # CIPDESC value or "Any"
+        "family_income": "$48,001-$75,000",  # key of NET_PRICE_BRACKETS
+        "max_net_price": 30000,
+        "test_policy_pref": "Any",           # "Any", "Test Required" or "Test Optional/Flexible"
+        "selectivity_pref": "All",           # "All", "Safety Schools", "Target Schools" or "Reach Schools"
+    }
+Every component score is on a 0-100 scale, with 50 meaning no data.
+"""
+
+import numpy as np
+import pandas as pd
+from config import NET_PRICE_BRACKETS, MATCH_RESULT_LIMIT
+from core.datasets import default_datasets
+
+# Columns score adds to the institution data, stored by compact_matches
+SCORE_COLUMNS = [
+    'Academic_Match', 'Selectivity_Match', 'Location_Match', 'Major_Match',
+    'Financial_Match', 'TestPolicy_Match', 'Preference_Match', 'Match_Score'
+]
+
+PROFILE_DEFAULTS = {
+    "test_score_type": "None",
+    "sat_score": None,
+    "act_score": None,
+    "location_pref": [],
+    "institution_type": [],
+    "major_interest": "Any",
+    "family_income": "$48,001-$75,000",
+    "max_net_price": 30000,
+    "test_policy_pref": "Any",
+    "selectivity_pref": "All"
+}
+
+# ADMCON7 codes accepted by each test policy preference
+TEST_POLICY_CODES = {
+    "Test Required": [1],
+    "Test Optional/Flexible": [2, 3, 5]  # Recommended, neither, or considered but not required
+}
+
+def net_price_column(family_income):
+    """
+    Returns the effective net price column for a family income bracket.
+    """
+    return f"{NET_PRICE_BRACKETS.get(family_income, 'NPT43')}_EFF"  # Default to middle bracket
+
+def filter_candidates(data, profile):
+    """
+    Returns the rows of data that satisfy the hard constraints of the profile.
+    """
+    profile = {**PROFILE_DEFAULTS, **profile}
+    mask = np.ones(len(data), dtype=bool)
+
+    # Location and institution type
+    if profile["location_pref"]:
+        mask &= data['STATE_NAME'].isin(profile["location_pref"]).to_numpy()
+    if profile["institution_type"]:
+        mask &= data['CONTROL_TYPE'].isin(profile["institution_type"]).to_numpy()
+
+    # Test score policy
+    codes = TEST_POLICY_CODES.get(profile["test_policy_pref"])
+    if codes and 'ADMCON7' in data.columns:
+        mask &= data['ADMCON7'].isin(codes).to_numpy()
+
+    # Keep institutions under the maximum net price and those with missing data
+    net_price = data[net_price_column(profile["family_income"])]
+    mask &= ((net_price <= profile["max_net_price"]) | net_price.isna()).to_numpy()
+
+    return data[mask]
+
+def academic_match(diff, test_score_type, selectivity_pref):
+    """
+    Scores the gap between the student's test score and the institution's.
+    """
+    if test_score_type == "SAT":
+        if selectivity_pref == "Safety Schools":
+            raw = 50 + diff / 10  # Higher score = better match
+        elif selectivity_pref == "Target Schools":
+            raw = 100 - diff.abs() / 5  # Closer to average = better match
+        elif selectivity_pref == "Reach Schools":
+            raw = 100 - (diff + 100).abs() / 10  # Slightly below average = better match
+        else:
+            raw = 75 + diff / 20
+    else:
+        if selectivity_pref == "Safety Schools":
+            raw = 50 + diff * 10
+        elif selectivity_pref == "Target Schools":
+            raw = 100 - diff.abs() * 20
+        elif selectivity_pref == "Reach Schools":
+            raw = 100 - (diff + 2).abs() * 20
+        else:
+            raw = 75 + diff * 5
+    return raw.clip(0, 100).fillna(50)
+
+def selectivity_match(adm_rate, selectivity_pref):
+    """
+    Scores an admission rate against the selectivity preference.
+    """
+    if selectivity_pref == "Safety Schools":
+        raw = 50 + adm_rate * 100  # Higher admission rate is better
+    elif selectivity_pref == "Target Schools":
+        raw = 100 - (0.35 - adm_rate).abs() * 300  # Around 20-50% is ideal
+    elif selectivity_pref == "Reach Schools":
+        raw = 100 - adm_rate * 250  # Lower admission rate is better
+    else:
+        return pd.Series(75, index=adm_rate.index)  # Neutral but slightly positive
+    return raw.clip(0, 100).fillna(50)
+
+def score_candidates(candidates, profile, fos_data=None):
+    """
+    Adds the match component columns and Match_Score to a copy of candidates.
+    """
+    profile = {**PROFILE_DEFAULTS, **profile}
+    scored = candidates.copy()
+    neutral = pd.Series(50.0, index=scored.index)
+
+    # Academic match based on test scores
+    test_score_type = profile["test_score_type"]
+    selectivity_pref = profile["selectivity_pref"]
+    scored['Academic_Match'] = neutral
+    if test_score_type == "SAT" and profile["sat_score"] is not None and 'SAT_AVG' in scored.columns:
+        scored['Score_Diff'] = profile["sat_score"] - scored['SAT_AVG']
+        scored['Academic_Match'] = academic_match(scored['Score_Diff'], "SAT", selectivity_pref)
+    elif test_score_type == "ACT" and profile["act_score"] is not None and 'ACTCMMID' in scored.columns:
+        scored['Score_Diff'] = profile["act_score"] - scored['ACTCMMID']
+        scored['Academic_Match'] = academic_match(scored['Score_Diff'], "ACT", selectivity_pref)
+
+    # Selectivity match based on admission rates
+    if 'ADM_RATE' in scored.columns:
+        scored['Selectivity_Match'] = selectivity_match(scored['ADM_RATE'], selectivity_pref)
+    else:
+        scored['Selectivity_Match'] = neutral
+
+    # Location match
+    if profile["location_pref"]:
+        scored['Location_Match'] = np.where(scored['STATE_NAME'].isin(profile["location_pref"]), 100, 0)
+    else:
+        scored['Location_Match'] = 75  # All locations match equally
+
+    # Major match, with some points even if the major isn't offered
+    major_interest = profile["major_interest"]
+    if major_interest != "Any" and fos_data is not None and not fos_data.empty:
+        major_unis = fos_data.loc[fos_data['CIPDESC'] == major_interest, 'UNITID'].unique()
+        scored['Major_Match'] = np.where(scored['UNITID'].isin(major_unis), 100, 25)
+    else:
+        scored['Major_Match'] = 75
+
+    # Financial match: higher score for lower net price, neutral if there is no data
+    max_net_price = profile["max_net_price"]
+    net_price = scored[net_price_column(profile["family_income"])]
+    scored['Financial_Match'] = np.select(
+        [
+            net_price <= max_net_price * 0.5,  # Excellent match if well under budget
+            net_price <= max_net_price,  # Good match if under budget
+            net_price <= max_net_price * 1.25,  # Neutral if slightly over budget
+            net_price.notna()  # Poor match if well over budget
+        ],
+        [100, 75, 50, 25],
+        default=50
+    )
+
+    # Test score policy match
+    if 'ADMCON7' in scored.columns:
+        policy = scored['ADMCON7']
+        codes = TEST_POLICY_CODES.get(profile["test_policy_pref"])
+        if profile["test_policy_pref"] == "Any":
+            policy_match = np.where(policy.isna(), 50, 75)
+        else:
+            policy_match = np.select([policy.isna(), policy.isin(codes or [])], [50, 100], default=25)
+        scored['TestPolicy_Match'] = policy_match
+    else:
+        scored['TestPolicy_Match'] = 50
+
+    # Overall preference match is the average of location, major, financial, and test policy
+    scored['Preference_Match'] = (
+        scored['Location_Match'] +
+        scored['Major_Match'] +
+        scored['Financial_Match'] +
+        scored['TestPolicy_Match']
+    ) / 4
+
+    # Academic and selectivity are weighted more heavily for better matching
+    scored['Match_Score'] = (
+        scored['Academic_Match'] * 0.35 +  # 35% weight
+        scored['Selectivity_Match'] * 0.25 +  # 25% weight
+        scored['Preference_Match'] * 0.4  # 40% weight
+    ).round(0)
+
+    return scored
+
+def score(profile, data=None, fos_data=None, limit=MATCH_RESULT_LIMIT):
+    """
+    Returns the best matches for a student profile, highest Match_Score first.
+    Uses the default datasets when data is not given.
+    """
+    if data is None:
+        datasets = default_datasets()
+        data = datasets['institutions']
+        if fos_data is None:
+            fos_data = datasets['fos']
+
+    scored = score_candidates(filter_candidates(data, profile), profile, fos_data)
+    return scored.sort_values('Match_Score', ascending=False, kind='stable').head(limit)
+
+def compact_matches(matches, profile=None):
+    """
+    Returns matches as a UNITID array and a float32 score matrix plus the profile,
+    a few KB instead of a full-width copy of the institution rows.
+    """
+    return {
+        'unitids': matches['UNITID'].to_numpy(dtype=np.int32),
+        'scores': matches[SCORE_COLUMNS].to_numpy(dtype=np.float32),
+        'profile': dict(profile or {})
+    }
+
+def expand_matches(compact, data):
+    """
+    Rebuilds the matches frame from compact matches and the institution data, in match order.
+    Matches whose UNITID is no longer in data are dropped.
+    """
+    positions = pd.Index(data['UNITID']).get_indexer(compact['unitids'])
+    found = positions >= 0
+    matches = data.iloc[positions[found]].copy()
+    for col, values in zip(SCORE_COLUMNS, compact['scores'][found].T):
+        matches[col] = values
+    return matches
@@ -0,0 +1,166 @@
+"""
+Fuzzy institution search for the Pathfinder application.
+
+The index combines three lookups over INSTNM and CITY:
+- trigram postings for typo-tolerant similarity on the name
+- a sorted token vocabulary for prefix matches as the user types
+- name acronyms, so "UCLA" or "U of M" find the right school
+"""
+
+import re
+from bisect import bisect_left
+from functools import lru_cache
+import numpy as np
+from config import SEARCH_STOPWORDS, SEARCH_RESULT_LIMIT
+from core.datasets import default_datasets
+
+def normalize_text(text):
+    """
+    Lowercase text and replace punctuation with spaces.
+    """
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", str(text).lower()).split())
+
+def trigrams(text):
+    """
+    Return the set of character trigrams of a normalized string, padded at word edges.
+    """
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def acronym(tokens):
+    """
+    Build an acronym from the first letters of the significant tokens.
+    """
+    return "".join(token[0] for token in tokens if token not in SEARCH_STOPWORDS)
+
+def build_search_index(unitids, names, cities):
+    """
+    Build a search index over institution names and cities.
+    """
+    unitids = np.asarray(unitids)
+    names = [str(name) for name in names]
+    cities = [city if isinstance(city, str) else "" for city in cities]
+    normalized_names = [normalize_text(name) for name in names]
+    normalized_cities = [normalize_text(city) for city in cities]
+
+    trigram_rows = {}
+    token_rows = {}
+    trigram_counts = np.zeros(len(normalized_names), dtype=np.int32)
+    acronyms = []
+
+    for row, (name, city) in enumerate(zip(normalized_names, normalized_cities)):
+        # Trigram postings on the name
+        name_trigrams = trigrams(name)
+        trigram_counts[row] = len(name_trigrams)
+        for trigram in name_trigrams:
+            trigram_rows.setdefault(trigram, []).append(row)
+
+        # Token postings on the name and city
+        name_tokens = name.split()
+        for token in set(name_tokens + city.split()):
+            token_rows.setdefault(token, []).append(row)
+
+        acronyms.append((acronym(name_tokens), row))
+
+    # Store postings as compact arrays
+    trigram_rows = {key: np.array(rows, dtype=np.int32) for key, rows in trigram_rows.items()}
+    token_rows = {key: np.array(rows, dtype=np.int32) for key, rows in token_rows.items()}
+    acronyms.sort()
+
+    return {
+        'unitids': unitids,
+        'names': names,
+        'cities': cities,
+        'trigram_rows': trigram_rows,
+        'trigram_counts': trigram_counts,
+        'vocab': sorted(token_rows),
+        'token_rows': token_rows,
+        'acronym_keys': [key for key, _ in acronyms],
+        'acronym_rows': np.array([row for _, row in acronyms], dtype=np.int32)
+    }
+
+def index_institutions(data):
+    """
+    Build a search index over an institution DataFrame.
+    """
+    cities = data['CITY'] if 'CITY' in data.columns else [""] * len(data)
+    return build_search_index(data['UNITID'].to_numpy(), data['INSTNM'], cities)
+
+@lru_cache(maxsize=1)
+def _cached_index(version):
+    return index_institutions(default_datasets()['institutions'])
+
+def default_search_index():
+    """
+    Return the search index over the default datasets, rebuilt when they change.
+    """
+    return _cached_index(default_datasets()['version'])
+
+def prefix_range(sorted_keys, prefix):
+    """
+    Return the (start, stop) slice of sorted_keys that starts with prefix.
+    """
+    start = bisect_left(sorted_keys, prefix)
+    stop = bisect_left(sorted_keys, prefix + "\uffff", lo=start)
+    return start, stop
+
+def search_index(index, query, limit=SEARCH_RESULT_LIMIT):
+    """
+    Return up to limit (unitid, name, city, score) matches for the query, best first.
+    """
+    query = normalize_text(query)
+    n_rows = len(index['names'])
+    if not query or n_rows == 0:
+        return []
+
+    tokens = query.split()
+    significant = [token for token in tokens if token not in SEARCH_STOPWORDS]
+
+    # Trigram similarity (Jaccard) between the query and each name
+    query_trigrams = [t for t in trigrams(query) if t in index['trigram_rows']]
+    if query_trigrams:
+        shared = np.bincount(
+            np.concatenate([index['trigram_rows'][t] for t in query_trigrams]),
+            minlength=n_rows
+        )
+    else:
+        shared = np.zeros(n_rows, dtype=np.int64)
+    union = len(trigrams(query)) + index['trigram_counts'] - shared
+    scores = 0.6 * shared / np.maximum(union, 1)
+
+    # Fraction of significant query tokens that prefix a word in the name or city.
+    # Single letters match too much of the vocabulary and are left to the acronyms.
+    vocab = index['vocab']
+    for token in significant:
+        if len(token) < 2:
+            continue
+        start, stop = prefix_range(vocab, token)
+        if start < stop:
+            rows = np.unique(np.concatenate([index['token_rows'][key] for key in vocab[start:stop]]))
+            scores[rows] += 0.4 / len(significant)
+
+    # Acronym matches: "ucla" as one token, or initials such as "u of m"
+    if len(significant) == 1 and len(significant[0]) >= 2:
+        query_acronym = significant[0]
+    elif significant and all(len(token) == 1 for token in significant):
+        query_acronym = "".join(significant)
+    else:
+        query_acronym = None
+
+    if query_acronym:
+        start, stop = prefix_range(index['acronym_keys'], query_acronym)
+        rows = index['acronym_rows'][start:stop]
+        exact = np.array([index['acronym_keys'][i] == query_acronym for i in range(start, stop)], dtype=bool)
+        scores[rows[exact]] += 0.6
+        scores[rows[~exact]] += 0.3
+
+    # Pick the best rows without sorting everything
+    candidates = np.flatnonzero(scores > 0)
+    if candidates.size > limit:
+        candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+    candidates = candidates[np.argsort(-scores[candidates], kind='stable')]
+
+    return [
+        (index['unitids'][row], index['names'][row], index['cities'][row], float(scores[row]))
+        for row in candidates
+    ]
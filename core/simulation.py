@@ -0,0 +1,128 @@
+"""
+Monte Carlo ROI and debt repayment for the Pathfinder core library.
+
+Each scenario draws whether the student completes (from C150_4), their starting salary,
+their salary growth and their debt (GRAD_DEBT_MDN or WDRAW_DEBT_MDN, falling back to
+DEBT_MDN). Scenarios run as institutions x scenarios NumPy arrays, in batches of
+SIMULATION_BATCH_SIZE cells, and are summarized as percentile bands:
+
+    from core import load_institution_data
+    from core.simulation import simulate_roi
+    bands = simulate_roi(load_institution_data().head(50), {"salary_growth": 0.03})
+"""
+
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+from config import (
+    SIMULATION_SCENARIOS, SIMULATION_SEED, SIMULATION_BATCH_SIZE,
+    SIMULATION_PERCENTILES, SIMULATION_PARAMS
+)
+from core.roi import resolve_assumptions, cost_column, growth_factor
+
+@lru_cache(maxsize=8)
+def _draws(n_scenarios, seed):
+    # One draw per scenario, shared by every institution. Read-only once cached.
+    rng = np.random.default_rng(seed)
+    draws = {name: rng.standard_normal(n_scenarios) for name in ('growth', 'salary', 'debt')}
+    draws['complete'] = rng.random(n_scenarios)
+    for values in draws.values():
+        values.flags.writeable = False
+    return draws
+
+def _column(data, column, fallback=None):
+    # Float values of column, NaNs filled from fallback's column, all NaN if missing
+    values = data[column].to_numpy(dtype=float) if column in data.columns else np.full(len(data), np.nan)
+    if fallback is not None:
+        values = np.where(np.isnan(values), _column(data, fallback), values)
+    return values
+
+def years_to_repay(debt, payment, loan_rate, payment_growth, max_years):
+    """
+    Returns the years until debt is repaid by yearly payments that start at payment and
+    grow by payment_growth, with interest at loan_rate. inf when not repaid within max_years.
+
+    Solves debt = payment * (1 - x ** n) / (loan_rate - payment_growth) for n, the present
+    value of a growing annuity, with x = (1 + payment_growth) / (1 + loan_rate).
+    """
+    debt, payment, payment_growth = np.broadcast_arrays(
+        np.asarray(debt, dtype=float), np.asarray(payment, dtype=float), np.asarray(payment_growth, dtype=float)
+    )
+    spread = loan_rate - payment_growth
+    with np.errstate(divide='ignore', invalid='ignore'):
+        remaining = 1 - debt * spread / payment
+        years = np.log(remaining) / np.log((1 + payment_growth) / (1 + loan_rate))
+        # Payments growing as fast as interest repay debt * (1 + rate) / payment years
+        years = np.where(np.isclose(spread, 0), debt * (1 + loan_rate) / payment, years)
+    # remaining <= 0: payments never catch up with interest
+    years = np.where(~np.isclose(spread, 0) & (remaining <= 0), np.inf, years)
+    years = np.where(debt <= 0, 0.0, years)
+    return np.where(years > max_years, np.inf, years)
+
+def simulate_roi(data, assumptions=None, n_scenarios=SIMULATION_SCENARIOS, seed=SIMULATION_SEED,
+                 params=None, percentiles=SIMULATION_PERCENTILES, batch_size=SIMULATION_BATCH_SIZE):
+    """
+    Returns a frame indexed by UNITID with, for each p in percentiles:
+    - Net_P<p>: net return (earnings over the horizon minus cost)
+    - Repay_P<p>: years to repay debt, inf when not repaid within max_repay_years
+    and Net_Mean, Repaid_Share (share of scenarios that repay) and Completion (the
+    completion chance used). Cost, horizon and salary growth come from the ROI assumptions.
+    """
+    assumptions = resolve_assumptions(assumptions)
+    params = {**SIMULATION_PARAMS, **(params or {})}
+    draws = _draws(n_scenarios, seed)
+
+    # Per-institution inputs, as (k, 1) columns to broadcast against scenarios
+    yearly_cost = np.maximum(
+        _column(data, cost_column(assumptions['cost_basis'], assumptions['family_income'])) - assumptions['annual_aid'], 0
+    )[:, None]
+    earnings = _column(data, 'MD_EARN_WNE_P10')[:, None]
+    completion = np.nan_to_num(_column(data, 'C150_4'), nan=params['default_completion'])
+    grad_debt = _column(data, 'GRAD_DEBT_MDN', 'DEBT_MDN')[:, None]
+    withdraw_debt = _column(data, 'WDRAW_DEBT_MDN', 'DEBT_MDN')[:, None]
+
+    # Per-scenario draws shared by every institution
+    growth = assumptions['salary_growth'] + params['salary_growth_sd'] * draws['growth']
+    earnings_factor = growth_factor(growth, assumptions['horizon'])
+    salary_noise = np.exp(params['salary_sigma'] * draws['salary'])
+    debt_noise = np.exp(params['debt_sigma'] * draws['debt'])
+    noncompleter_years = np.ceil(assumptions['years'] * params['noncompleter_years'])
+
+    n_rows = len(data)
+    net = np.empty((n_rows, len(percentiles)))
+    repay = np.empty((n_rows, len(percentiles)))
+    net_mean = np.empty(n_rows)
+    repaid_share = np.empty(n_rows)
+
+    rows_per_batch = max(1, batch_size // n_scenarios)
+    for start in range(0, n_rows, rows_per_batch):
+        rows = slice(start, start + rows_per_batch)
+        completes = draws['complete'] < completion[rows, None]
+
+        salary = earnings[rows] * salary_noise * np.where(completes, 1.0, params['noncompleter_earnings'])
+        cost = yearly_cost[rows] * np.where(completes, assumptions['years'], noncompleter_years)
+        scenario_net = salary * earnings_factor - cost
+
+        debt = np.where(completes, grad_debt[rows], withdraw_debt[rows]) * debt_noise
+        scenario_repay = years_to_repay(
+            debt, salary * params['repayment_share'], params['loan_rate'], growth, params['max_repay_years']
+        )
+
+        # Institutions missing an input are NaN in every scenario, so their bands are NaN
+        net[rows] = np.percentile(scenario_net, percentiles, axis=1).T
+        net_mean[rows] = scenario_net.mean(axis=1)
+        # No interpolation, so bands that reach "not repaid" stay inf instead of NaN
+        repay[rows] = np.percentile(scenario_repay, percentiles, axis=1, method='inverted_cdf').T
+        repaid_share[rows] = np.where(
+            np.isnan(debt[:, 0]) | np.isnan(salary[:, 0]), np.nan, np.isfinite(scenario_repay).mean(axis=1)
+        )
+
+    result = pd.DataFrame(index=pd.Index(data['UNITID'].to_numpy(), name='UNITID'))
+    for i, p in enumerate(percentiles):
+        result[f"Net_P{p}"] = net[:, i]
+    for i, p in enumerate(percentiles):
+        result[f"Repay_P{p}"] = repay[:, i]
+    result['Net_Mean'] = net_mean
+    result['Repaid_Share'] = repaid_share
+    result['Completion'] = completion
+    return result
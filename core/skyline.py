@@ -0,0 +1,75 @@
+"""
+Pareto skyline for the Pathfinder core library.
+
+A university is on the skyline when no other university is at least as good on every
+criterion and strictly better on one. Uses sort-filter-skyline: rows are sorted by a
+score that dominance can only lower, so a row can only be dominated by rows before it.
+Each block of SKYLINE_BLOCK_SIZE rows is then checked in one vectorized step against
+the skyline found so far and against itself, instead of comparing every pair.
+
+    from core import query, default_datasets
+    from core.skyline import skyline
+    frontier = skyline(default_datasets()['institutions'], ['NPT4_EFF', 'C150_4'])
+"""
+
+import numpy as np
+from config import SKYLINE_CRITERIA, SKYLINE_DEFAULT_CRITERIA, SKYLINE_BLOCK_SIZE
+
+def _dominated(candidates, points):
+    # Whether each candidate row is dominated by any of points (all criteria minimized)
+    if len(points) == 0:
+        return np.zeros(len(candidates), dtype=bool)
+    at_least_as_good = (points[None, :, :] <= candidates[:, None, :]).all(axis=2)
+    better_somewhere = (points[None, :, :] < candidates[:, None, :]).any(axis=2)
+    return (at_least_as_good & better_somewhere).any(axis=1)
+
+def frontier_mask(values, block_size=SKYLINE_BLOCK_SIZE):
+    """
+    Returns a boolean array marking the rows of values (n x d, lower is better, no NaNs)
+    that no other row dominates. Duplicate rows are all kept.
+    """
+    values = np.asarray(values, dtype=float)
+    mask = np.zeros(len(values), dtype=bool)
+    if len(values) == 0:
+        return mask
+
+    # Sum of min-max scaled criteria: a dominating row always has a strictly lower sum
+    span = np.ptp(values, axis=0)
+    span[span == 0] = 1
+    order = np.argsort(((values - values.min(axis=0)) / span).sum(axis=1), kind='stable')
+
+    frontier = np.empty((0, values.shape[1]))
+    for start in range(0, len(order), block_size):
+        rows = order[start:start + block_size]
+        block = values[rows]
+        # Most rows fall to the frontier so far; only the rest are checked against each
+        # other. Dominance is transitive, so a dominated row still counts as a dominator.
+        survivors = ~_dominated(block, frontier)
+        rows, block = rows[survivors], block[survivors]
+        keep = ~_dominated(block, block)
+        frontier = np.vstack([frontier, block[keep]])
+        mask[rows[keep]] = True
+    return mask
+
+def skyline_mask(data, criteria=None):
+    """
+    Returns a boolean array marking the rows of data on the skyline for criteria, a list of
+    SKYLINE_CRITERIA keys. Rows missing any criterion are left out.
+    """
+    criteria = [column for column in (criteria or SKYLINE_DEFAULT_CRITERIA) if column in data.columns]
+    mask = np.zeros(len(data), dtype=bool)
+    if not criteria:
+        return mask
+
+    # Negate the criteria where higher is better, so every column is minimized
+    signs = np.array([1.0 if SKYLINE_CRITERIA[column][1] else -1.0 for column in criteria])
+    values = data[criteria].to_numpy(dtype=float) * signs
+    complete = ~np.isnan(values).any(axis=1)
+    mask[complete] = frontier_mask(values[complete])
+    return mask
+
+def skyline(data, criteria=None):
+    """
+    Returns the rows of data on the skyline for criteria.
+    """
+    return data[skyline_mask(data, criteria)]
@@ -0,0 +1,297 @@
+"""
+Script to generate synthetic College Scorecard-shaped data for the Pathfinder application.
+
+Writes the institution file, the MERGED*_PP history files and the Field of Study
+file with the schemas the loaders expect, so the app, the API and the benchmarks
+can run without downloading the real data. Use --scale to test 10x or 100x rows:
+
+    python generate_synthetic_data.py --scale 10 --output-dir data/synthetic
+    PATHFINDER_DATA_DIR=data/synthetic streamlit run app.py
+"""
+
+import argparse
+import os
+import time
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from config import (
+    COLUMNS_TO_LOAD, STATE_NAMES, HISTORICAL_DATA_FILES, FOS_DATA_FILE, INSTITUTION_DATA_URL
+)
+from core.datasets import HISTORICAL_COLUMNS, FOS_COLUMNS
+
+BASE_INSTITUTIONS = 6500  # Roughly the number of institutions in the real file
+FOS_PROGRAMS_PER_INSTITUTION = 12  # Mean programs per institution in the Field of Study file
+FOS_CHUNK_INSTITUTIONS = 20000  # Institutions per Field of Study write batch
+
+REAL_DATA_DIR = "data"  # Default DATA_DIR, where the real Scorecard files live
+
+# Share of institutions by CONTROL code (public, private nonprofit, private for-profit)
+CONTROL_SHARES = [0.30, 0.27, 0.43]
+
+# Larger states get more institutions; the rest share the remaining weight
+STATE_WEIGHTS = {'CA': 10, 'NY': 7, 'TX': 7, 'PA': 6, 'FL': 6, 'OH': 5, 'IL': 5, 'NC': 3, 'MA': 3, 'MI': 3}
+
+CITIES = [
+    'Springfield', 'Franklin', 'Greenville', 'Bristol', 'Clinton', 'Fairview', 'Salem', 'Madison',
+    'Georgetown', 'Arlington', 'Ashland', 'Dover', 'Oxford', 'Jackson', 'Burlington', 'Manchester',
+    'Milton', 'Newport', 'Auburn', 'Dayton', 'Lexington', 'Marion', 'Riverside', 'Centerville'
+]
+
+# (CIPCODE, CIPDESC) pairs for the Field of Study file
+PROGRAMS = [
+    (1101, 'Computer and Information Sciences, General.'), (1107, 'Computer Science.'),
+    (2601, 'Biology, General.'), (2701, 'Mathematics.'), (4005, 'Chemistry.'), (4008, 'Physics.'),
+    (4201, 'Psychology, General.'), (4506, 'Economics.'), (4510, 'Political Science and Government.'),
+    (4511, 'Sociology.'), (5202, 'Business Administration, Management and Operations.'),
+    (5203, 'Accounting and Related Services.'), (5208, 'Finance and Financial Management Services.'),
+    (5214, 'Marketing.'), (5138, 'Registered Nursing, Nursing Administration, Nursing Research and Clinical Nursing.'),
+    (1409, 'Computer Engineering.'), (1410, 'Electrical, Electronics and Communications Engineering.'),
+    (1419, 'Mechanical Engineering.'), (1408, 'Civil Engineering.'), (2301, 'English Language and Literature, General.'),
+    (5401, 'History.'), (1312, 'Teacher Education and Professional Development, Specific Levels and Methods.'),
+    (5009, 'Music.'), (5007, 'Fine and Studio Arts.'), (901, 'Communication and Media Studies.'),
+    (4301, 'Criminal Justice and Corrections.'), (3105, 'Health and Physical Education/Fitness.'),
+    (1201, 'Culinary Arts and Related Services.'), (1204, 'Cosmetology and Related Personal Grooming Services.'),
+    (4706, 'Vehicle Maintenance and Repair Technologies.')
+]
+CREDENTIALS = {1: 'Undergraduate Certificate or Diploma', 2: "Associate's Degree", 3: "Bachelor's Degree", 5: "Master's Degree"}
+
+# Columns the real data suppresses for privacy, written as 'PrivacySuppressed'
+SUPPRESSIBLE_COLUMNS = [
+    'MD_EARN_WNE_P10', 'DEBT_MDN', 'GRAD_DEBT_MDN', 'WDRAW_DEBT_MDN', 'FEMALE_DEBT_MDN',
+    'MALE_DEBT_MDN', 'FIRSTGEN_DEBT_MDN', 'NOTFIRSTGEN_DEBT_MDN', 'GRAD_DEBT_MDN_SUPP'
+]
+
+RACE_SUFFIXES = ['WHITE', 'BLACK', 'HISP', 'ASIAN', 'AIAN', 'NHPI', '2MOR', 'NRA', 'UNKN']
+RACE_SHARES = [50, 13, 20, 7, 1, 0.5, 4, 3, 1.5]  # Dirichlet concentration, roughly national shares
+
+def generate_institutions(n, rng):
+    """
+    Generate n institutions with every column in COLUMNS_TO_LOAD as clean numbers.
+    """
+    control = rng.choice([1, 2, 3], size=n, p=CONTROL_SHARES)
+    public, nonprofit = control == 1, control == 2
+
+    states = list(STATE_NAMES)
+    weights = np.array([STATE_WEIGHTS.get(state, 1.5) for state in states])
+    stabbr = rng.choice(states, size=n, p=weights / weights.sum())
+    city = rng.choice(CITIES, size=n)
+
+    # Names follow a few common patterns
+    pattern = rng.integers(0, 4, size=n)
+    state_names = pd.Series(stabbr).map(STATE_NAMES).to_numpy()
+    names = np.select(
+        [pattern == 0, pattern == 1, pattern == 2],
+        [
+            "University of " + state_names + "-" + city,
+            city + " Community College",
+            city + " State University"
+        ],
+        default=city + " College of " + rng.choice(['Arts', 'Technology', 'Health Sciences', 'Business'], size=n)
+    )
+    unitids = 100000 + np.cumsum(rng.integers(1, 20, size=n))
+    names = names + " " + (unitids % 1000).astype(str)  # Keep names unique enough to search
+
+    df = pd.DataFrame({
+        'UNITID': unitids,
+        'INSTNM': names,
+        'CITY': city,
+        'STABBR': stabbr,
+        'CONTROL': control,
+        'INSTURL': [f"www.inst{unitid}.edu" for unitid in unitids],
+        'NPCURL': [f"www.inst{unitid}.edu/netprice" for unitid in unitids]
+    })
+
+    # Admissions: only about a third of institutions report, mostly four-year schools
+    reports_admissions = rng.random(n) < np.where(control == 3, 0.1, 0.6)
+    selectivity = rng.beta(5, 2, size=n)
+    df['ADM_RATE'] = np.where(reports_admissions, selectivity, np.nan)
+    sat = 1150 + (0.7 - selectivity) * 450 + rng.normal(0, 70, size=n)
+    reports_tests = reports_admissions & (rng.random(n) < 0.7)
+    df['SAT_AVG'] = np.where(reports_tests, np.clip(sat, 780, 1570).round(), np.nan)
+    df['ACTCMMID'] = np.where(reports_tests, np.clip((sat - 400) / 1200 * 35 + 1, 10, 36).round(), np.nan)
+    df['ADMCON7'] = np.where(
+        reports_admissions,
+        rng.choice([1, 2, 3, 4, 5], size=n, p=[0.15, 0.1, 0.35, 0.05, 0.35]),
+        np.nan
+    )
+
+    # Cost
+    tuition_in = np.select(
+        [public, nonprofit],
+        [rng.normal(9000, 3000, size=n), rng.normal(36000, 13000, size=n)],
+        default=rng.normal(16000, 5000, size=n)
+    ).clip(1500, 65000).round()
+    df['TUITIONFEE_IN'] = tuition_in
+    df['TUITIONFEE_OUT'] = np.where(public, tuition_in * rng.uniform(1.8, 3.2, size=n), tuition_in).round()
+
+    # Size, completion and outcomes, loosely tied to selectivity
+    df['UGDS'] = rng.lognormal(7.3, 1.4, size=n).round().clip(10, 80000)
+    quality = (sat - 1150) / 200
+    df['C150_4'] = np.clip(rng.beta(4, 4, size=n) + quality * 0.12, 0, 1)
+    earnings = rng.lognormal(np.log(42000) + quality * 0.15, 0.25, size=n).round()
+    df['MD_EARN_WNE_P10'] = earnings
+
+    # Debt
+    debt = rng.normal(16000, 5000, size=n).clip(2000, 45000).round()
+    df['DEBT_MDN'] = debt
+    df['GRAD_DEBT_MDN'] = (debt * rng.uniform(1.3, 1.8, size=n)).round()
+    df['WDRAW_DEBT_MDN'] = (debt * rng.uniform(0.4, 0.8, size=n)).round()
+    df['FEMALE_DEBT_MDN'] = (debt * rng.uniform(0.95, 1.15, size=n)).round()
+    df['MALE_DEBT_MDN'] = (debt * rng.uniform(0.85, 1.05, size=n)).round()
+    df['FIRSTGEN_DEBT_MDN'] = (debt * rng.uniform(1.0, 1.2, size=n)).round()
+    df['NOTFIRSTGEN_DEBT_MDN'] = (debt * rng.uniform(0.85, 1.0, size=n)).round()
+    df['GRAD_DEBT_MDN_SUPP'] = df['GRAD_DEBT_MDN']
+    df['FTFTPCTFLOAN'] = rng.beta(3, 3, size=n)
+
+    # Student and staff diversity shares
+    for prefix in ['UGDS', 'IRPS']:
+        shares = rng.dirichlet(RACE_SHARES, size=n)
+        for i, suffix in enumerate(RACE_SUFFIXES):
+            df[f"{prefix}_{suffix}"] = shares[:, i].round(4)
+        men = rng.beta(9, 11, size=n).round(4)
+        df[f"{prefix}_MEN"] = men
+        df[f"{prefix}_WOMEN"] = (1 - men).round(4)
+
+    # Net price: public institutions report the _PUB columns, the others _PRIV
+    net_price = (tuition_in * rng.uniform(0.4, 0.9, size=n) + rng.normal(9000, 2000, size=n)).clip(1000).round()
+    for prefix, factor in [('NPT4', 1.0), ('NPT41', 0.55), ('NPT42', 0.7), ('NPT43', 0.95), ('NPT44', 1.2), ('NPT45', 1.35)]:
+        value = (net_price * factor).round()
+        df[f"{prefix}_PUB"] = np.where(public, value, np.nan)
+        df[f"{prefix}_PRIV"] = np.where(public, np.nan, value)
+
+    return df[COLUMNS_TO_LOAD]
+
+def add_missing_values(df, columns, nan_rate, suppressed_rate, rng):
+    """
+    Blank out values at random and mark suppressible ones as 'PrivacySuppressed'.
+    Columns that get suppressed values are stored as strings, like the CSV conversion does.
+    """
+    df = df.copy()
+    for col in columns:
+        values = df[col]
+        missing = rng.random(len(df)) < nan_rate
+        if col in SUPPRESSIBLE_COLUMNS and suppressed_rate > 0:
+            suppressed = ~missing & (rng.random(len(df)) < suppressed_rate)
+            text = values.map(lambda value: f"{value:.10g}" if pd.notna(value) else None)
+            text[missing] = None
+            text[suppressed] = 'PrivacySuppressed'
+            df[col] = text
+        else:
+            df[col] = values.mask(missing)
+    return df
+
+def history_for_year(institutions, years_back, rng):
+    """
+    Derive one historical cohort from the institution data: older years have lower
+    tuition, drift in rates, and a few institutions that had not opened yet.
+    """
+    df = institutions[[col for col in HISTORICAL_COLUMNS if col in institutions.columns]].copy()
+    df = df[rng.random(len(df)) > 0.01 * years_back]
+
+    inflation = 1.03 ** years_back
+    for col in ['TUITIONFEE_IN', 'TUITIONFEE_OUT']:
+        df[col] = (df[col] / inflation).round()
+    for col in ['ADM_RATE', 'C150_4']:
+        df[col] = np.clip(df[col] + rng.normal(0, 0.02, size=len(df)) * years_back ** 0.5, 0, 1)
+    df['SAT_AVG'] = (df['SAT_AVG'] + rng.normal(0, 8, size=len(df)) * years_back ** 0.5).round()
+    df['UGDS'] = (df['UGDS'] * rng.normal(1, 0.03, size=len(df)) ** years_back).round()
+    return df
+
+def write_field_of_study(institutions, path, scale_programs, nan_rate, suppressed_rate, rng):
+    """
+    Write the Field of Study file in batches so 100x scales don't need it all in memory.
+    Returns the number of rows written.
+    """
+    writer = None
+    rows = 0
+    codes = np.array([code for code, _ in PROGRAMS])
+    descriptions = np.array([desc for _, desc in PROGRAMS])
+    try:
+        for start in range(0, len(institutions), FOS_CHUNK_INSTITUTIONS):
+            batch = institutions.iloc[start:start + FOS_CHUNK_INSTITUTIONS]
+            counts = rng.poisson(scale_programs, size=len(batch)).clip(1, len(PROGRAMS))
+            owner = np.repeat(np.arange(len(batch)), counts)
+            program = rng.integers(0, len(PROGRAMS), size=len(owner))
+            credlev = rng.choice(list(CREDENTIALS), size=len(owner), p=[0.2, 0.25, 0.45, 0.1])
+
+            earnings = rng.lognormal(np.log(38000), 0.35, size=len(owner)).round()
+            earnings_text = pd.Series(earnings).map(lambda value: f"{value:.10g}")
+            earnings_text[rng.random(len(owner)) < nan_rate] = None
+            earnings_text[rng.random(len(owner)) < suppressed_rate] = 'PrivacySuppressed'
+
+            fos = pd.DataFrame({
+                'UNITID': batch['UNITID'].to_numpy()[owner],
+                'INSTNM': batch['INSTNM'].to_numpy()[owner],
+                'CIPCODE': codes[program],
+                'CIPDESC': descriptions[program],
+                'CREDLEV': credlev,
+                'CREDDESC': pd.Series(credlev).map(CREDENTIALS).to_numpy(),
+                'EARN_MDN_HI_1YR': earnings_text.to_numpy()
+            })[FOS_COLUMNS]
+            # Each (institution, program, credential) appears once
+            fos = fos.drop_duplicates(subset=['UNITID', 'CIPCODE', 'CREDLEV'])
+
+            table = pa.Table.from_pandas(fos, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table)
+            rows += len(fos)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+def main():
+    """
+    Generate every synthetic data file.
+    """
+    parser = argparse.ArgumentParser(description="Generate synthetic College Scorecard-shaped data")
+    parser.add_argument('--scale', type=float, default=1, help=f"Row multiplier; 1 = {BASE_INSTITUTIONS} institutions")
+    parser.add_argument('--output-dir', default=os.path.join("data", "synthetic"))
+    parser.add_argument('--nan-rate', type=float, default=0.05, help="Extra share of values left missing")
+    parser.add_argument('--suppressed-rate', type=float, default=0.1,
+                        help="Share of debt and earnings values marked PrivacySuppressed")
+    parser.add_argument('--fos-suppressed-rate', type=float, default=0.6,
+                        help="Share of Field of Study earnings marked PrivacySuppressed")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    # The files use the real Scorecard names, so never write them where the app looks for real data
+    if os.path.realpath(args.output_dir) == os.path.realpath(REAL_DATA_DIR):
+        parser.error(f"--output-dir must not be {REAL_DATA_DIR}/, which holds the real data; use e.g. {REAL_DATA_DIR}/synthetic")
+
+    rng = np.random.default_rng(args.seed)
+    os.makedirs(args.output_dir, exist_ok=True)
+    n = max(1, int(BASE_INSTITUTIONS * args.scale))
+    start = time.perf_counter()
+
+    # Institution file
+    clean = generate_institutions(n, rng)
+    metric_columns = [col for col in clean.columns if col not in ['UNITID', 'INSTNM', 'CITY', 'STABBR', 'CONTROL', 'INSTURL', 'NPCURL']]
+    institutions = add_missing_values(clean, metric_columns, args.nan_rate, args.suppressed_rate, rng)
+    institution_path = os.path.join(args.output_dir, os.path.basename(INSTITUTION_DATA_URL))
+    institutions.to_parquet(institution_path, index=False)
+    print(f"Wrote {institution_path}: {len(institutions):,} rows")
+
+    # History files, newest last; the most recent cohort matches the institution file
+    for years_back, name in zip(range(len(HISTORICAL_DATA_FILES) - 1, -1, -1), HISTORICAL_DATA_FILES):
+        history = history_for_year(clean, years_back, rng)
+        history_metrics = [col for col in history.columns if col in metric_columns]
+        history = add_missing_values(history, history_metrics, args.nan_rate, args.suppressed_rate, rng)
+        path = os.path.join(args.output_dir, name)
+        history.to_parquet(path, index=False)
+        print(f"Wrote {path}: {len(history):,} rows")
+
+    # Field of Study file
+    fos_path = os.path.join(args.output_dir, FOS_DATA_FILE)
+    fos_rows = write_field_of_study(
+        clean, fos_path, FOS_PROGRAMS_PER_INSTITUTION, args.nan_rate, args.fos_suppressed_rate, rng
+    )
+    print(f"Wrote {fos_path}: {fos_rows:,} rows")
+
+    print(f"\nDone in {time.perf_counter() - start:.1f}s. Point the app at it with PATHFINDER_DATA_DIR={args.output_dir}")
+
+if __name__ == "__main__":
+    main()
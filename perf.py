@@ -0,0 +1,210 @@
+"""
+Per-rerun performance instrumentation for the Pathfinder application.
+
+Off by default. PATHFINDER_PERF=1 instruments every session. PATHFINDER_PERF_URL=1
+lets a single session opt in by adding ?perf=1 to the URL; without it the query
+parameter is ignored. When it is on, each rerun records:
+- timers around data loads, the filter chain, Find My Fit scoring, every chart
+  function and every table render
+- whether each cached call was a cache hit or miss
+- the payload bytes of each chart and table sent to the browser
+and shows them in a sidebar panel. If PERF_LOG_PATH is set, each rerun is also
+appended to it as a JSON line, rotating the file once it passes PERF_LOG_MAX_BYTES.
+
+The UI draws charts and tables through plotly_chart, dataframe and data_editor
+below rather than the st functions, so only instrumented sessions pay for the
+measurement.
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+import streamlit as st
+from config import PERF_ENABLED, PERF_URL_ENABLED, PERF_LOG_PATH, PERF_LOG_MAX_BYTES
+
+# Script runs happen on one thread per session, so per-run state is thread-local
+_local = threading.local()
+_log_lock = threading.Lock()
+
+# Last payload seen per function, reported again when a cache hit replays it
+_last_payload = {}
+
+def enabled():
+    """
+    Whether the current rerun is being instrumented.
+    """
+    return getattr(_local, 'enabled', False)
+
+def start_rerun():
+    """
+    Start collecting records for a new rerun. Call at the top of the script.
+    """
+    _local.enabled = PERF_ENABLED or (PERF_URL_ENABLED and st.query_params.get("perf") == "1")
+    _local.records = []
+    _local.stack = []
+    _local.started = time.perf_counter()
+
+def _current():
+    return _local.stack[-1] if getattr(_local, 'stack', None) else None
+
+@contextmanager
+def timed(name, kind):
+    """
+    Time a block and record it under name. Yields the record so callers can add fields.
+    """
+    if not enabled():
+        yield {}
+        return
+
+    record = {'name': name, 'kind': kind, 'ms': 0.0}
+    _local.records.append(record)
+    _local.stack.append(record)
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record['ms'] = round((time.perf_counter() - start) * 1000, 2)
+        _local.stack.pop()
+
+def add_payload(nbytes):
+    """
+    Add bytes sent to the browser to the innermost timed block.
+    """
+    record = _current()
+    if record is not None:
+        record['payload_bytes'] = record.get('payload_bytes', 0) + int(nbytes)
+
+def cached(kind, **cache_kwargs):
+    """
+    Drop-in replacement for st.cache_data that also records time and cache hits.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def body(*args, **kwargs):
+            # Only runs on a cache miss
+            record = _current()
+            if record is not None:
+                record['cache'] = 'miss'
+            return func(*args, **kwargs)
+
+        cached_func = st.cache_data(**cache_kwargs)(body)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not enabled():
+                return cached_func(*args, **kwargs)
+
+            with timed(func.__name__, kind) as record:
+                record['cache'] = 'hit'
+                result = cached_func(*args, **kwargs)
+
+            # Cache hits replay elements without serializing them again
+            if record['cache'] == 'miss':
+                if 'payload_bytes' in record:
+                    _last_payload[func.__qualname__] = record['payload_bytes']
+            elif func.__qualname__ in _last_payload:
+                record['payload_bytes'] = _last_payload[func.__qualname__]
+            return result
+
+        wrapper.clear = cached_func.clear
+        return wrapper
+    return decorator
+
+def _element(element, kind, size):
+    """
+    Wrap a Streamlit element that sends a large payload. Tables are also timed.
+    """
+    original = getattr(st, element)
+
+    @functools.wraps(original)
+    def instrumented(data=None, *args, **kwargs):
+        if not enabled():
+            return original(data, *args, **kwargs)
+        if kind == 'table':
+            with timed(element, kind):
+                add_payload(size(data))
+                return original(data, *args, **kwargs)
+        add_payload(size(data))
+        return original(data, *args, **kwargs)
+
+    return instrumented
+
+def _frame_bytes(df):
+    try:
+        return int(df.memory_usage(deep=True).sum())
+    except AttributeError:
+        return 0
+
+plotly_chart = _element('plotly_chart', 'chart', lambda fig: len(fig.to_json()) if fig is not None else 0)
+dataframe = _element('dataframe', 'table', _frame_bytes)
+data_editor = _element('data_editor', 'table', _frame_bytes)
+
+def finish_rerun():
+    """
+    Close the rerun's records, append them to the JSON lines log and return them.
+    """
+    if not enabled():
+        return None
+
+    summary = {
+        'timestamp': datetime.now().isoformat(timespec='milliseconds'),
+        'session': _session_id(),
+        'total_ms': round((time.perf_counter() - _local.started) * 1000, 2),
+        'records': _local.records
+    }
+    if PERF_LOG_PATH:
+        with _log_lock:
+            _rotate_log()
+            with open(PERF_LOG_PATH, 'a') as f:
+                f.write(json.dumps(summary) + "\n")
+    return summary
+
+def _rotate_log():
+    """
+    Move the log aside once it passes PERF_LOG_MAX_BYTES, keeping one old file.
+    """
+    try:
+        if os.path.getsize(PERF_LOG_PATH) >= PERF_LOG_MAX_BYTES:
+            os.replace(PERF_LOG_PATH, PERF_LOG_PATH + ".1")
+    except FileNotFoundError:
+        pass
+
+def _session_id():
+    if 'perf_session_id' not in st.session_state:
+        st.session_state.perf_session_id = uuid.uuid4().hex[:8]
+    return st.session_state.perf_session_id
+
+def display_perf_panel(summary):
+    """
+    Show the rerun's records in a sidebar expander, slowest first.
+    """
+    if not summary:
+        return
+
+    records = sorted(summary['records'], key=lambda record: record['ms'], reverse=True)
+    with st.sidebar.expander(f"⏱️ Performance ({summary['total_ms']:.0f} ms)", expanded=False):
+        by_kind = {}
+        for record in records:
+            by_kind[record['kind']] = by_kind.get(record['kind'], 0) + record['ms']
+        st.caption(" • ".join(f"{kind}: {ms:.0f} ms" for kind, ms in sorted(by_kind.items(), key=lambda item: -item[1])))
+
+        rows = [
+            {
+                'Step': record['name'],
+                'Kind': record['kind'],
+                'ms': record['ms'],
+                'Cache': record.get('cache', ''),
+                'Payload KB': round(record.get('payload_bytes', 0) / 1024, 1)
+            }
+            for record in records
+        ]
+        if rows:
+            # Use st.dataframe directly so the panel doesn't measure itself
+            st.dataframe(rows, hide_index=True, use_container_width=True)
+        if PERF_LOG_PATH:
+            st.caption(f"Appended to {PERF_LOG_PATH}")
@@ -0,0 +1,150 @@
+"""
+Persistent shortlists for the Pathfinder application.
+
+Off by default. Set PATHFINDER_SHORTLIST_DB to a local SQLite file to keep each
+browser's shortlist and comparison selection across refreshes and restarts. A
+browser is identified by an anonymous token in the URL (?shortlist=...).
+
+- Reads: one primary-key lookup per session start.
+- Writes: saves only update an in-memory dict, so repeated clicks coalesce into
+  the latest value per list. A single background thread writes the dict every
+  SHORTLIST_FLUSH_INTERVAL seconds in one transaction, so sessions never wait on
+  disk or on each other.
+- The database runs in WAL mode, so reads are not blocked by the writer.
+"""
+
+import atexit
+import json
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from config import SHORTLIST_DB_PATH, SHORTLIST_FLUSH_INTERVAL
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS shortlists (
+    token TEXT NOT NULL,
+    name TEXT NOT NULL,
+    unitids TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (token, name)
+) WITHOUT ROWID
+"""
+
+UPSERT = """
+INSERT INTO shortlists (token, name, unitids, updated_at) VALUES (?, ?, ?, ?)
+ON CONFLICT (token, name) DO UPDATE SET unitids = excluded.unitids, updated_at = excluded.updated_at
+"""
+
+class ShortlistStore:
+    """
+    SQLite-backed id lists keyed by (token, name), with batched background writes.
+    """
+
+    def __init__(self, path, flush_interval=SHORTLIST_FLUSH_INTERVAL):
+        self.path = path
+        self.flush_interval = flush_interval
+        self._local = threading.local()
+        self._lock = threading.Lock()          # Guards _pending and _writing
+        self._write_lock = threading.Lock()    # One writer at a time in this process
+        self._pending = {}
+        self._writing = {}
+        self._wake = threading.Event()
+        self._closed = False
+
+        with self._connection() as conn:
+            conn.execute(SCHEMA)
+
+        self._thread = threading.Thread(target=self._run, name="shortlist-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def _connection(self):
+        # sqlite3 connections can't be shared between threads, so keep one per thread
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def load(self, token):
+        """
+        Returns {name: [unitid, ...]} for token, including saves not yet written.
+        """
+        rows = self._connection().execute(
+            "SELECT name, unitids FROM shortlists WHERE token = ?", (token,)
+        ).fetchall()
+        lists = {name: json.loads(unitids) for name, unitids in rows}
+
+        # Saves waiting for, or in, the current write are newer than the database
+        with self._lock:
+            for batch in (self._writing, self._pending):
+                for (batch_token, name), unitids in batch.items():
+                    if batch_token == token:
+                        lists[name] = unitids
+        return lists
+
+    def save(self, token, name, unitids):
+        """
+        Queues the list for writing, replacing any queued value for the same list.
+        """
+        with self._lock:
+            self._pending[(token, name)] = [int(unitid) for unitid in unitids]
+        self._wake.set()
+
+    def flush(self):
+        """
+        Writes all queued saves now.
+        """
+        with self._write_lock:
+            with self._lock:
+                self._writing, self._pending = self._pending, {}
+                self._wake.clear()
+            try:
+                if self._writing:
+                    now = time.time()
+                    with self._connection() as conn:
+                        conn.executemany(UPSERT, [
+                            (token, name, json.dumps(unitids), now)
+                            for (token, name), unitids in self._writing.items()
+                        ])
+            except sqlite3.Error:
+                # Requeue the batch unless newer saves replaced it
+                with self._lock:
+                    for key, unitids in self._writing.items():
+                        self._pending.setdefault(key, unitids)
+                self._wake.set()
+                raise
+            finally:
+                with self._lock:
+                    self._writing = {}
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait()
+            # Let a burst of clicks coalesce before writing
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except sqlite3.Error:
+                # Keep the writer alive; the next save retries with the latest values
+                time.sleep(self.flush_interval)
+
+    def close(self):
+        """
+        Writes queued saves and stops the background writer.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self.flush()
+
+@lru_cache(maxsize=None)
+def get_store(path=SHORTLIST_DB_PATH):
+    """
+    Returns the process-wide store for path, or None when persistence is off.
+    """
+    return ShortlistStore(path) if path else None
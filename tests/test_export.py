@@ -0,0 +1,106 @@
+"""
+Tests for the chunked data exports in core/export.py.
+"""
+
+import io
+import tracemalloc
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from core.export import iter_chunks, write_csv, write_parquet, write_arrow, export_bytes
+
+class RecordingFile(io.RawIOBase):
+    """
+    A writable file that keeps only the size of each write.
+    """
+    def __init__(self):
+        self.write_sizes = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.write_sizes.append(len(data))
+        return len(data)
+
+def make_frame(rows):
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        'UNITID': np.arange(rows),
+        'INSTNM': [f"University {i} of Somewhere Quite Long" for i in range(rows)],
+        'ADM_RATE': rng.random(rows),
+        'SAT_AVG': rng.integers(800, 1600, rows).astype(float)
+    })
+
+def test_iter_chunks_covers_every_row_once():
+    df = make_frame(1050)
+    chunks = list(iter_chunks(df, 100))
+
+    assert [len(chunk) for chunk in chunks] == [100] * 10 + [50]
+    assert pd.concat(chunks).equals(df)
+
+def test_csv_is_written_one_chunk_at_a_time():
+    df = make_frame(1000)
+    out = RecordingFile()
+    write_csv(df, out, chunk_rows=100)
+
+    full_size = len(df.to_csv(index=False).encode('utf-8'))
+    assert len(out.write_sizes) == 10
+    assert sum(out.write_sizes) == full_size
+    assert max(out.write_sizes) < full_size / 5
+
+def test_csv_export_matches_pandas():
+    df = make_frame(1000)
+    out = io.BytesIO()
+    write_csv(df, out, chunk_rows=128)
+
+    assert out.getvalue() == df.to_csv(index=False).encode('utf-8')
+
+def test_empty_csv_export_keeps_header():
+    df = make_frame(0)
+
+    assert export_bytes(df, 'CSV') == df.to_csv(index=False).encode('utf-8')
+
+def test_parquet_has_one_row_group_per_chunk():
+    df = make_frame(1000)
+    out = io.BytesIO()
+    write_parquet(df, out, chunk_rows=300)
+
+    out.seek(0)
+    parquet_file = pq.ParquetFile(out)
+    assert parquet_file.num_row_groups == 4
+    pd.testing.assert_frame_equal(parquet_file.read().to_pandas(), df, check_dtype=False)
+
+def test_arrow_has_one_batch_per_chunk():
+    df = make_frame(1000)
+    out = io.BytesIO()
+    write_arrow(df, out, chunk_rows=300)
+
+    reader = pa.ipc.open_file(pa.BufferReader(out.getvalue()))
+    assert reader.num_record_batches == 4
+    pd.testing.assert_frame_equal(reader.read_all().to_pandas(), df, check_dtype=False)
+
+def peak_bytes(func, *args, **kwargs):
+    tracemalloc.start()
+    try:
+        func(*args, **kwargs)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def test_csv_export_peak_memory_is_bounded_by_chunk():
+    df = make_frame(50000)
+    full_size = len(df.to_csv(index=False).encode('utf-8'))
+
+    chunked_peak = peak_bytes(write_csv, df, RecordingFile(), chunk_rows=2000)
+    single_chunk_peak = peak_bytes(write_csv, df, RecordingFile(), chunk_rows=len(df))
+
+    # Only one chunk's text is alive at a time, never the whole file
+    assert chunked_peak < full_size / 2
+    assert chunked_peak < single_chunk_peak / 5
+
+def test_unknown_format_is_rejected():
+    with pytest.raises(ValueError):
+        export_bytes(make_frame(10), 'Excel')
@@ -5,59 +5,52 @@ University details view for the Pathfinder application.
 import streamlit as st
 import pandas as pd
 from datetime import datetime
+from config import ROI_COST_BASES, SIMULATION_PARAMS, SIMULATION_PERCENTILES, SIMULATION_SCENARIOS
+from core.roi import compute_roi
+from data_loader import get_roi_simulation, get_dataset_version
 from utils import (
-    get_download_link, add_to_shortlist, remove_from_shortlist,
+    display_export_button, add_to_shortlist, remove_from_shortlist,
     toggle_university_selection, set_active_tab
 )
 import ui.visualizations as viz
 
-def display_university_details(unitid, inst_data, hist_data, fos_data):
-    """
-    Displays detailed information for a selected university.
+@st.fragment
+def display_action_buttons(unitid):
     """
-    # Get the university data
-    uni_data = inst_data[inst_data['UNITID'] == unitid]
-    if uni_data.empty:
-        st.error("University data not found.")
-        return
-
-    uni_data = uni_data.iloc[0]  # Get the row for the selected uni
-
-    # Create a visually appealing header card with university info and action buttons
-    st.markdown(f"""
-    <div style="background-color: white; border-radius: 10px; padding: 20px; margin-bottom: 20px; border: 1px solid #e0e0e0; border-left: 5px solid #1e88e5;">
-        <h1 style="margin-top: 0; color: #1e88e5;">🏛️ {uni_data['INSTNM']}</h1>
-        <h3 style="margin-bottom: 10px; color: #333;">📍 {uni_data['CITY']}, {uni_data['STABBR']} • {uni_data['CONTROL_TYPE']}</h3>
-    </div>
-    """, unsafe_allow_html=True)
+    Displays the shortlist, comparison, profile and back buttons for a university.
 
-    # Action buttons in a more compact layout with icons
+    Comparison toggles rerun only this fragment. Shortlist toggles and buttons that
+    change the rest of the page trigger a full rerun, since the shortlist is shown
+    across the app.
+    """
     col1, col2, col3, col4 = st.columns([1, 1, 1, 1])
 
     with col1:
         is_shortlisted = unitid in st.session_state.shortlisted_universities
         if is_shortlisted:
-            if st.button("❌ Remove from Shortlist", key=f"remove_shortlist_{unitid}"):
-                remove_from_shortlist(unitid)
-                st.rerun()
+            if st.button("❌ Remove from Shortlist", key=f"remove_shortlist_{unitid}",
+                         on_click=remove_from_shortlist, args=(unitid,)):
+                st.rerun(scope="app")
         else:
-            if st.button("📋 Add to Shortlist", key=f"add_shortlist_{unitid}"):
-                add_to_shortlist(unitid)
-                st.rerun()
+            if st.button("📋 Add to Shortlist", key=f"add_shortlist_{unitid}",
+                         on_click=add_to_shortlist, args=(unitid,)):
+                st.rerun(scope="app")
+        st.caption(f"{len(st.session_state.shortlisted_universities)} saved in your shortlist")
 
     with col2:
         is_selected = unitid in st.session_state.selected_universities
         if is_selected:
-            if st.button("❌ Remove from Comparison", key=f"remove_comparison_{unitid}"):
-                toggle_university_selection(unitid)
+            st.button("❌ Remove from Comparison", key=f"remove_comparison_{unitid}",
+                      on_click=toggle_university_selection, args=(unitid,))
         else:
-            if st.button("⚖️ Add to Comparison", key=f"add_comparison_{unitid}"):
-                toggle_university_selection(unitid)
+            st.button("⚖️ Add to Comparison", key=f"add_comparison_{unitid}",
+                      on_click=toggle_university_selection, args=(unitid,))
 
     with col3:
         # Generate profile button
         if st.button("📄 Generate Profile", key=f"generate_profile_{unitid}"):
             st.session_state.show_profile = True
+            st.rerun()
 
     with col4:
         if st.button("🔙 Back to List", key=f"back_to_list_{unitid}"):
@@ -65,6 +58,29 @@ def display_university_details(unitid, inst_data, hist_data, fos_data):
             st.session_state.selected_university_id = None
             st.rerun()
 
+def display_university_details(unitid, inst_data, hist_data, fos_data):
+    """
+    Displays detailed information for a selected university.
+    """
+    # Get the university data
+    uni_data = inst_data[inst_data['UNITID'] == unitid]
+    if uni_data.empty:
+        st.error("University data not found.")
+        return
+
+    uni_data = uni_data.iloc[0]  # Get the row for the selected uni
+
+    # Create a visually appealing header card with university info and action buttons
+    st.markdown(f"""
+    <div style="background-color: white; border-radius: 10px; padding: 20px; margin-bottom: 20px; border: 1px solid #e0e0e0; border-left: 5px solid #1e88e5;">
+        <h1 style="margin-top: 0; color: #1e88e5;">🏛️ {uni_data['INSTNM']}</h1>
+        <h3 style="margin-bottom: 10px; color: #333;">📍 {uni_data['CITY']}, {uni_data['STABBR']} • {uni_data['CONTROL_TYPE']}</h3>
+    </div>
+    """, unsafe_allow_html=True)
+
+    # Action buttons in a more compact layout with icons
+    display_action_buttons(unitid)
+
     # Add a tabbed interface for better organization
     detail_tabs = st.tabs(["📊 Overview", "🎓 Academics", "💰 Finances", "🌈 Campus Life", "📈 Outcomes"])
 
@@ -428,14 +444,13 @@ def display_university_details(unitid, inst_data, hist_data, fos_data):
         st.markdown("### 🧮 Return on Investment Calculator")
 
         # Check if we have the necessary data
-        has_tuition = pd.notna(uni_data['TUITIONFEE_IN']) or pd.notna(uni_data['TUITIONFEE_OUT'])
+        has_cost = any(pd.notna(uni_data.get(column)) for column in ['NPT4_EFF', 'TUITIONFEE_IN', 'TUITIONFEE_OUT'])
         has_earnings = pd.notna(uni_data['MD_EARN_WNE_P10'])
 
-        if has_tuition and has_earnings:
-            # Get values
-            in_state = int(uni_data['TUITIONFEE_IN']) if pd.notna(uni_data['TUITIONFEE_IN']) else 0
-            out_state = int(uni_data['TUITIONFEE_OUT']) if pd.notna(uni_data['TUITIONFEE_OUT']) else 0
-            earnings = int(uni_data['MD_EARN_WNE_P10'])
+        if has_cost and has_earnings:
+            # Starts from the ROI assumptions used in Explore and Find My Fit, so the
+            # untouched calculator shows the same ROI as their ROI columns
+            assumptions = st.session_state.roi_assumptions
 
             # Create interactive calculator
             st.markdown("""
@@ -445,33 +460,42 @@ def display_university_details(unitid, inst_data, hist_data, fos_data):
             </div>
             """, unsafe_allow_html=True)
 
-            # User inputs
+            # User inputs, with the same ranges as the sidebar ROI assumptions
             calc_col1, calc_col2 = st.columns(2)
 
             with calc_col1:
-                residency = st.radio("Residency Status:", ["In-State", "Out-of-State"])
-                years = st.slider("Years to Complete Degree:", min_value=4, max_value=6, value=4)
+                cost_basis = st.radio(
+                    "Cost Basis:",
+                    list(ROI_COST_BASES),
+                    index=list(ROI_COST_BASES).index(assumptions['cost_basis']),
+                    format_func=ROI_COST_BASES.get
+                )
+                years = st.slider("Years to Complete Degree:", min_value=2, max_value=6, value=assumptions['years'])
 
             with calc_col2:
-                financial_aid = st.slider("Estimated Annual Financial Aid ($):", min_value=0, max_value=30000, value=5000, step=1000)
-                annual_salary_increase = st.slider("Expected Annual Salary Growth (%):", min_value=1.0, max_value=5.0, value=2.0, step=0.5)
-
-            # Calculate ROI
-            tuition = in_state if residency == "In-State" else out_state
-            total_cost = (tuition - financial_aid) * years
-
-            # Simple ROI calculation (10-year earnings vs. total cost)
-            if total_cost > 0:
-                # Calculate cumulative earnings over 10 years with growth
-                cumulative_earnings = 0
-                annual_salary = earnings
-
-                for year in range(10):
-                    cumulative_earnings += annual_salary
-                    annual_salary *= (1 + annual_salary_increase/100)
+                financial_aid = st.slider("Estimated Annual Financial Aid ($):", min_value=0, max_value=30000, value=assumptions['annual_aid'], step=1000)
+                annual_salary_increase = st.slider("Expected Annual Salary Growth (%):", min_value=0.0, max_value=6.0, value=assumptions['salary_growth'] * 100, step=0.5)
+
+            if cost_basis == 'net_price':
+                st.caption(f"Net price for family income: {assumptions['family_income'] or 'all students'} (set under ROI Assumptions in the sidebar).")
+
+            # Calculate ROI with the same closed-form model as the ROI rankings
+            horizon = assumptions['horizon']
+            calculator_assumptions = {
+                **assumptions,
+                'cost_basis': cost_basis,
+                'years': years,
+                'annual_aid': financial_aid,
+                'salary_growth': annual_salary_increase / 100
+            }
+            result = compute_roi(uni_data.to_frame().T, calculator_assumptions).iloc[0]
+            total_cost = result['ROI_Cost']
 
-                # Calculate ROI
-                roi = (cumulative_earnings - total_cost) / total_cost * 100
+            if pd.isna(total_cost):
+                st.info(f"No {ROI_COST_BASES[cost_basis].lower()} is reported for this university.")
+            elif total_cost > 0:
+                cumulative_earnings = result['ROI_Earnings']
+                roi = result['ROI_Pct']
 
                 # Display results
                 st.markdown(f"""
@@ -480,14 +504,14 @@ def display_university_details(unitid, inst_data, hist_data, fos_data):
                     <table style="width: 100%;">
                         <tr>
                             <td style="padding: 8px; font-weight: bold;">Total Education Cost:</td>
-                            <td style="padding: 8px; text-align: right;">${total_cost:,}</td>
+                            <td style="padding: 8px; text-align: right;">${int(total_cost):,}</td>
                         </tr>
                         <tr>
-                            <td style="padding: 8px; font-weight: bold;">Estimated 10-Year Earnings:</td>
+                            <td style="padding: 8px; font-weight: bold;">Estimated {horizon}-Year Earnings:</td>
                             <td style="padding: 8px; text-align: right;">${int(cumulative_earnings):,}</td>
                         </tr>
                         <tr style="background-color: #c8e6c9;">
-                            <td style="padding: 8px; font-weight: bold;">10-Year Return on Investment:</td>
+                            <td style="padding: 8px; font-weight: bold;">{horizon}-Year Return on Investment:</td>
                             <td style="padding: 8px; text-align: right; font-weight: bold;">{roi:.1f}%</td>
                         </tr>
                     </table>
@@ -496,6 +520,10 @@ def display_university_details(unitid, inst_data, hist_data, fos_data):
                 """, unsafe_allow_html=True)
             else:
                 st.info("Adjust the financial aid amount to calculate ROI.")
+
+            # The same inputs, simulated over many possible students
+            if pd.notna(total_cost):
+                display_outcome_range(unitid, inst_data, calculator_assumptions)
         else:
             st.info("Insufficient data to calculate return on investment.")
 
@@ -510,20 +538,18 @@ def display_university_details(unitid, inst_data, hist_data, fos_data):
         """, unsafe_allow_html=True)
 
         # Create a comprehensive dataframe with all university data
-        profile_data = pd.DataFrame([uni_data])
+        profile_data = pd.DataFrame([uni_data]).infer_objects()
 
         # Add a timestamp to the filename
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"{uni_data['INSTNM'].replace(' ', '_')}_profile_{timestamp}.csv"
-
-        # Generate download link
-        st.markdown(
-            get_download_link(
-                profile_data,
-                filename,
-                "📥 Download Complete University Profile (CSV)"
-            ),
-            unsafe_allow_html=True
+        file_stem = f"{uni_data['INSTNM'].replace(' ', '_')}_profile_{timestamp}"
+
+        # Generate the download menu
+        display_export_button(
+            profile_data,
+            file_stem,
+            "📥 Download Complete University Profile",
+            key=f"download_profile_{unitid}"
         )
 
         # Add option to hide the profile section
@@ -531,3 +557,30 @@ def display_university_details(unitid, inst_data, hist_data, fos_data):
             st.session_state.show_profile = False
             st.rerun()
 
+def display_outcome_range(unitid, inst_data, assumptions):
+    """
+    Displays simulated net return and repayment percentiles for one university.
+    """
+    low, mid, high = SIMULATION_PERCENTILES[0], SIMULATION_PERCENTILES[len(SIMULATION_PERCENTILES) // 2], SIMULATION_PERCENTILES[-1]
+    simulation = get_roi_simulation((unitid,), assumptions, get_dataset_version(), inst_data)
+    if simulation.empty or pd.isna(simulation[f'Net_P{mid}'].iloc[0]):
+        return
+    outcome = simulation.iloc[0]
+    max_years = SIMULATION_PARAMS['max_repay_years']
+
+    st.markdown("#### Range of Outcomes", help=(
+        f"{SIMULATION_SCENARIOS:,} simulated students, varying completion (from the graduation rate), "
+        "starting salary, salary growth and debt. Repayment assumes "
+        f"{SIMULATION_PARAMS['repayment_share']:.0%} of salary at {SIMULATION_PARAMS['loan_rate']:.1%} interest."
+    ))
+    range_cols = st.columns(4)
+    range_cols[0].metric(f"Net Return (Pessimistic, P{low})", f"${outcome[f'Net_P{low}']:,.0f}")
+    range_cols[1].metric(f"Net Return (Typical, P{mid})", f"${outcome[f'Net_P{mid}']:,.0f}")
+    range_cols[2].metric(f"Net Return (Optimistic, P{high})", f"${outcome[f'Net_P{high}']:,.0f}")
+    repay = outcome[f'Repay_P{mid}']
+    range_cols[3].metric(
+        f"Years to Repay Debt (P{mid})",
+        "N/A" if pd.isna(repay) else (f"{max_years}+" if repay == float('inf') else f"{repay:.1f}")
+    )
+    if pd.notna(outcome['Repaid_Share']):
+        st.caption(f"{outcome['Repaid_Share']:.0%} of simulated students repay their debt within {max_years} years.")
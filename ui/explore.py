@@ -4,58 +4,40 @@ Explore universities tab for Pathfinder.
 
 import streamlit as st
 import pandas as pd
-import plotly.express as px
 from datetime import datetime
+from config import EXPLORE_PAGE_SIZES, EXPLORE_DEFAULT_PAGE_SIZE, SKYLINE_CRITERIA, SKYLINE_DEFAULT_CRITERIA
+from data_loader import get_search_index, get_dataset_version, get_skyline_unitids
+from core.roi import compute_roi
+from core.search import search_index
+from perf import timed, data_editor
 from utils import (
-    get_download_link, add_to_shortlist, remove_from_shortlist,
-    set_selected_university, toggle_university_selection
-)
-from ui.visualizations.academic import (
-    plot_selectivity_scatter,
-    plot_sat_distribution,
-    plot_test_policy_distribution
-)
-from ui.visualizations.cost import (
-    plot_tuition_distribution,
-    plot_tuition_vs_size,
-    plot_state_tuition_comparison
-)
-from ui.visualizations.outcomes import (
-    plot_graduation_rate_histogram,
-    plot_debt_earnings_scatter,
-    plot_admission_debt_earnings_ratio
-)
-from ui.visualizations.institution import (
-    plot_control_type_distribution,
-    plot_institution_size_distribution
-)
-from ui.visualizations.diversity import (
-    plot_diversity_composition,
-    plot_diversity_comparison_by_control,
-    plot_gender_comparison,
-    plot_gender_ratio_by_type,
-    plot_staff_diversity_composition,
-    plot_staff_gender_ratio_by_type
+    display_export_button, add_to_shortlist, remove_from_shortlist,
+    set_selected_university, toggle_university_selection, lazy_tabs
 )
+from ui import visualizations as viz
 
-def display_main_content(filtered_data, all_data, historical_data, fos_data):
+def display_main_content(filtered_data, all_data, historical_data, fos_data, filter_options=None):
     """
     Displays the filtered data table (with selection) and visualizations.
     """
+    # Search across all universities, regardless of the sidebar filters
+    display_search(all_data)
+
+    # Pareto view: the table and insights show only the non-dominated universities
+    filtered_data = display_skyline_view(filtered_data, filter_options)
+
     # Display count and download option with emoji
     col1, col2 = st.columns([3, 1])
     with col1:
         st.subheader(f"🔍 Filtered Universities ({len(filtered_data)} found)")
     with col2:
         if not filtered_data.empty:
-            # Create a download link for the filtered data
-            st.markdown(
-                get_download_link(
-                    filtered_data,
-                    f"filtered_universities_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                    "📥 Download Filtered List"
-                ),
-                unsafe_allow_html=True
+            # Create a download menu for the filtered data
+            display_export_button(
+                filtered_data,
+                f"filtered_universities_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+                "📥 Download Filtered List",
+                key="download_filtered"
             )
 
     # Removed 'Manage Shortlist' widget to simplify the UI, which i realized makes no sense...
@@ -68,106 +50,282 @@ def display_main_content(filtered_data, all_data, historical_data, fos_data):
         st.header("📊 University Insights")
         st.write("Explore patterns and trends across universities through interactive visualizations.")
 
-        # Create tabs for different visualization categories
-        viz_tabs = st.tabs(["🎯 Selectivity", "💰 Cost", "📈 Outcomes", "🏫 Institution Types", "🌈 Diversity"])
+        # Create tabs for different visualization categories. Only the active tab is
+        # computed and rendered, hidden tabs cost nothing on a rerun.
+        viz_tab = lazy_tabs(
+            ["🎯 Selectivity", "💰 Cost", "📈 Outcomes", "🏫 Institution Types", "🌈 Diversity"],
+            key="explore_viz_tab"
+        )
 
         # Selectivity Tab
-        with viz_tabs[0]:
+        if viz_tab == "🎯 Selectivity":
             st.subheader("University Selectivity Analysis")
-            plot_selectivity_scatter(filtered_data)
+            viz.plot_selectivity_scatter(filtered_data)
 
             # Add SAT score distribution
-            plot_sat_distribution(filtered_data)
+            viz.plot_sat_distribution(filtered_data)
 
             # Add test score policy visualization
-            plot_test_policy_distribution(filtered_data)
+            viz.plot_test_policy_distribution(filtered_data)
 
         # Cost Tab
-        with viz_tabs[1]:
+        elif viz_tab == "💰 Cost":
             st.subheader("Cost Analysis")
             # Tuition distribution by control type
-            plot_tuition_distribution(filtered_data)
+            viz.plot_tuition_distribution(filtered_data)
 
             # Tuition vs. institution size
-            plot_tuition_vs_size(filtered_data)
+            viz.plot_tuition_vs_size(filtered_data)
 
             # State tuition comparison
-            plot_state_tuition_comparison(filtered_data)
+            viz.plot_state_tuition_comparison(filtered_data)
 
         # Outcomes Tab
-        with viz_tabs[2]:
+        elif viz_tab == "📈 Outcomes":
             st.subheader("Student Outcomes Analysis")
 
             # Graduation rate visualization
-            plot_graduation_rate_histogram(filtered_data)
+            viz.plot_graduation_rate_histogram(filtered_data)
 
             # Add ROI visualization
-            plot_debt_earnings_scatter(filtered_data)
+            viz.plot_debt_earnings_scatter(filtered_data)
 
             # Add Admission Rate vs. Debt-to-Earnings visualization
-            plot_admission_debt_earnings_ratio(filtered_data)
+            viz.plot_admission_debt_earnings_ratio(filtered_data)
 
         # Institution Types Tab
-        with viz_tabs[3]:
+        elif viz_tab == "🏫 Institution Types":
             st.subheader("Institution Types Analysis")
 
             # Control type distribution
-            plot_control_type_distribution(filtered_data)
+            viz.plot_control_type_distribution(filtered_data)
 
             # Institution size distribution
-            plot_institution_size_distribution(filtered_data)
+            viz.plot_institution_size_distribution(filtered_data)
 
         # Diversity Tab
-        with viz_tabs[4]:
+        elif viz_tab == "🌈 Diversity":
             st.subheader("Diversity Analysis")
 
             # Create subtabs for different diversity visualizations
-            diversity_subtabs = st.tabs(["Racial/Ethnic Diversity", "Gender Distribution", "Staff Diversity"])
+            diversity_tab = lazy_tabs(
+                ["Racial/Ethnic Diversity", "Gender Distribution", "Staff Diversity"],
+                key="explore_diversity_tab"
+            )
 
             # Racial/Ethnic Diversity Tab
-            with diversity_subtabs[0]:
+            if diversity_tab == "Racial/Ethnic Diversity":
                 # Average undergraduate diversity composition
-                plot_diversity_composition(filtered_data)
+                viz.plot_diversity_composition(filtered_data)
 
                 # Diversity by institution type
-                plot_diversity_comparison_by_control(filtered_data)
+                viz.plot_diversity_comparison_by_control(filtered_data)
 
             # Gender Distribution Tab
-            with diversity_subtabs[1]:
+            elif diversity_tab == "Gender Distribution":
                 # Gender comparison between students and staff
-                plot_gender_comparison(filtered_data)
+                viz.plot_gender_comparison(filtered_data)
 
                 # Gender ratio by institution type
-                plot_gender_ratio_by_type(filtered_data)
+                viz.plot_gender_ratio_by_type(filtered_data)
 
             # Staff Diversity Tab
-            with diversity_subtabs[2]:
+            elif diversity_tab == "Staff Diversity":
                 # Staff diversity composition
-                plot_staff_diversity_composition(filtered_data)
+                viz.plot_staff_diversity_composition(filtered_data)
 
                 # Staff gender ratio by institution type
-                plot_staff_gender_ratio_by_type(filtered_data)
+                viz.plot_staff_gender_ratio_by_type(filtered_data)
     else:
         st.info("ℹ️ No universities match the current filter criteria or not enough data for visualizations.")
 
+def display_skyline_view(filtered_data, filter_options):
+    """
+    Displays the Pareto view controls. Returns the skyline of the filtered universities
+    when the view is on, and all of them otherwise.
+    """
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        show_skyline = st.toggle(
+            "⭐ Pareto view",
+            key="explore_skyline",
+            help="Show only universities that no other filtered university matches or beats on every chosen criterion."
+        )
+    if not show_skyline:
+        return filtered_data
+
+    with col2:
+        criteria = st.multiselect(
+            "Not beaten on",
+            list(SKYLINE_CRITERIA),
+            default=SKYLINE_DEFAULT_CRITERIA,
+            format_func=lambda column: SKYLINE_CRITERIA[column][0],
+            key="explore_skyline_criteria"
+        )
+    if not criteria:
+        st.info("Choose at least one criterion for the Pareto view.")
+        return filtered_data
+
+    # Cached per filter spec and criteria, so paging and sorting reuse it
+    with timed("skyline", "filter"):
+        unitids = get_skyline_unitids(filter_options, tuple(criteria), get_dataset_version(), filtered_data)
+    skyline_data = filtered_data[filtered_data['UNITID'].isin(unitids)]
+
+    labels = ", ".join(SKYLINE_CRITERIA[column][0].lower() for column in criteria)
+    st.caption(
+        f"{len(skyline_data):,} of {len(filtered_data):,} filtered universities are not beaten by another on "
+        f"all of {labels}. Universities missing any of these are left out."
+    )
+    return skyline_data
+
+def display_search(all_data):
+    """
+    Displays a search box that finds universities by name, city or acronym.
+    """
+    query = st.text_input(
+        "🔎 Search Universities",
+        placeholder="Search by name, city or acronym, e.g. UCLA or U of M",
+        key="explore_search_query"
+    )
+    if not query.strip():
+        return
+
+    with timed("get_search_index", "load"):
+        index = get_search_index(all_data, get_dataset_version())
+    matches = search_index(index, query)
+
+    if not matches:
+        st.caption("No universities match your search.")
+        return
+
+    for unitid, name, city, _ in matches:
+        col1, col2 = st.columns([5, 1])
+        with col1:
+            st.markdown(f"**{name}**" + (f" · {city}" if city else ""))
+        with col2:
+            if st.button("🔍 Details", key=f"search_view_{unitid}", use_container_width=True):
+                set_selected_university(unitid)
+
 def display_table_view(filtered_data):
     """
-    Displays universities in an optimized table view with selection options.
+    Displays universities in a paginated table view with selection options.
+
+    Rows are sorted and sliced on the server, so only the visible page is sent to the
+    browser. Checkbox changes are kept in session state across pages until applied.
     """
     # Initialize session state for tracking changes
     if 'last_shortlist_action' not in st.session_state:
         st.session_state.last_shortlist_action = None
 
-    # Create a lightweight copy with only necessary columns
-    essential_columns = ['UNITID', 'INSTNM', 'CITY', 'STABBR', 'CONTROL_TYPE',
-                         'ADM_RATE', 'SAT_AVG', 'TUITIONFEE_IN', 'C150_4', 'ADMCON7']
+    # Shortlist changes made on any page but not yet applied, as {UNITID: checked}
+    if 'explore_pending_shortlist' not in st.session_state:
+        st.session_state.explore_pending_shortlist = {}
+
+    # Bumped after applying changes so page editors start from the saved shortlist
+    if 'explore_table_version' not in st.session_state:
+        st.session_state.explore_table_version = 0
+
+    # Columns shown in the table and their labels
+    column_labels = {
+        'INSTNM': "Institution Name",
+        'CITY': "City",
+        'STABBR': "State",
+        'CONTROL_TYPE': "Type",
+        'ADM_RATE_PCT': "Admission Rate",
+        'SAT_AVG': "Avg SAT",
+        'TUITIONFEE_IN': "In-State Tuition",
+        'C150_4_PCT': "Graduation Rate",
+        'TEST_POLICY': "Test Score Policy",
+        'ROI_Pct': "ROI",
+        'ROI_Net': "Net Return",
+        'ROI_Rank': "ROI Rank"
+    }
+
+    # ROI for every filtered row under the sidebar assumptions, ranked within the filters.
+    # Kept as a separate frame so the filtered data is never copied.
+    with timed("compute_roi", "filter"):
+        roi = compute_roi(filtered_data, st.session_state.roi_assumptions).reset_index(drop=True)
 
     # Filter columns that exist in the dataframe
-    available_columns = [col for col in essential_columns if col in filtered_data.columns]
-    display_df = filtered_data[available_columns].copy()
+    available_columns = ['UNITID'] + [col for col in column_labels if col in filtered_data.columns]
+    sortable_columns = [col for col in column_labels if col in filtered_data.columns or col in roi.columns]
+
+    # Resetting to the first page when the sort or page size changes
+    def reset_page():
+        st.session_state.explore_table_page = 1
+
+    # Ranking by ROI is a preset sort, best first
+    def rank_by_roi():
+        st.session_state.explore_table_sort = 'ROI_Rank'
+        st.session_state.explore_table_order = "Ascending"
+        reset_page()
+
+    st.button("🏆 Rank by ROI", key="explore_rank_by_roi", on_click=rank_by_roi,
+              help="Sort by return on investment under the ROI assumptions in the sidebar")
+
+    # Table controls: sort, order, page size and page
+    ctrl1, ctrl2, ctrl3, ctrl4 = st.columns([2, 1, 1, 1])
+    with ctrl1:
+        sort_column = st.selectbox(
+            "Sort by",
+            sortable_columns,
+            format_func=lambda col: column_labels[col],
+            key="explore_table_sort",
+            on_change=reset_page
+        )
+    with ctrl2:
+        sort_order = st.selectbox(
+            "Order",
+            ["Ascending", "Descending"],
+            key="explore_table_order",
+            on_change=reset_page
+        )
+    with ctrl3:
+        page_size = st.selectbox(
+            "Rows per page",
+            EXPLORE_PAGE_SIZES,
+            index=EXPLORE_PAGE_SIZES.index(EXPLORE_DEFAULT_PAGE_SIZE),
+            key="explore_table_page_size",
+            on_change=reset_page
+        )
+
+    n_rows = len(filtered_data)
+    n_pages = max(1, -(-n_rows // page_size))
+
+    # Keep the current page in range when the filters shrink the result
+    if st.session_state.get('explore_table_page', 1) > n_pages:
+        st.session_state.explore_table_page = n_pages
+
+    with ctrl4:
+        page = st.number_input(
+            f"Page (of {n_pages})",
+            min_value=1,
+            max_value=n_pages,
+            step=1,
+            key="explore_table_page"
+        )
 
-    # Add shortlist column
-    display_df.insert(0, 'Shortlist', display_df['UNITID'].isin(st.session_state.shortlisted_universities))
+    # Sort only the sort column and slice the row positions for this page,
+    # then copy just those rows
+    sort_values = roi[sort_column] if sort_column in roi.columns else filtered_data[sort_column].reset_index(drop=True)
+    sort_positions = sort_values.sort_values(
+        ascending=(sort_order == "Ascending"),
+        na_position='last',
+        kind='stable'
+    ).index
+    start = (page - 1) * page_size
+    page_positions = sort_positions[start:start + page_size]
+    display_df = filtered_data.iloc[page_positions][available_columns].reset_index(drop=True)
+    display_df[['ROI_Pct', 'ROI_Net', 'ROI_Rank']] = roi.iloc[page_positions][['ROI_Pct', 'ROI_Net', 'ROI_Rank']].to_numpy()
+
+    st.caption(f"Showing {start + 1 if n_rows else 0}–{start + len(display_df)} of {n_rows:,} universities")
+
+    # Add shortlist column, including changes not yet applied
+    pending = st.session_state.explore_pending_shortlist
+    shortlisted = display_df['UNITID'].isin(st.session_state.shortlisted_universities)
+    pending_on_page = display_df['UNITID'].map(pending)
+    shortlisted = pending_on_page.where(pending_on_page.notna(), shortlisted).astype(bool)
+    display_df.insert(0, 'Shortlist', shortlisted)
 
     # Create optimized column configuration
     column_config = {
@@ -178,43 +336,37 @@ def display_table_view(filtered_data):
         "CONTROL_TYPE": st.column_config.TextColumn("Type")
     }
 
-    # Add numeric columns with formatting if they exist
-    if 'ADM_RATE' in display_df.columns:
-        # Convert admission rate from decimal to percentage for display
-        display_df['ADM_RATE'] = display_df['ADM_RATE'] * 100
-        column_config["ADM_RATE"] = st.column_config.NumberColumn("Admission Rate", format="%.1f%%")
+    # Add numeric columns with formatting if they exist. Percentages and test policy
+    # labels are precomputed at load time.
+    if 'ADM_RATE_PCT' in display_df.columns:
+        column_config["ADM_RATE_PCT"] = st.column_config.NumberColumn("Admission Rate", format="%.1f%%")
     if 'SAT_AVG' in display_df.columns:
         column_config["SAT_AVG"] = st.column_config.NumberColumn("Avg SAT")
     if 'TUITIONFEE_IN' in display_df.columns:
         column_config["TUITIONFEE_IN"] = st.column_config.NumberColumn("In-State Tuition", format="$%d")
-    if 'C150_4' in display_df.columns:
-        # Convert graduation rate from decimal to percentage for display
-        display_df['C150_4'] = display_df['C150_4'] * 100
-        column_config["C150_4"] = st.column_config.NumberColumn("Graduation Rate", format="%.1f%%")
-    if 'ADMCON7' in display_df.columns:
-        # Map ADMCON7 values to readable labels
-        policy_map = {
-            1: "Required",
-            2: "Recommended",
-            3: "Neither Required/Recommended",
-            4: "Unknown",
-            5: "Considered but not Required"
-        }
-        # Create a new column with the mapped values
-        display_df['Test_Policy'] = display_df['ADMCON7'].apply(
-            lambda x: policy_map.get(int(x), "Unknown") if pd.notna(x) else "Unknown"
-        )
-        # Add the column to the display and remove the raw ADMCON7 column
-        column_config["Test_Policy"] = st.column_config.TextColumn("Test Score Policy")
-        display_df = display_df.drop(columns=['ADMCON7'])
+    if 'C150_4_PCT' in display_df.columns:
+        column_config["C150_4_PCT"] = st.column_config.NumberColumn("Graduation Rate", format="%.1f%%")
+    if 'TEST_POLICY' in display_df.columns:
+        column_config["TEST_POLICY"] = st.column_config.TextColumn("Test Score Policy")
+    column_config["ROI_Pct"] = st.column_config.NumberColumn(
+        "ROI", format="%.0f%%", help="Net return as a percentage of cost, under the sidebar ROI assumptions"
+    )
+    column_config["ROI_Net"] = st.column_config.NumberColumn("Net Return", format="$%d")
+    column_config["ROI_Rank"] = st.column_config.NumberColumn("ROI Rank", format="%d")
 
     # Add a helper message
     st.info("✏️ Check the boxes to shortlist universities, then click 'Apply Changes' to save your selections.")
 
+    # Each page gets its own editor, so row edits never carry over to another page
+    editor_key = (
+        f"university_selector_{st.session_state.explore_table_version}_"
+        f"{sort_column}_{sort_order}_{page_size}_{page}"
+    )
+
     # Display the optimized data editor
-    edited_df = st.data_editor(
+    edited_df = data_editor(
         display_df,
-        key="university_selector",
+        key=editor_key,
         disabled=list(set(display_df.columns) - set(['Shortlist'])),
         hide_index=True,
         column_config=column_config,
@@ -222,34 +374,41 @@ def display_table_view(filtered_data):
         on_change=None  # Prevent automatic rerun on change
     )
 
+    # Record checkbox changes on this page as pending
+    saved = edited_df['UNITID'].isin(st.session_state.shortlisted_universities)
+    for unitid, checked, is_saved in zip(edited_df['UNITID'], edited_df['Shortlist'], saved):
+        if checked != is_saved:
+            pending[unitid] = bool(checked)
+        else:
+            pending.pop(unitid, None)
+
     # Add an apply button to save changes
     col1, col2 = st.columns([4, 1])
+    with col1:
+        if pending:
+            st.caption(f"{len(pending)} unsaved shortlist change(s) across pages")
     with col2:
         apply_changes = st.button("✅ Apply Changes", key="apply_shortlist_changes")
 
     # Process selections when apply button is clicked
-    if apply_changes and 'UNITID' in edited_df.columns:
-        # Get newly shortlisted universities
-        shortlisted_unitids = edited_df.loc[edited_df['Shortlist'], 'UNITID'].tolist()
-
-        # Get previously shortlisted universities
-        previously_shortlisted = set(st.session_state.shortlisted_universities)
-        newly_shortlisted = set(shortlisted_unitids) - previously_shortlisted
-        removed_from_shortlist = previously_shortlisted - set(shortlisted_unitids)
+    if apply_changes:
+        # Apply every pending change across pages as one diff, keeping the existing
+        # order and appending new universities
+        shortlist = st.session_state.shortlisted_universities
+        newly_shortlisted, removed_from_shortlist = shortlist.apply(
+            added=[unitid for unitid, checked in pending.items() if checked],
+            removed=[unitid for unitid, checked in pending.items() if not checked]
+        )
 
-        # Update shortlist and automatically select them for comparison
-        st.session_state.shortlisted_universities = shortlisted_unitids
-        st.session_state.selected_universities = shortlisted_unitids
+        # Automatically select the shortlist for comparison
+        selection = st.session_state.selected_universities
+        selection.apply(*selection.diff(shortlist))
 
         # Show confirmation with toast notifications
         if newly_shortlisted:
             # Show toast for newly added universities (up to 3)
-            added_names = []
-            for unitid in list(newly_shortlisted)[:3]:
-                uni_name = filtered_data.loc[filtered_data['UNITID'] == unitid, 'INSTNM'].iloc[0]
-                added_names.append(uni_name)
-
             if len(newly_shortlisted) <= 3:
+                added_names = filtered_data.loc[filtered_data['UNITID'].isin(newly_shortlisted), 'INSTNM']
                 for name in added_names:
                     st.toast(f"Added {name} to your shortlist", icon="✅")
             else:
@@ -257,17 +416,21 @@ def display_table_view(filtered_data):
 
         if removed_from_shortlist:
             # Show toast for removed universities
-            if len(removed_from_shortlist) == 1:
-                unitid = list(removed_from_shortlist)[0]
-                uni_name = filtered_data.loc[filtered_data['UNITID'] == unitid, 'INSTNM'].iloc[0]
-                st.toast(f"Removed {uni_name} from your shortlist", icon="🗑️")
+            removed_names = filtered_data.loc[filtered_data['UNITID'].isin(removed_from_shortlist), 'INSTNM']
+            if len(removed_from_shortlist) == 1 and len(removed_names) == 1:
+                st.toast(f"Removed {removed_names.iloc[0]} from your shortlist", icon="🗑️")
             else:
                 st.toast(f"Removed {len(removed_from_shortlist)} universities from your shortlist", icon="🗑️")
 
         # Store the last action for debugging
         st.session_state.last_shortlist_action = {
-            'shortlisted': shortlisted_unitids,
-            'selected': shortlisted_unitids  # Now selected is the same as shortlisted
+            'shortlisted': shortlist.to_list(),
+            'selected': shortlist.to_list()  # Now selected is the same as shortlisted
         }
 
+        # Start fresh page editors from the saved shortlist
+        st.session_state.explore_pending_shortlist = {}
+        st.session_state.explore_table_version += 1
+        st.rerun()
+
 # Originally, the institutions were returned as formatted, styled 'cards'. This was too slow to run, given the amount of them. At the end I decided to just do a 'smart' table.
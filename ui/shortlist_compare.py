@@ -3,20 +3,30 @@ Unified shortlist and compare functionality for Pathfinder.
 """
 
 import streamlit as st
+import numpy as np
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 from datetime import datetime
+from config import COMPARE_CARD_LIMIT, COMPARE_METRICS, SIMULATION_PARAMS, SIMULATION_PERCENTILES, SIMULATION_SCENARIOS
+from data_loader import get_comparison_panel, get_dataset_version, get_roi_simulation
+from perf import timed, plotly_chart, dataframe, data_editor
 from utils import (
-    get_download_link, add_to_shortlist, remove_from_shortlist,
-    set_selected_university, toggle_university_selection
+    display_export_button, add_to_shortlist, remove_from_shortlist,
+    set_selected_university, toggle_university_selection,
+    remove_from_shortlist_with_toast, queue_toast, show_pending_toasts
 )
 from ui import visualizations as viz
 
+@st.fragment
 def display_unified_shortlist_compare(data, historical_data, fos_data):
     """
     Displays a unified interface for shortlisted universities and comparison.
+
+    Runs as a fragment, so comparison changes rerun only this section instead of
+    reloading data and redrawing every chart in the app. Shortlist changes rerun the
+    whole app, since the Explore table and Find My Fit cards show the shortlist too.
     """
+    show_pending_toasts()
+
     # Create tabs within the unified interface
     inner_tabs = st.tabs(["📋 My Universities", "📊 Compare Selected"])
 
@@ -37,10 +47,10 @@ def display_shortlist_section(data, historical_data, fos_data):
         st.subheader("📋 My Universities")
     with col2:
         if st.button("🗑️ Clear Shortlist", key="clear_shortlist_button_unified"):
-            st.session_state.shortlisted_universities = []
-            st.session_state.selected_universities = []
-            st.toast(f'Cleared all universities from your shortlist', icon="🗑️")
-            st.rerun()
+            st.session_state.shortlisted_universities.clear()
+            st.session_state.selected_universities.clear()
+            queue_toast('Cleared all universities from your shortlist', icon="🗑️")
+            st.rerun(scope="app")
     #check if there are any shortlisted universities
     if not st.session_state.shortlisted_universities:
         st.info("You haven't shortlisted any universities yet. Explore universities and add them to your shortlist!")
@@ -48,13 +58,11 @@ def display_shortlist_section(data, historical_data, fos_data):
     #get data for shortlisted universities
     shortlist_df = data[data['UNITID'].isin(st.session_state.shortlisted_universities)].copy()
     with col3:
-        st.markdown(
-            get_download_link(
-                shortlist_df,
-                f"shortlisted_universities_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                "📥 Download Shortlist"
-            ),
-            unsafe_allow_html=True
+        display_export_button(
+            shortlist_df,
+            f"shortlisted_universities_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+            "📥 Download Shortlist",
+            key="download_shortlist"
         )
 
     # Display university cards with action buttons first
@@ -97,7 +105,7 @@ def display_shortlist_section(data, historical_data, fos_data):
             # Add admission rate if available
             adm_rate_text = ""
             if 'ADM_RATE' in uni and pd.notna(uni['ADM_RATE']):
-                adm_rate = uni['ADM_RATE'] * 100  # Convert to percentage
+                adm_rate = uni['ADM_RATE_PCT']
                 adm_rate_text = f"<span style='background-color: #f0f0f0; padding: 2px 6px; border-radius: 10px; font-size: 0.75rem; margin-left: 5px;'>{adm_rate:.1f}% admission</span>"
 
             # Add SAT score if available
@@ -129,23 +137,12 @@ def display_shortlist_section(data, historical_data, fos_data):
                     st.session_state.active_tab = "Details"
                     st.rerun()
             with col2:
-                # Define a function to remove with toast notification
-                def remove_with_toast(unitid, uni_name):
-                    # Remove from shortlist
-                    remove_from_shortlist(unitid)
-                    # Also remove from selected universities if present
-                    if unitid in st.session_state.selected_universities:
-                        st.session_state.selected_universities.remove(unitid)
-                    # Show toast notification
-                    st.toast(f"Removed {uni_name} from your shortlist", icon="🗑️")
-                    st.rerun()
-
                 # Add a remove button
                 if st.button("❌ Remove", key=f"shortlist_remove_{uni['UNITID']}_{i}",
-                           use_container_width=True,
-                           on_click=lambda unitid=uni['UNITID'], uni_name=uni['INSTNM']:
-                           remove_with_toast(unitid, uni_name)):
-                    pass
+                             use_container_width=True,
+                             on_click=remove_from_shortlist_with_toast,
+                             args=(uni['UNITID'], uni['INSTNM'])):
+                    st.rerun(scope="app")
 
     # Add a divider
     st.markdown("<hr style='margin: 30px 0; border: none; height: 1px; background-color: #e0e0e0;'>", unsafe_allow_html=True)
@@ -160,6 +157,11 @@ def display_shortlist_section(data, historical_data, fos_data):
     </div>
     """, unsafe_allow_html=True)
 
+    # Show the same columns as the Explore table, using the precomputed display columns
+    table_columns = ['UNITID', 'INSTNM', 'CITY', 'STABBR', 'CONTROL_TYPE', 'ADM_RATE_PCT',
+                     'SAT_AVG', 'TUITIONFEE_IN', 'C150_4_PCT', 'TEST_POLICY']
+    shortlist_df = shortlist_df[[col for col in table_columns if col in shortlist_df.columns]]
+
     # Add a 'Select' column for comparison
     shortlist_df.insert(0, 'Select', shortlist_df['UNITID'].isin(st.session_state.selected_universities))
 
@@ -183,37 +185,19 @@ def display_shortlist_section(data, historical_data, fos_data):
     }
 
     # Add numeric columns with formatting if they exist
-    if 'ADM_RATE' in shortlist_df.columns:
-        # Convert admission rate from decimal to percentage for display
-        shortlist_df['ADM_RATE'] = shortlist_df['ADM_RATE'] * 100
-        column_config["ADM_RATE"] = st.column_config.NumberColumn("Admission Rate", format="%.1f%%")
+    if 'ADM_RATE_PCT' in shortlist_df.columns:
+        column_config["ADM_RATE_PCT"] = st.column_config.NumberColumn("Admission Rate", format="%.1f%%")
     if 'SAT_AVG' in shortlist_df.columns:
         column_config["SAT_AVG"] = st.column_config.NumberColumn("Avg SAT")
     if 'TUITIONFEE_IN' in shortlist_df.columns:
         column_config["TUITIONFEE_IN"] = st.column_config.NumberColumn("In-State Tuition", format="$%d")
-    if 'C150_4' in shortlist_df.columns:
-        # Convert graduation rate from decimal to percentage for display
-        shortlist_df['C150_4'] = shortlist_df['C150_4'] * 100
-        column_config["C150_4"] = st.column_config.NumberColumn("Graduation Rate", format="%.1f%%")
-    if 'ADMCON7' in shortlist_df.columns:
-        # Map ADMCON7 values to readable labels
-        policy_map = {
-            1: "Required",
-            2: "Recommended",
-            3: "Neither Required/Recommended",
-            4: "Unknown",
-            5: "Considered but not Required"
-        }
-        # Create a new column with the mapped values
-        shortlist_df['Test_Policy'] = shortlist_df['ADMCON7'].apply(
-            lambda x: policy_map.get(int(x), "Unknown") if pd.notna(x) else "Unknown"
-        )
-        # Add the column to the display and remove the raw ADMCON7 column
-        column_config["Test_Policy"] = st.column_config.TextColumn("Test Score Policy")
-        shortlist_df = shortlist_df.drop(columns=['ADMCON7'])
+    if 'C150_4_PCT' in shortlist_df.columns:
+        column_config["C150_4_PCT"] = st.column_config.NumberColumn("Graduation Rate", format="%.1f%%")
+    if 'TEST_POLICY' in shortlist_df.columns:
+        column_config["TEST_POLICY"] = st.column_config.TextColumn("Test Score Policy")
 
     # Display the data editor
-    edited_df = st.data_editor(
+    edited_df = data_editor(
         shortlist_df,
         key="shortlist_editor",
         disabled=list(set(shortlist_df.columns) - set(['Select'])),
@@ -232,19 +216,15 @@ def display_shortlist_section(data, historical_data, fos_data):
         # Get selected universities based on the 'Select' column
         selected_unitids = edited_df.loc[edited_df['Select'], 'UNITID'].tolist()
 
-        # Get previously selected universities
-        previously_selected = set(st.session_state.selected_universities)
-        newly_selected = set(selected_unitids) - previously_selected
-        removed_from_selection = previously_selected - set(selected_unitids)
-
-        # Update selected universities in session state
-        st.session_state.selected_universities = selected_unitids
+        # Diff against the previous selection, then apply the changes in place
+        selection = st.session_state.selected_universities
+        newly_selected, removed_from_selection = selection.apply(*selection.diff(selected_unitids))
 
         # Show toast notifications for changes
         if newly_selected:
             # Show toast for newly selected universities (up to 3)
             added_names = []
-            for unitid in list(newly_selected)[:3]:
+            for unitid in newly_selected[:3]:
                 uni_name = shortlist_df.loc[shortlist_df['UNITID'] == unitid, 'INSTNM'].iloc[0]
                 added_names.append(uni_name)
 
@@ -257,15 +237,15 @@ def display_shortlist_section(data, historical_data, fos_data):
         if removed_from_selection:
             # Show toast for removed universities
             if len(removed_from_selection) == 1:
-                unitid = list(removed_from_selection)[0]
+                unitid = removed_from_selection[0]
                 uni_name = shortlist_df.loc[shortlist_df['UNITID'] == unitid, 'INSTNM'].iloc[0]
                 st.toast(f"Removed {uni_name} from comparison", icon="🗑️")
             else:
                 st.toast(f"Removed {len(removed_from_selection)} universities from comparison", icon="🗑️")
 
         # Show confirmation
+        # The comparison below reads the updated selection, so no rerun is needed
         st.success(f"✅ Updated: {len(selected_unitids)} universities selected for comparison")
-        st.rerun()
 
 
 
@@ -273,6 +253,9 @@ def display_comparison_section(selected_universities, data, historical_data, fos
     """
     Displays a comparison of selected universities.
     """
+    # Only import the figure classes once a comparison is drawn
+    import plotly.graph_objects as go
+
     st.header("⚖️ University Comparison")
 
     # Check if there are any selected universities
@@ -280,12 +263,24 @@ def display_comparison_section(selected_universities, data, historical_data, fos
         st.info("Select universities to compare by checking the 'Compare' box in the My Universities tab.")
         return
 
-    # Get data for selected universities
-    selected_df = data[data['UNITID'].isin(selected_universities)].copy()
+    # Rows and trend matrices for the selection, built once until the selection changes
+    with timed("comparison_panel", "compare"):
+        panel = get_comparison_panel(tuple(selected_universities), get_dataset_version(), data, historical_data)
+    selected_df = panel.table
 
     # Display comparison visualizations
     st.subheader(f"Comparing {len(selected_df)} Universities")
 
+    # Cards and per-university traces stop being readable past a handful of universities
+    compact = st.toggle(
+        "Compact view",
+        value=len(panel) > COMPARE_CARD_LIMIT,
+        help="Ranked heatmap and table with one trace per trend chart. Suited to large selections."
+    )
+    if compact:
+        display_compact_comparison(panel, data)
+        return
+
     # Create tabs for different comparison categories
     comp_tabs = st.tabs(["📊 Overview", "💰 Cost", "🎓 Academics", "📈 Outcomes"])
 
@@ -310,7 +305,7 @@ def display_comparison_section(selected_universities, data, historical_data, fos
             'UGDS': 'Undergraduate Enrollment'
         })
 
-        st.dataframe(overview_df, use_container_width=True)
+        dataframe(overview_df, use_container_width=True)
 
         # Add enrollment visualization
         if 'UGDS' in selected_df.columns:
@@ -321,31 +316,17 @@ def display_comparison_section(selected_universities, data, historical_data, fos
             enrollment_df = selected_df[['INSTNM', 'UGDS']].copy()
             enrollment_df = enrollment_df.sort_values('UGDS', ascending=False)
             enrollment_df.columns = ['University', 'Undergraduate Enrollment']
-            enrollment_df['Undergraduate Enrollment'] = enrollment_df['Undergraduate Enrollment'].apply(lambda x: f"{int(x):,}")
+            enrollment_df['Undergraduate Enrollment'] = enrollment_df['Undergraduate Enrollment'].apply(lambda x: f"{int(x):,}" if pd.notna(x) else "N/A")
 
-            st.dataframe(enrollment_df, use_container_width=True, hide_index=True)
+            dataframe(enrollment_df, use_container_width=True, hide_index=True)
 
             # Display historical enrollment trends using the new function
-            viz.plot_enrollment_trend(selected_df, historical_data)
+            viz.plot_enrollment_trend(panel.trend('UGDS'), panel.names)
 
         # Add test score policy comparison if available
         if 'ADMCON7' in selected_df.columns:
             st.markdown("### Test Score Policy Comparison")
 
-            # Map ADMCON7 values to readable labels
-            policy_map = {
-                1: "Required",
-                2: "Recommended",
-                3: "Neither Required nor Recommended",
-                4: "Unknown",
-                5: "Considered but not Required"
-            }
-
-            # Create a new column with the mapped values
-            selected_df['Test_Policy'] = selected_df['ADMCON7'].apply(
-                lambda x: policy_map.get(int(x), "Unknown") if pd.notna(x) else "Unknown"
-            )
-
             # Create a more visually appealing representation
             st.markdown("#### Test Score Policies")
 
@@ -363,27 +344,7 @@ def display_comparison_section(selected_universities, data, historical_data, fos
                     """, unsafe_allow_html=True)
 
                     # Use the reusable function for test policy card
-                    # We need to convert the Test_Policy back to ADMCON7 value
-                    if 'ADMCON7' in uni:
-                        viz.plot_test_policy_card(uni, key_prefix=f"compare_test_{i}")
-                    elif 'Test_Policy' in uni:
-                        # Map the text policy back to ADMCON7 value
-                        policy_to_admcon = {
-                            "Required": 1,
-                            "Recommended": 2,
-                            "Neither Required nor Recommended": 3,
-                            "Do not know": 4,
-                            "Considered but not Required": 5,
-                            "Unknown": 4
-                        }
-
-                        # Create a copy of the uni Series to avoid modifying the original
-                        uni_copy = uni.copy()
-                        if uni['Test_Policy'] in policy_to_admcon:
-                            uni_copy['ADMCON7'] = policy_to_admcon[uni['Test_Policy']]
-                            viz.plot_test_policy_card(uni_copy, key_prefix=f"compare_test_{i}")
-                        else:
-                            st.info("Test score policy information not available.")
+                    viz.plot_test_policy_card(uni, key_prefix=f"compare_test_{i}")
 
     # Cost Tab
     with comp_tabs[1]:
@@ -434,50 +395,12 @@ def display_comparison_section(selected_universities, data, historical_data, fos
             # Add a historical tuition trend chart
             st.markdown("#### Tuition Trends")
 
-            if not historical_data.empty:
-                # Create a line chart for tuition trends
-                fig = go.Figure()
-
-                # Add data for each university
-                for _, uni in selected_df.iterrows():
-                    uni_id = uni['UNITID']
-                    uni_name = uni['INSTNM']
-
-                    # Get historical data for this university
-                    uni_history = historical_data[historical_data['UNITID'] == uni_id].copy()
-
-                    if not uni_history.empty and 'TUITIONFEE_IN' in uni_history.columns:
-                        # Get the data sorted by year
-                        tuition_trend = uni_history[['YEAR', 'TUITIONFEE_IN']].dropna().sort_values('YEAR')
-
-                        if not tuition_trend.empty and len(tuition_trend) > 1:
-                            # Add a line for this university
-                            fig.add_trace(go.Scatter(
-                                x=tuition_trend['YEAR'],
-                                y=tuition_trend['TUITIONFEE_IN'],
-                                mode='lines+markers',
-                                name=f"{uni_name} (In-State)",
-                                line=dict(width=2),
-                                hovertemplate='%{y:$,.0f}'
-                            ))
-
-                # Improve layout
-                fig.update_layout(
-                    title="In-State Tuition Trends",
-                    xaxis_title="Year",
-                    yaxis_title="Tuition ($)",
-                    yaxis_tickformat="$,.0f",
-                    legend=dict(
-                        orientation="h",
-                        yanchor="bottom",
-                        y=1.02,
-                        xanchor="right",
-                        x=1
-                    )
+            if panel.trends:
+                plot_comparison_trend(
+                    panel, 'TUITIONFEE_IN', "In-State Tuition Trends", "Tuition ($)",
+                    hovertemplate='%{y:$,.0f}', name_suffix=" (In-State)", yaxis_tickformat="$,.0f"
                 )
 
-                st.plotly_chart(fig, use_container_width=True)
-
     # Academics Tab
     with comp_tabs[2]:
         st.markdown("### Academic Comparison")
@@ -502,56 +425,13 @@ def display_comparison_section(selected_universities, data, historical_data, fos
                     viz.plot_admission_rate_card(uni, key_prefix=f"compare_{i}")
 
             # Add historical admission rate trend
-            if not historical_data.empty:
+            if panel.trends:
                 st.markdown("#### Admission Rate Trends")
-
-                # Create a line chart for admission rate trends
-                fig = go.Figure()
-
-                # Add data for each university
-                for _, uni in selected_df.iterrows():
-                    uni_id = uni['UNITID']
-                    uni_name = uni['INSTNM']
-
-                    # Get historical data for this university
-                    uni_history = historical_data[historical_data['UNITID'] == uni_id].copy()
-
-                    if not uni_history.empty and 'ADM_RATE' in uni_history.columns:
-                        # Get the data sorted by year
-                        adm_trend = uni_history[['YEAR', 'ADM_RATE']].dropna().sort_values('YEAR')
-
-                        if not adm_trend.empty and len(adm_trend) > 1:
-                            # Convert to percentage
-                            adm_trend['ADM_RATE'] = adm_trend['ADM_RATE'] * 100
-
-                            # Add a line for this university
-                            fig.add_trace(go.Scatter(
-                                x=adm_trend['YEAR'],
-                                y=adm_trend['ADM_RATE'],
-                                mode='lines+markers',
-                                name=uni_name,
-                                line=dict(width=2),
-                                hovertemplate='%{y:.1f}%'
-                            ))
-
-                # Improve layout
-                fig.update_layout(
-                    title="Admission Rate Trends",
-                    xaxis_title="Year",
-                    yaxis_title="Admission Rate (%)",
-                    yaxis_tickformat=".1f%",
-                    height=500,
-                    legend=dict(
-                        orientation="h",
-                        yanchor="bottom",
-                        y=1.02,
-                        xanchor="right",
-                        x=1
-                    )
+                plot_comparison_trend(
+                    panel, 'ADM_RATE', "Admission Rate Trends", "Admission Rate (%)",
+                    hovertemplate='%{y:.1f}%', scale=100, yaxis_tickformat=".1f%", height=500
                 )
 
-                st.plotly_chart(fig, use_container_width=True)
-
         # Test score comparison
         if 'SAT_AVG' in selected_df.columns:
             st.markdown("#### SAT Score Comparison")
@@ -619,55 +499,16 @@ def display_comparison_section(selected_universities, data, historical_data, fos
                 yaxis_range=[800, 1600]  # SAT score range
             )
 
-            st.plotly_chart(fig, use_container_width=True)
+            plotly_chart(fig, use_container_width=True)
 
             # Add historical SAT score trend
-            if not historical_data.empty:
+            if panel.trends:
                 st.markdown("#### SAT Score Trends")
-
-                # Create a line chart for SAT score trends
-                fig = go.Figure()
-
-                # Add data for each university
-                for _, uni in selected_df.iterrows():
-                    uni_id = uni['UNITID']
-                    uni_name = uni['INSTNM']
-
-                    # Get historical data for this university
-                    uni_history = historical_data[historical_data['UNITID'] == uni_id].copy()
-
-                    if not uni_history.empty and 'SAT_AVG' in uni_history.columns:
-                        # Get the data sorted by year
-                        sat_trend = uni_history[['YEAR', 'SAT_AVG']].dropna().sort_values('YEAR')
-
-                        if not sat_trend.empty and len(sat_trend) > 1:
-                            # Add a line for this university
-                            fig.add_trace(go.Scatter(
-                                x=sat_trend['YEAR'],
-                                y=sat_trend['SAT_AVG'],
-                                mode='lines+markers',
-                                name=uni_name,
-                                line=dict(width=2),
-                                hovertemplate='%{y:.0f}'
-                            ))
-
-                # Improve layout
-                fig.update_layout(
-                    title="SAT Score Trends",
-                    xaxis_title="Year",
-                    yaxis_title="Average SAT Score",
-                    height=500,
-                    legend=dict(
-                        orientation="h",
-                        yanchor="bottom",
-                        y=1.02,
-                        xanchor="right",
-                        x=1
-                    )
+                plot_comparison_trend(
+                    panel, 'SAT_AVG', "SAT Score Trends", "Average SAT Score",
+                    hovertemplate='%{y:.0f}', height=500
                 )
 
-                st.plotly_chart(fig, use_container_width=True)
-
     # Outcomes Tab
     with comp_tabs[3]:
         st.markdown("### Outcomes Comparison")
@@ -692,56 +533,13 @@ def display_comparison_section(selected_universities, data, historical_data, fos
                     viz.outcomes.plot_graduation_rate_card(uni, key_prefix=f"compare_grad_{i}")
 
             # Add historical graduation rate trend
-            if not historical_data.empty:
+            if panel.trends:
                 st.markdown("#### Graduation Rate Trends")
-
-                # Create a line chart for graduation rate trends
-                fig = go.Figure()
-
-                # Add data for each university
-                for _, uni in selected_df.iterrows():
-                    uni_id = uni['UNITID']
-                    uni_name = uni['INSTNM']
-
-                    # Get historical data for this university
-                    uni_history = historical_data[historical_data['UNITID'] == uni_id].copy()
-
-                    if not uni_history.empty and 'C150_4' in uni_history.columns:
-                        # Get the data sorted by year
-                        grad_trend = uni_history[['YEAR', 'C150_4']].dropna().sort_values('YEAR')
-
-                        if not grad_trend.empty and len(grad_trend) > 1:
-                            # Convert to percentage
-                            grad_trend['C150_4'] = grad_trend['C150_4'] * 100
-
-                            # Add a line for this university
-                            fig.add_trace(go.Scatter(
-                                x=grad_trend['YEAR'],
-                                y=grad_trend['C150_4'],
-                                mode='lines+markers',
-                                name=uni_name,
-                                line=dict(width=2),
-                                hovertemplate='%{y:.1f}%'
-                            ))
-
-                # Improve layout
-                fig.update_layout(
-                    title="Graduation Rate Trends",
-                    xaxis_title="Year",
-                    yaxis_title="Graduation Rate (%)",
-                    yaxis_tickformat=".1f%",
-                    height=500,
-                    legend=dict(
-                        orientation="h",
-                        yanchor="bottom",
-                        y=1.02,
-                        xanchor="right",
-                        x=1
-                    )
+                plot_comparison_trend(
+                    panel, 'C150_4', "Graduation Rate Trends", "Graduation Rate (%)",
+                    hovertemplate='%{y:.1f}%', scale=100, yaxis_tickformat=".1f%", height=500
                 )
 
-                st.plotly_chart(fig, use_container_width=True)
-
         # Financial outcomes
         if 'MD_EARN_WNE_P10' in selected_df.columns or 'DEBT_MDN' in selected_df.columns:
             st.markdown("#### Financial Outcomes")
@@ -790,4 +588,211 @@ def display_comparison_section(selected_universities, data, historical_data, fos
             # Use the reusable function for detailed debt comparison
             viz.outcomes.plot_detailed_debt_comparison(selected_df)
 
+        # Simulated ranges behind the single-number ROI
+        display_roi_simulation(panel, data)
+
+def plot_comparison_trend(panel, metric, title, yaxis_title, hovertemplate, scale=1, name_suffix="", **layout):
+    """
+    Draws one line per university from the panel's years x universities matrix for metric.
+    """
+    import plotly.graph_objects as go
+
+    trend = panel.trend(metric) * scale
+    fig = go.Figure()
+    for unitid in trend.columns:
+        series = trend[unitid].dropna()
+        # Only universities with at least two reported years get a line
+        if len(series) > 1:
+            fig.add_trace(go.Scatter(
+                x=series.index,
+                y=series.to_numpy(),
+                mode='lines+markers',
+                name=f"{panel.names[unitid]}{name_suffix}",
+                line=dict(width=2),
+                hovertemplate=hovertemplate
+            ))
+
+    # Improve layout
+    fig.update_layout(
+        title=title,
+        xaxis_title="Year",
+        yaxis_title=yaxis_title,
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        ),
+        **layout
+    )
+
+    plotly_chart(fig, use_container_width=True)
+
+# Trend charts in the compact view: metric -> (title, scale)
+COMPACT_TRENDS = {
+    'UGDS': ("Undergraduate Enrollment", 1),
+    'TUITIONFEE_IN': ("In-State Tuition ($)", 1),
+    'ADM_RATE': ("Admission Rate (%)", 100),
+    'SAT_AVG': ("Average SAT Score", 1),
+    'C150_4': ("Graduation Rate (%)", 100)
+}
+
+def display_compact_comparison(panel, data):
+    """
+    Compares any number of universities with a ranked heatmap, a sortable table and
+    small-multiple trend charts, all drawn from the panel's precomputed arrays.
+    """
+    if panel.metrics.empty:
+        st.info("No comparable metrics are available for the selected universities.")
+        return
+
+    labels = [COMPARE_METRICS[column][0] for column in panel.metrics.columns]
+
+    # Row order for the heatmap: selection order or best first on one metric
+    sort_by = st.selectbox("Order universities by", ["Selection order"] + labels, key="compare_compact_sort")
+    if sort_by == "Selection order":
+        order = np.arange(len(panel))
+    else:
+        ranks = panel.ranks.iloc[:, labels.index(sort_by)].to_numpy()
+        order = np.argsort(np.where(np.isnan(ranks), np.inf, ranks), kind='stable')
+
+    st.markdown("### Metric Ranks")
+    st.caption("Colour shows each university's standing within this selection on each metric; green is best.")
+    plot_rank_heatmap(panel, labels, order)
+
+    st.markdown("### Ranked Metrics")
+    st.caption("Click a column header to sort. Rank 1 is the best value in this selection.")
+    ranked = pd.DataFrame({'University': panel.table['INSTNM'].to_numpy()})
+    column_config = {}
+    for column, label in zip(panel.metrics.columns, labels):
+        ranked[label] = panel.metrics[column].to_numpy()
+        ranked[f"{label} rank"] = panel.ranks[column].to_numpy()
+        column_config[label] = st.column_config.NumberColumn(format="%.1f" if "%" in label else "%d")
+        column_config[f"{label} rank"] = st.column_config.NumberColumn(format="%d")
+    dataframe(ranked, use_container_width=True, hide_index=True, column_config=column_config)
+
+    display_roi_simulation(panel, data)
+
+    st.markdown("### Trends")
+    plot_trend_small_multiples(panel)
+
+def plot_rank_heatmap(panel, labels, order):
+    """
+    Draws universities x metrics as one heatmap coloured by the panel's 0-1 scores.
+    """
+    import plotly.graph_objects as go
+
+    scores = panel.scores.to_numpy()[order]
+    values = panel.metrics.to_numpy()[order]
+    ranks = panel.ranks.to_numpy()[order]
+    names = panel.table['INSTNM'].to_numpy()[order]
+
+    # Cell labels; percentages keep one decimal, everything else is a whole number
+    decimals = np.array([1 if "%" in label else 0 for label in labels])
+    text = [
+        ["N/A" if np.isnan(value) else f"{value:,.{digits}f}" for value, digits in zip(row, decimals)]
+        for row in values
+    ]
+
+    # Rows are positions, so universities that share a name keep separate rows
+    rows = np.arange(len(order))
+    fig = go.Figure(go.Heatmap(
+        z=scores,
+        x=labels,
+        y=rows,
+        text=text,
+        texttemplate="%{text}" if len(order) <= 30 else None,
+        customdata=np.dstack([np.broadcast_to(names[:, None], ranks.shape), ranks]),
+        colorscale="RdYlGn",
+        zmin=0,
+        zmax=1,
+        showscale=False,
+        hovertemplate="%{customdata[0]}<br>%{x}: %{text}<br>Rank %{customdata[1]}<extra></extra>"
+    ))
+    fig.update_layout(
+        height=120 + 26 * len(order),
+        margin=dict(l=10, r=10, t=40, b=10),
+        xaxis=dict(side="top"),
+        yaxis=dict(tickvals=rows, ticktext=names, autorange="reversed")
+    )
+    plotly_chart(fig, use_container_width=True)
 
+def plot_trend_small_multiples(panel):
+    """
+    Draws one chart per trend metric on a shared year axis, each chart a single trace
+    holding every university's line.
+    """
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+
+    metrics = [metric for metric in COMPACT_TRENDS if metric in panel.lines]
+    if not metrics:
+        st.info("No historical data is available for the selected universities.")
+        return
+
+    n_rows = (len(metrics) + 1) // 2
+    fig = make_subplots(
+        rows=n_rows, cols=2, shared_xaxes=True,
+        subplot_titles=[COMPACT_TRENDS[metric][0] for metric in metrics],
+        vertical_spacing=0.12 / n_rows + 0.04
+    )
+    names = panel.table['INSTNM'].to_numpy()
+    for i, metric in enumerate(metrics):
+        x, y, positions = panel.lines[metric]
+        fig.add_trace(go.Scattergl(
+            x=x,
+            y=y * COMPACT_TRENDS[metric][1],
+            customdata=names[positions],
+            mode='lines+markers',
+            line=dict(width=1),
+            marker=dict(size=4),
+            opacity=0.6,
+            showlegend=False,
+            hovertemplate="%{customdata}<br>%{x}: %{y:,.1f}<extra></extra>"
+        ), row=i // 2 + 1, col=i % 2 + 1)
+
+    fig.update_layout(height=280 * n_rows, margin=dict(l=10, r=10, t=40, b=10))
+    plotly_chart(fig, use_container_width=True)
+
+def display_roi_simulation(panel, data):
+    """
+    Displays simulated net return and years-to-repay bands for the selection, under the
+    sidebar ROI assumptions.
+    """
+    low, mid, high = SIMULATION_PERCENTILES[0], SIMULATION_PERCENTILES[len(SIMULATION_PERCENTILES) // 2], SIMULATION_PERCENTILES[-1]
+    st.markdown("### Range of Financial Outcomes", help=(
+        f"{SIMULATION_SCENARIOS:,} simulated students per university, varying completion (from the "
+        f"graduation rate), starting salary, salary growth and debt. Bands run from P{low} to "
+        f"P{high}; the marker is P{mid}. Repayment assumes "
+        f"{SIMULATION_PARAMS['repayment_share']:.0%} of salary at {SIMULATION_PARAMS['loan_rate']:.1%} interest."
+    ))
+
+    with timed("roi_simulation", "compare"):
+        simulation = get_roi_simulation(
+            tuple(panel.unitids), st.session_state.roi_assumptions, get_dataset_version(), data
+        )
+    simulation = simulation[simulation[f'Net_P{mid}'].notna()]
+    if simulation.empty:
+        st.info("Not enough cost and earnings data to simulate outcomes for the selected universities.")
+        return
+
+    viz.plot_roi_simulation(simulation, panel.names)
+
+    # Summary table; repayments past the cap read as "30+"
+    max_years = SIMULATION_PARAMS['max_repay_years']
+    summary = pd.DataFrame({
+        'University': [panel.names[unitid] for unitid in simulation.index],
+        **{f'Net Return (P{p})': simulation[f'Net_P{p}'].to_numpy() for p in (low, mid, high)},
+        f'Years to Repay (P{mid})': [
+            "N/A" if np.isnan(years) else (f"{max_years}+" if np.isinf(years) else f"{years:.1f}")
+            for years in simulation[f'Repay_P{mid}']
+        ],
+        'Repaid Within Cap': simulation['Repaid_Share'].to_numpy() * 100
+    })
+    dataframe(summary, use_container_width=True, hide_index=True, column_config={
+        **{f'Net Return (P{p})': st.column_config.NumberColumn(format="$%d") for p in (low, mid, high)},
+        'Repaid Within Cap': st.column_config.NumberColumn(
+            f"Repaid Within {max_years} Years", format="%.0f%%"
+        )
+    })
@@ -1,49 +1,73 @@
 """
 Visualization modules for the Pathfinder application.
+
+Plotting functions are imported lazily: a submodule, and Plotly Express with it,
+is only loaded the first time one of its functions is looked up (PEP 562).
 """
 
-from ui.visualizations.academic import (
-    plot_selectivity_scatter,
-    plot_sat_distribution,
-    plot_test_policy_distribution,
-    plot_test_scores_trend,
-    plot_admission_trend,
-    plot_enrollment_trend,
-    plot_admission_rate_card,
-    plot_test_policy_card,
-    plot_sat_score_card,
-    plot_act_score_card
-)
+import importlib
 
-from ui.visualizations.cost import (
-    plot_tuition_distribution,
-    plot_tuition_vs_size,
-    plot_state_tuition_comparison,
-    plot_net_price,
-    plot_tuition_trend
-)
+# Plotting function name -> submodule that defines it
+_EXPORTS = {
+    'academic': [
+        'plot_selectivity_scatter',
+        'plot_sat_distribution',
+        'plot_test_policy_distribution',
+        'plot_test_scores_trend',
+        'plot_admission_trend',
+        'plot_enrollment_trend',
+        'plot_admission_rate_card',
+        'plot_test_policy_card',
+        'plot_sat_score_card',
+        'plot_act_score_card'
+    ],
+    'cost': [
+        'plot_tuition_distribution',
+        'plot_tuition_vs_size',
+        'plot_state_tuition_comparison',
+        'plot_net_price',
+        'plot_tuition_trend'
+    ],
+    'outcomes': [
+        'plot_graduation_rate_histogram',
+        'plot_debt_earnings_scatter',
+        'plot_graduation_trend',
+        'plot_detailed_debt',
+        'plot_debt_comparison',
+        'plot_graduation_rate_card',
+        'plot_detailed_debt_comparison',
+        'plot_admission_debt_earnings_ratio',
+        'plot_roi_simulation'
+    ],
+    'institution': [
+        'plot_control_type_distribution',
+        'plot_institution_size_distribution'
+    ],
+    'diversity': [
+        'plot_diversity_composition',
+        'plot_diversity_comparison_by_control',
+        'plot_gender_comparison',
+        'plot_gender_ratio_by_type',
+        'plot_staff_diversity_composition',
+        'plot_staff_gender_ratio_by_type'
+    ]
+}
+_MODULES = {name: module for module, names in _EXPORTS.items() for name in names}
 
-from ui.visualizations.outcomes import (
-    plot_graduation_rate_histogram,
-    plot_debt_earnings_scatter,
-    plot_graduation_trend,
-    plot_detailed_debt,
-    plot_debt_comparison,
-    plot_graduation_rate_card,
-    plot_detailed_debt_comparison,
-    plot_admission_debt_earnings_ratio
-)
+__all__ = list(_MODULES)
 
-from ui.visualizations.institution import (
-    plot_control_type_distribution,
-    plot_institution_size_distribution
-)
+def __getattr__(name):
+    """
+    Import the submodule defining name, or named name, on first access and cache it here.
+    """
+    if name in _EXPORTS:
+        # Importing a submodule binds it as an attribute of this package
+        return importlib.import_module(f"{__name__}.{name}")
+    if name not in _MODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f"{__name__}.{_MODULES[name]}"), name)
+    globals()[name] = value
+    return value
 
-from ui.visualizations.diversity import (
-    plot_diversity_composition,
-    plot_diversity_comparison_by_control,
-    plot_gender_comparison,
-    plot_gender_ratio_by_type,
-    plot_staff_diversity_composition,
-    plot_staff_gender_ratio_by_type
-)
+def __dir__():
+    return sorted(set(globals()) | set(__all__) | set(_EXPORTS))
@@ -6,8 +6,11 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
+from core.binning import compute_box_stats
+from ui.visualizations.common import scatter_render_mode, density_heatmap
+from perf import cached, plotly_chart
 
-@st.cache_data(ttl=300)
+@cached("chart", ttl=300)
 def plot_selectivity_scatter(filtered_data):
     """
     Create a scatter plot of admission rate vs. SAT score.
@@ -35,22 +38,31 @@ def plot_selectivity_scatter(filtered_data):
         plot_data['ADM_RATE_DISPLAY'] = plot_data['ADM_RATE'] * 100
 
     if not plot_data.empty:
-        # Create scatter plot with improved handling of data points
-        fig = px.scatter(
-            plot_data,
-            x='ADM_RATE',
-            y='SAT_AVG',
-            color='CONTROL_TYPE',
-            hover_name='INSTNM',
-            hover_data={
-                'ADM_RATE': ':.1%',  # Format as percentage in hover
-                'SAT_AVG': True,
-                'CONTROL_TYPE': True,
-                'ADM_RATE_DISPLAY': False  # Hide this from hover
-            },
-            title="Selectivity Landscape",
-            labels={'ADM_RATE': 'Admission Rate', 'SAT_AVG': 'Average SAT Score', 'CONTROL_TYPE': 'Type'}
-        )
+        render_mode = scatter_render_mode(len(plot_data))
+
+        if render_mode == 'density':
+            # Too many points to draw individually, show a server-computed density instead
+            st.caption(f"Showing the density of {len(plot_data):,} institutions. Narrow your filters to see individual universities.")
+            fig = density_heatmap(plot_data['ADM_RATE'], plot_data['SAT_AVG'])
+            fig.update_layout(title="Selectivity Landscape")
+        else:
+            # Create scatter plot with improved handling of data points
+            fig = px.scatter(
+                plot_data,
+                x='ADM_RATE',
+                y='SAT_AVG',
+                color='CONTROL_TYPE',
+                hover_name='INSTNM',
+                hover_data={
+                    'ADM_RATE': ':.1%',  # Format as percentage in hover
+                    'SAT_AVG': True,
+                    'CONTROL_TYPE': True,
+                    'ADM_RATE_DISPLAY': False  # Hide this from hover
+                },
+                title="Selectivity Landscape",
+                labels={'ADM_RATE': 'Admission Rate', 'SAT_AVG': 'Average SAT Score', 'CONTROL_TYPE': 'Type'},
+                render_mode=render_mode
+            )
 
         # Improve layout with better formatting
         fig.update_layout(
@@ -62,12 +74,12 @@ def plot_selectivity_scatter(filtered_data):
         )
 
         # Add more data points to the plot
-        st.plotly_chart(fig, use_container_width=True)
+        plotly_chart(fig, use_container_width=True)
 
     else:
         st.info("Insufficient data for Admission Rate vs. SAT Score plot with current filters.")
 
-@st.cache_data(ttl=300)
+@cached("chart", ttl=300)
 def plot_sat_distribution(filtered_data):
     """
     Create a box plot of SAT score distribution by institution type.
@@ -87,31 +99,39 @@ def plot_sat_distribution(filtered_data):
     plot_data = filtered_data.dropna(subset=['SAT_AVG', 'CONTROL_TYPE'])
 
     if not plot_data.empty:
-        fig = px.box(
-            plot_data,
-            x='CONTROL_TYPE',
-            y='SAT_AVG',
-            title="SAT Score Distribution by Institution Type",
-            labels={'CONTROL_TYPE': 'Institution Type', 'SAT_AVG': 'Average SAT Score'},
-            color='CONTROL_TYPE'
-        )
-
-        # Add individual points for better visibility
-        fig.update_traces(boxpoints='all', jitter=0.3, pointpos=-1.8)
+        # Compute the box statistics on the server instead of sending every point
+        fig = go.Figure()
+        for control_type, group in plot_data.groupby('CONTROL_TYPE'):
+            stats = compute_box_stats(group['SAT_AVG'].to_numpy())
+            if stats is None:
+                continue
+
+            fig.add_trace(go.Box(
+                x=[control_type],
+                q1=[stats['q1']],
+                median=[stats['median']],
+                q3=[stats['q3']],
+                lowerfence=[stats['lowerfence']],
+                upperfence=[stats['upperfence']],
+                mean=[stats['mean']],
+                name=control_type,
+                hovertext=f"{stats['count']} institutions"
+            ))
 
         fig.update_layout(
+            title="SAT Score Distribution by Institution Type",
             xaxis_title="Institution Type",
             yaxis_title="Average SAT Score",
             yaxis_range=[700, 1600],
             height=550
         )
 
-        st.plotly_chart(fig, use_container_width=True)
+        plotly_chart(fig, use_container_width=True)
 
     else:
         st.info("Insufficient data for SAT Score distribution plot.")
 
-@st.cache_data(ttl=300)
+@cached("chart", ttl=300)
 def plot_test_policy_distribution(filtered_data):
     """
     Create a pie chart showing the distribution of test score policies.
@@ -131,20 +151,8 @@ def plot_test_policy_distribution(filtered_data):
     plot_data = filtered_data.dropna(subset=['ADMCON7'])
 
     if not plot_data.empty:
-        # Map ADMCON7 values to readable labels
-        policy_map = {
-            1: "Required",
-            2: "Recommended",
-            3: "Neither Required nor Recommended",
-            4: "Do not know",
-            5: "Considered but not Required"
-        }
-
-        # Convert ADMCON7 to integer and map to labels
-        plot_data['Test Score Policy'] = plot_data['ADMCON7'].astype(int).map(policy_map)
-
-        # Count universities by policy
-        policy_counts = plot_data['Test Score Policy'].value_counts().reset_index()
+        # Count universities by policy, using the labels precomputed at load time
+        policy_counts = plot_data['TEST_POLICY'].astype(str).value_counts().reset_index()
         policy_counts.columns = ['Test Score Policy', 'Count']
 
         # Create the pie chart
@@ -163,12 +171,12 @@ def plot_test_policy_distribution(filtered_data):
             margin=dict(t=30, b=0, l=0, r=0)
         )
 
-        st.plotly_chart(fig, use_container_width=True)
+        plotly_chart(fig, use_container_width=True)
 
     else:
         st.info("Insufficient data for Test Score Policy distribution plot.")
 
-@st.cache_data(ttl=300)
+@cached("chart", ttl=300)
 def plot_admission_trend(uni_data, hist_data, unitid):
     """
     Create a line chart showing historical admission rate trend for a university.
@@ -219,9 +227,9 @@ def plot_admission_trend(uni_data, hist_data, unitid):
                     )
                 )
 
-                st.plotly_chart(fig, use_container_width=True)
+                plotly_chart(fig, use_container_width=True)
 
-@st.cache_data(ttl=300)
+@cached("chart", ttl=300)
 def plot_test_scores_trend(uni_data, hist_data, unitid):
     """
     Create a line chart showing historical SAT/ACT score trends for a university.
@@ -331,14 +339,15 @@ def plot_test_scores_trend(uni_data, hist_data, unitid):
                 hovermode="x unified"
             )
 
-            st.plotly_chart(fig, use_container_width=True)
+            plotly_chart(fig, use_container_width=True)
         else:
             st.info("Historical test score data not available for this university.")
 
-@st.cache_data(ttl=300)
-def plot_enrollment_trend(selected_df, historical_data):
+@cached("chart", ttl=300)
+def plot_enrollment_trend(enrollment, names):
     """
     Create a line chart showing historical undergraduate enrollment trends for selected universities.
+    enrollment is a years x UNITID frame, as in ComparisonPanel.trends.
     """
     st.markdown("### Enrollment Trends",
               help="This chart shows the trend in undergraduate enrollment over time. The dotted lines represent 3-year rolling averages to smooth out year-to-year fluctuations. Only institutions that report enrollment data are shown.")
@@ -346,7 +355,7 @@ def plot_enrollment_trend(selected_df, historical_data):
     # Add note about data availability
     st.caption("Note: Historical enrollment data may not be available for all institutions. Missing years in the trend may indicate unreported data.")
 
-    if 'UNITID' not in selected_df.columns or selected_df.empty or historical_data.empty:
+    if enrollment.empty:
         st.info("Insufficient data for enrollment trend visualization.")
         return
 
@@ -357,43 +366,36 @@ def plot_enrollment_trend(selected_df, historical_data):
     has_data = False
 
     # Add data for each university
-    for _, uni in selected_df.iterrows():
-        uni_id = uni['UNITID']
-        uni_name = uni['INSTNM']
-
-        # Get historical data for this university
-        uni_history = historical_data[historical_data['UNITID'] == uni_id].copy()
-
-        if not uni_history.empty and 'UGDS' in uni_history.columns:
-            # Get the data sorted by year
-            enrollment_trend = uni_history[['YEAR', 'UGDS']].dropna().sort_values('YEAR')
-
-            if not enrollment_trend.empty and len(enrollment_trend) > 1:
-                has_data = True
-
-                # Add a line for this university
+    for uni_id in enrollment.columns:
+        uni_name = names[uni_id]
+        enrollment_trend = enrollment[uni_id].dropna()
+
+        if len(enrollment_trend) > 1:
+            has_data = True
+
+            # Add a line for this university
+            fig.add_trace(go.Scatter(
+                x=enrollment_trend.index,
+                y=enrollment_trend.to_numpy(),
+                mode='lines+markers',
+                name=uni_name,
+                line=dict(width=2),
+                hovertemplate='%{y:,.0f} students'
+            ))
+
+            # Add rolling average if we have enough data points
+            if len(enrollment_trend) > 2:
+                rolling_avg = enrollment_trend.rolling(window=3, min_periods=1).mean()
                 fig.add_trace(go.Scatter(
-                    x=enrollment_trend['YEAR'],
-                    y=enrollment_trend['UGDS'],
-                    mode='lines+markers',
-                    name=uni_name,
-                    line=dict(width=2),
-                    hovertemplate='%{y:,.0f} students'
+                    x=rolling_avg.index,
+                    y=rolling_avg.to_numpy(),
+                    mode='lines',
+                    name=f"{uni_name} (3-Year Avg)",
+                    line=dict(dash='dot', width=1.5),
+                    showlegend=False,
+                    hovertemplate='%{y:,.0f} students (3-year avg)'
                 ))
 
-                # Add rolling average if we have enough data points
-                if len(enrollment_trend) > 2:
-                    enrollment_trend['Rolling_Avg'] = enrollment_trend['UGDS'].rolling(window=min(3, len(enrollment_trend)), min_periods=1).mean()
-                    fig.add_trace(go.Scatter(
-                        x=enrollment_trend['YEAR'],
-                        y=enrollment_trend['Rolling_Avg'],
-                        mode='lines',
-                        name=f"{uni_name} (3-Year Avg)",
-                        line=dict(dash='dot', width=1.5),
-                        showlegend=False,
-                        hovertemplate='%{y:,.0f} students (3-year avg)'
-                    ))
-
     if has_data:
         # Improve layout
         fig.update_layout(
@@ -412,11 +414,11 @@ def plot_enrollment_trend(selected_df, historical_data):
             height=500
         )
 
-        st.plotly_chart(fig, use_container_width=True)
+        plotly_chart(fig, use_container_width=True)
     else:
         st.info("Historical enrollment data not available for the selected universities.")
 
-@st.cache_data(ttl=300)
+@cached("chart", ttl=300)
 def plot_admission_rate_card(uni_data, key_prefix=""):
     """
     Display an admission rate card with visual indicator.
@@ -462,7 +464,7 @@ def plot_admission_rate_card(uni_data, key_prefix=""):
         </div>
         """, unsafe_allow_html=True)
 
-@st.cache_data(ttl=300)
+@cached("chart", ttl=300)
 def plot_test_policy_card(uni_data, key_prefix=""):
     """
     Display a test score policy card.
@@ -501,7 +503,7 @@ def plot_test_policy_card(uni_data, key_prefix=""):
         </div>
         """, unsafe_allow_html=True)
 
-@st.cache_data(ttl=300)
+@cached("chart", ttl=300)
 def plot_sat_score_card(uni_data, key_prefix=""):
     """
     Display a SAT score card with visual indicator.
@@ -546,7 +548,7 @@ def plot_sat_score_card(uni_data, key_prefix=""):
         </div>
         """, unsafe_allow_html=True)
 
-@st.cache_data(ttl=300)
+@cached("chart", ttl=300)
 def plot_act_score_card(uni_data, key_prefix=""):
     """
     Display an ACT score card with visual indicator.
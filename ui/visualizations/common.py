@@ -0,0 +1,39 @@
+"""
+Shared chart helpers for the Pathfinder visualizations.
+"""
+
+import numpy as np
+import plotly.graph_objects as go
+from config import SCATTER_WEBGL_THRESHOLD, SCATTER_DENSITY_THRESHOLD, SCATTER_DENSITY_BINS
+from core.binning import compute_histogram_2d
+
+def scatter_render_mode(n_points):
+    """
+    Choose how to draw a scatter plot of n_points: 'svg', 'webgl' or 'density'.
+    """
+    if n_points > SCATTER_DENSITY_THRESHOLD:
+        return 'density'
+    if n_points > SCATTER_WEBGL_THRESHOLD:
+        return 'webgl'
+    return 'svg'
+
+def density_heatmap(x, y, bins=SCATTER_DENSITY_BINS):
+    """
+    Create a 2D density heatmap from bin counts computed on the server.
+    """
+    x_edges, y_edges, counts = compute_histogram_2d(x, y, bins)
+
+    # Leave empty cells transparent
+    z = counts.T.astype(float)
+    z[z == 0] = np.nan
+
+    fig = go.Figure(go.Heatmap(
+        x=(x_edges[:-1] + x_edges[1:]) / 2,
+        y=(y_edges[:-1] + y_edges[1:]) / 2,
+        z=z,
+        colorscale=['#B0E0E6', '#87CEEB', '#4682B4', '#0047AB'],  # Monochromatic blue
+        colorbar=dict(title="Institutions"),
+        hovertemplate='%{z:.0f} institutions<extra></extra>'
+    ))
+
+    return fig
@@ -5,8 +5,14 @@ Cost visualizations for the Pathfinder application.
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-
-@st.cache_data(ttl=300)
+import plotly.graph_objects as go
+from config import NET_PRICE_BRACKETS
+from core.aggregations import top_groups
+from core.binning import compute_box_stats
+from ui.visualizations.common import scatter_render_mode, density_heatmap
+from perf import cached, plotly_chart
+
+@cached("chart", ttl=300)
 def plot_tuition_distribution(filtered_data):
     """
     Create a box plot of tuition distribution by control type.
@@ -14,72 +20,58 @@ def plot_tuition_distribution(filtered_data):
     """
     st.markdown("#### Tuition Fee Distribution by Control Type", help="Distribution of annual tuition fees across different types of institutions.")
 
-    # Make a copy to avoid modifying the original dataframe
-    plot_data = filtered_data.copy()
-
     # Only require CONTROL_TYPE and at least one of the tuition columns
-    has_in_state = 'TUITIONFEE_IN' in plot_data.columns
-    has_out_state = 'TUITIONFEE_OUT' in plot_data.columns
-
-    if 'CONTROL_TYPE' in plot_data.columns and (has_in_state or has_out_state):
-        # Prepare columns for melting
-        id_vars = ['INSTNM', 'CONTROL_TYPE']
-        value_vars = []
-
-        if has_in_state:
-            value_vars.append('TUITIONFEE_IN')
-
-        if has_out_state:
-            value_vars.append('TUITIONFEE_OUT')
-
-        # Melt the data
-        plot_data_melt = plot_data.melt(
-            id_vars=id_vars,
-            value_vars=value_vars,
-            var_name='Tuition Type',
-            value_name='Tuition Fee'
-        )
-
-        # Map column names to readable labels
-        plot_data_melt['Tuition Type'] = plot_data_melt['Tuition Type'].map({
-            'TUITIONFEE_IN': 'In-State',
-            'TUITIONFEE_OUT': 'Out-of-State'
-        })
-
-        # Drop rows with missing tuition values
-        plot_data_melt = plot_data_melt.dropna(subset=['Tuition Fee'])
-
-        if not plot_data_melt.empty:
-            # Create an enhanced box plot with points
-            fig = px.box(
-                plot_data_melt,
-                x='CONTROL_TYPE',
-                y='Tuition Fee',
-                color='Tuition Type',
-                hover_name='INSTNM',
-                title="Distribution of Annual Tuition Fees",
-                labels={
-                    'CONTROL_TYPE': 'Control Type',
-                    'Tuition Fee': 'Annual Tuition Fee ($)',
-                    'Tuition Type': 'Tuition Type'
-                },
-                points="all",  # Show all data points
-                height=600     # Increase height for better visibility
-            )
-
+    tuition_types = {
+        'TUITIONFEE_IN': 'In-State',
+        'TUITIONFEE_OUT': 'Out-of-State'
+    }
+    value_vars = [col for col in tuition_types if col in filtered_data.columns]
+
+    if 'CONTROL_TYPE' in filtered_data.columns and value_vars:
+        # Compute box statistics per control type on the server, one trace per tuition type
+        fig = go.Figure()
+        for col in value_vars:
+            control_types = []
+            box_stats = []
+            for control_type, group in filtered_data.groupby('CONTROL_TYPE'):
+                stats = compute_box_stats(group[col].to_numpy())
+                if stats is not None:
+                    control_types.append(control_type)
+                    box_stats.append(stats)
+
+            if not box_stats:
+                continue
+
+            fig.add_trace(go.Box(
+                x=control_types,
+                q1=[stats['q1'] for stats in box_stats],
+                median=[stats['median'] for stats in box_stats],
+                q3=[stats['q3'] for stats in box_stats],
+                lowerfence=[stats['lowerfence'] for stats in box_stats],
+                upperfence=[stats['upperfence'] for stats in box_stats],
+                mean=[stats['mean'] for stats in box_stats],
+                hovertext=[f"{stats['count']} institutions" for stats in box_stats],
+                name=tuition_types[col]
+            ))
+
+        if fig.data:
             fig.update_layout(
+                title="Distribution of Annual Tuition Fees",
                 xaxis_title="Control Type",
                 yaxis_title="Annual Tuition Fee ($)",
-                yaxis_tickformat="$,.0f"
+                yaxis_tickformat="$,.0f",
+                legend_title="Tuition Type",
+                boxmode='group',
+                height=600     # Increase height for better visibility
             )
 
-            st.plotly_chart(fig, use_container_width=True)
+            plotly_chart(fig, use_container_width=True)
         else:
             st.info("Insufficient data for Tuition Fee distribution plot.")
     else:
         st.info("Tuition data not available in the dataset.")
 
-@st.cache_data(ttl=300)
+@cached("chart", ttl=300)
 def plot_tuition_vs_size(filtered_data):
     """
     Create a scatter plot of tuition vs. institution size.
@@ -88,32 +80,41 @@ def plot_tuition_vs_size(filtered_data):
     plot_data = filtered_data.dropna(subset=['TUITIONFEE_IN', 'UGDS'])
     
     if not plot_data.empty:
-        fig = px.scatter(
-            plot_data,
-            x='UGDS',
-            y='TUITIONFEE_IN',
-            color='CONTROL_TYPE',
-            hover_name='INSTNM',
-            title="Tuition vs. Institution Size",
-            labels={
-                'UGDS': 'Undergraduate Enrollment',
-                'TUITIONFEE_IN': 'In-State Tuition ($)',
-                'CONTROL_TYPE': 'Institution Type'
-            }
-        )
-        
+        render_mode = scatter_render_mode(len(plot_data))
+
+        if render_mode == 'density':
+            # Too many points to draw individually, show a server-computed density instead
+            st.caption(f"Showing the density of {len(plot_data):,} institutions. Narrow your filters to see individual universities.")
+            fig = density_heatmap(plot_data['UGDS'], plot_data['TUITIONFEE_IN'])
+            fig.update_layout(title="Tuition vs. Institution Size")
+        else:
+            fig = px.scatter(
+                plot_data,
+                x='UGDS',
+                y='TUITIONFEE_IN',
+                color='CONTROL_TYPE',
+                hover_name='INSTNM',
+                title="Tuition vs. Institution Size",
+                labels={
+                    'UGDS': 'Undergraduate Enrollment',
+                    'TUITIONFEE_IN': 'In-State Tuition ($)',
+                    'CONTROL_TYPE': 'Institution Type'
+                },
+                render_mode=render_mode
+            )
+
         fig.update_layout(
             xaxis_title="Undergraduate Enrollment",
             yaxis_title="In-State Tuition ($)",
             yaxis_tickformat="$,.0f"
         )
-        
-        st.plotly_chart(fig, use_container_width=True)
+
+        plotly_chart(fig, use_container_width=True)
 
     else:
         st.info("Insufficient data for Tuition vs. Size plot.")
 
-@st.cache_data(ttl=300)
+@cached("chart", ttl=300)
 def plot_state_tuition_comparison(filtered_data):
     """
     Create a bar chart of average tuition by state.
@@ -122,8 +123,7 @@ def plot_state_tuition_comparison(filtered_data):
     plot_data = filtered_data.dropna(subset=['TUITIONFEE_IN', 'STABBR'])
     
     if not plot_data.empty and len(plot_data['STABBR'].unique()) > 1:
-        state_avg = plot_data.groupby('STABBR')['TUITIONFEE_IN'].mean().reset_index()
-        state_avg = state_avg.sort_values('TUITIONFEE_IN', ascending=False).head(10)
+        state_avg = top_groups(plot_data, 'STABBR', 'TUITIONFEE_IN', n=10)
         
         fig = px.bar(
             state_avg,
@@ -142,138 +142,98 @@ def plot_state_tuition_comparison(filtered_data):
             coloraxis_showscale=False
         )
         
-        st.plotly_chart(fig, use_container_width=True)
+        plotly_chart(fig, use_container_width=True)
         
     else:
         st.info("Insufficient data for State Tuition comparison plot.")
 
-@st.cache_data(ttl=300)
+@cached("chart", ttl=300)
 def plot_net_price(uni_data):
     """
     Create visualizations for net price data by income bracket.
     """
-    # Determine if the institution is public or private
-    is_public = uni_data['CONTROL'] == 1 if 'CONTROL' in uni_data else False
-    is_private = uni_data['CONTROL'] in [2, 3] if 'CONTROL' in uni_data else False
-
-    # Get the appropriate net price column based on institution type
-    net_price_col = 'NPT4_PUB' if is_public else 'NPT4_PRIV' if is_private else None
+    # Effective net prices are precomputed at load time from the public or private
+    # columns, depending on the institution type
+    net_price_col = 'NPT4_EFF'
 
     # Check if we have overall net price data
     has_net_price = net_price_col in uni_data.index and pd.notna(uni_data[net_price_col])
 
-    # Define income brackets and their corresponding column prefixes
-    income_brackets = [
-        ('$0-$30,000', 'NPT41'),
-        ('$30,001-$48,000', 'NPT42'),
-        ('$48,001-$75,000', 'NPT43'),
-        ('$75,001-$110,000', 'NPT44'),
-        ('$110,001+', 'NPT45')
-    ]
-
-    # Get the appropriate suffix based on institution type
-    suffix = '_PUB' if is_public else '_PRIV' if is_private else None
-
-    if suffix:
-        # Check if we have income bracket data
-        bracket_cols = [f"{prefix}{suffix}" for _, prefix in income_brackets]
-        has_bracket_data = any(col in uni_data.index and pd.notna(uni_data[col]) for col in bracket_cols)
-
-        if has_bracket_data:
-            st.subheader("Net Price by Income")
-
-            # Create data for the chart
-            data = []
-            for bracket, prefix in income_brackets:
-                col = f"{prefix}{suffix}"
-                if col in uni_data.index and pd.notna(uni_data[col]):
-                    data.append({
-                        'Income Bracket': bracket,
-                        'Net Price': uni_data[col]
-                    })
+    # Income brackets and their corresponding effective net price columns
+    income_brackets = [(bracket, f"{prefix}_EFF") for bracket, prefix in NET_PRICE_BRACKETS.items()]
 
-            if data:
-                # Create DataFrame
-                df = pd.DataFrame(data)
-
-                # Create the bar chart
-                fig = px.bar(
-                    df,
-                    x='Income Bracket',
-                    y='Net Price',
-                    title=f"Average Net Price by Family Income",
-                    labels={
-                        'Income Bracket': 'Family Income',
-                        'Net Price': 'Average Net Price ($)'
-                    },
-                    color='Net Price',
-                    color_continuous_scale='Viridis'
-                )
+    # Check if we have income bracket data
+    has_bracket_data = any(col in uni_data.index and pd.notna(uni_data[col]) for _, col in income_brackets)
 
-                # Add the overall average net price as a line if available
-                if has_net_price:
-                    overall_avg = uni_data[net_price_col]
-                    fig.add_shape(
-                        type="line",
-                        x0=-0.5,
-                        y0=overall_avg,
-                        x1=len(income_brackets) - 0.5,
-                        y1=overall_avg,
-                        line=dict(
-                            color="red",
-                            width=2,
-                            dash="dash",
-                        )
-                    )
-                    fig.add_annotation(
-                        x=len(income_brackets) - 1,
-                        y=overall_avg,
-                        text=f"Overall Avg: ${overall_avg:,.0f}",
-                        showarrow=False,
-                        yshift=10,
-                        font=dict(color="red")
-                    )
+    if has_bracket_data:
+        st.subheader("Net Price by Income")
 
-                # Update layout
-                fig.update_layout(
-                    yaxis_tickformat="$,.0f",
-                    height=500,
-                    coloraxis_showscale=False
-                )
+        # Create data for the chart
+        data = []
+        for bracket, col in income_brackets:
+            if col in uni_data.index and pd.notna(uni_data[col]):
+                data.append({
+                    'Income Bracket': bracket,
+                    'Net Price': uni_data[col]
+                })
 
-                # Add value labels on top of bars
-                fig.update_traces(
-                    text=[f"${val:,.0f}" for val in df['Net Price']],
-                    textposition='outside'
-                )
+        if data:
+            # Create DataFrame
+            df = pd.DataFrame(data)
 
-                st.plotly_chart(fig, use_container_width=True)
+            # Create the bar chart
+            fig = px.bar(
+                df,
+                x='Income Bracket',
+                y='Net Price',
+                title=f"Average Net Price by Family Income",
+                labels={
+                    'Income Bracket': 'Family Income',
+                    'Net Price': 'Average Net Price ($)'
+                },
+                color='Net Price',
+                color_continuous_scale='Viridis'
+            )
 
+            # Add the overall average net price as a line if available
+            if has_net_price:
+                overall_avg = uni_data[net_price_col]
+                fig.add_shape(
+                    type="line",
+                    x0=-0.5,
+                    y0=overall_avg,
+                    x1=len(income_brackets) - 0.5,
+                    y1=overall_avg,
+                    line=dict(
+                        color="red",
+                        width=2,
+                        dash="dash",
+                    )
+                )
+                fig.add_annotation(
+                    x=len(income_brackets) - 1,
+                    y=overall_avg,
+                    text=f"Overall Avg: ${overall_avg:,.0f}",
+                    showarrow=False,
+                    yshift=10,
+                    font=dict(color="red")
+                )
 
-                # Add explanation of net price
-                st.markdown("""
-                **What is Net Price?**
+            # Update layout
+            fig.update_layout(
+                yaxis_tickformat="$,.0f",
+                height=500,
+                coloraxis_showscale=False
+            )
 
-                Net price is the amount that a student pays to attend an institution in a single academic year after subtracting scholarships and grants.
-                It includes tuition and fees, books and supplies, and living expenses like room and board, minus the average grant/scholarship aid.
+            # Add value labels on top of bars
+            fig.update_traces(
+                text=[f"${val:,.0f}" for val in df['Net Price']],
+                textposition='outside'
+            )
 
-                This is often a more accurate representation of college costs than the published tuition rates.
-                """)
-            else:
-                st.info("Detailed net price data by income bracket not available for this institution.")
-        elif has_net_price:
-            # If we only have overall net price but not by income bracket
-            st.subheader("Average Net Price")
+            plotly_chart(fig, use_container_width=True)
 
-            # Create a simple card to display the overall net price
-            overall_avg = uni_data[net_price_col]
-            st.markdown(f"""
-            <div style="border: 1px solid #e0e0e0; border-radius: 8px; padding: 20px; background-color: white; text-align: center;">
-                <h3 style="margin-top: 0; color: #333;">Average Net Price</h3>
-                <p style="font-size: 36px; font-weight: bold; margin: 15px 0; color: #333;">${overall_avg:,.0f}</p>
-                <p style="color: #666;">Average annual cost after financial aid</p>
-            </div>
-            """, unsafe_allow_html=True)
 
             # Add explanation of net price
             st.markdown("""
@@ -285,11 +245,34 @@ def plot_net_price(uni_data):
             This is often a more accurate representation of college costs than the published tuition rates.
             """)
         else:
-            st.info("Net price data not available for this institution.")
+            st.info("Detailed net price data by income bracket not available for this institution.")
+    elif has_net_price:
+        # If we only have overall net price but not by income bracket
+        st.subheader("Average Net Price")
+
+        # Create a simple card to display the overall net price
+        overall_avg = uni_data[net_price_col]
+        st.markdown(f"""
+        <div style="border: 1px solid #e0e0e0; border-radius: 8px; padding: 20px; background-color: white; text-align: center;">
+            <h3 style="margin-top: 0; color: #333;">Average Net Price</h3>
+            <p style="font-size: 36px; font-weight: bold; margin: 15px 0; color: #333;">${overall_avg:,.0f}</p>
+            <p style="color: #666;">Average annual cost after financial aid</p>
+        </div>
+        """, unsafe_allow_html=True)
+
+        # Add explanation of net price
+        st.markdown("""
+        **What is Net Price?**
+
+        Net price is the amount that a student pays to attend an institution in a single academic year after subtracting scholarships and grants.
+        It includes tuition and fees, books and supplies, and living expenses like room and board, minus the average grant/scholarship aid.
+
+        This is often a more accurate representation of college costs than the published tuition rates.
+        """)
     else:
-        st.info("Institution type information not available to determine appropriate net price data.")
+        st.info("Net price data not available for this institution.")
 
-@st.cache_data(ttl=300)
+@cached("chart", ttl=300)
 def plot_tuition_trend(uni_data, hist_data, unitid):
     """
     Create a line chart showing historical tuition trend for a university.
@@ -395,7 +378,7 @@ def plot_tuition_trend(uni_data, hist_data, unitid):
                     )
                 )
 
-                st.plotly_chart(fig, use_container_width=True)
+                plotly_chart(fig, use_container_width=True)
 
     else:
         st.info("Historical data not available.")
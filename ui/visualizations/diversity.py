@@ -7,8 +7,10 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from config import DIVERSITY_MAPPING, STAFF_DIVERSITY_MAPPING, GENDER_MAPPING
+from core.aggregations import group_means
+from perf import cached, plotly_chart
 
-@st.cache_data(ttl=300)
+@cached("chart", ttl=300)
 def plot_diversity_composition(filtered_data):
     """
     Create a bar chart showing average undergraduate diversity composition.
@@ -41,13 +43,13 @@ def plot_diversity_composition(filtered_data):
                 legend_title_text='Race/Ethnicity'
             )
             fig.update_traces(texttemplate='%{text:.1%}', textposition='inside')
-            st.plotly_chart(fig, use_container_width=True)
+            plotly_chart(fig, use_container_width=True)
         else:
             st.info("Could not calculate average diversity for current filters.")
     else:
         st.info("Diversity data columns not available in the dataset.")
 
-@st.cache_data(ttl=300)
+@cached("chart", ttl=300)
 def plot_diversity_comparison_by_control(filtered_data):
     """
     Create a grouped bar chart comparing diversity across institution types.
@@ -58,7 +60,7 @@ def plot_diversity_comparison_by_control(filtered_data):
 
     if all(col in filtered_data.columns for col in diversity_cols) and 'CONTROL_TYPE' in filtered_data.columns:
         # Group by control type and calculate average diversity
-        grouped_data = filtered_data.groupby('CONTROL_TYPE')[diversity_cols].mean().reset_index()
+        grouped_data = group_means(filtered_data, 'CONTROL_TYPE', diversity_cols)
         
         # Melt the data for plotting
         melted_data = pd.melt(
@@ -94,13 +96,13 @@ def plot_diversity_comparison_by_control(filtered_data):
                 legend_title="Race/Ethnicity"
             )
             
-            st.plotly_chart(fig, use_container_width=True)
+            plotly_chart(fig, use_container_width=True)
         else:
             st.info("Could not calculate diversity by institution type for current filters.")
     else:
         st.info("Diversity data or institution type not available in the dataset.")
 
-@st.cache_data(ttl=300)
+@cached("chart", ttl=300)
 def plot_staff_diversity_composition(filtered_data):
     """
     Create a bar chart showing average staff diversity composition.
@@ -135,7 +137,7 @@ def plot_staff_diversity_composition(filtered_data):
                     legend_title_text='Race/Ethnicity'
                 )
                 fig.update_traces(texttemplate='%{text:.1%}', textposition='inside')
-                st.plotly_chart(fig, use_container_width=True)
+                plotly_chart(fig, use_container_width=True)
             else:
                 st.info("Could not calculate average staff diversity for current filters.")
         else:
@@ -143,7 +145,7 @@ def plot_staff_diversity_composition(filtered_data):
     else:
         st.info("Staff diversity data columns not available in the dataset.")
 
-@st.cache_data(ttl=300)
+@cached("chart", ttl=300)
 def plot_gender_comparison(filtered_data):
     """
     Create a comparison of gender distribution for students and staff.
@@ -230,11 +232,11 @@ def plot_gender_comparison(filtered_data):
             legend_title="Gender"
         )
 
-        st.plotly_chart(fig, use_container_width=True)
+        plotly_chart(fig, use_container_width=True)
     else:
         st.info("Gender data not available for the selected universities.")
 
-@st.cache_data(ttl=300)
+@cached("chart", ttl=300)
 def plot_gender_ratio_by_type(filtered_data):
     """
     Create a stacked bar chart of gender ratio by institution type.
@@ -283,14 +285,14 @@ def plot_gender_ratio_by_type(filtered_data):
                 yaxis_title="Proportion"
             )
             
-            st.plotly_chart(fig, use_container_width=True)
+            plotly_chart(fig, use_container_width=True)
             
         else:
             st.info("Insufficient data for Gender Ratio by Institution Type plot.")
     else:
         st.info("Gender data not available in the dataset.")
 
-@st.cache_data(ttl=300)
+@cached("chart", ttl=300)
 def plot_staff_gender_ratio_by_type(filtered_data):
     """
     Create a stacked bar chart of staff gender ratio by institution type.
@@ -339,14 +341,14 @@ def plot_staff_gender_ratio_by_type(filtered_data):
                 yaxis_title="Proportion"
             )
             
-            st.plotly_chart(fig, use_container_width=True)
+            plotly_chart(fig, use_container_width=True)
             
         else:
             st.info("Insufficient data for Staff Gender Ratio by Institution Type plot.")
     else:
         st.info("Staff gender data not available in the dataset.")
 
-@st.cache_data(ttl=300)
+@cached("chart", ttl=300)
 def plot_diversity_pie(uni_data):
     """
     Create a pie chart showing diversity composition for a university.
@@ -412,9 +414,9 @@ def plot_diversity_pie(uni_data):
                     x=0.5
                 )
             )
-            st.plotly_chart(fig, use_container_width=True)
+            plotly_chart(fig, use_container_width=True)
 
-@st.cache_data(ttl=300)
+@cached("chart", ttl=300)
 def plot_staff_diversity_pie(uni_data):
     """
     Create a pie chart showing staff diversity composition for a university.
@@ -479,13 +481,13 @@ def plot_staff_diversity_pie(uni_data):
                     x=0.5
                 )
             )
-            st.plotly_chart(fig, use_container_width=True)
+            plotly_chart(fig, use_container_width=True)
         else:
             st.info("No staff diversity data available for this university.")
     else:
         st.info("Staff diversity data not available for this university.")
 
-@st.cache_data(ttl=300)
+@cached("chart", ttl=300)
 def plot_gender_pie(uni_data):
     """
     Create pie charts showing gender distribution for students and staff.
@@ -539,7 +541,7 @@ def plot_gender_pie(uni_data):
                         height=500,  # Increased height
                         margin=dict(t=50, b=50, l=20, r=20)  # Reduced margins
                     )
-                    st.plotly_chart(fig, use_container_width=True)
+                    plotly_chart(fig, use_container_width=True)
 
         # Staff gender pie chart
         if has_staff_gender:
@@ -567,7 +569,7 @@ def plot_gender_pie(uni_data):
                         height=500,  # Increased height
                         margin=dict(t=50, b=50, l=20, r=20)  # Reduced margins
                     )
-                    st.plotly_chart(fig, use_container_width=True)
+                    plotly_chart(fig, use_container_width=True)
     else:
         st.info("Gender distribution data not available for this university.")
 
@@ -5,8 +5,9 @@ Institution visualizations for the Pathfinder application.
 import streamlit as st
 import pandas as pd
 import plotly.express as px
+from perf import cached, plotly_chart
 
-@st.cache_data(ttl=300)
+@cached("chart", ttl=300)
 def plot_control_type_distribution(filtered_data):
     """
     Create a bar chart showing the distribution of university control types.
@@ -36,11 +37,11 @@ def plot_control_type_distribution(filtered_data):
             showlegend=False
         )
         
-        st.plotly_chart(fig, use_container_width=True)
+        plotly_chart(fig, use_container_width=True)
     else:
         st.info("Insufficient data for Control Type distribution plot.")
 
-@st.cache_data(ttl=300)
+@cached("chart", ttl=300)
 def plot_institution_size_distribution(filtered_data):
     """
     Create a bar chart showing the distribution of institution sizes by control type.
@@ -86,7 +87,7 @@ def plot_institution_size_distribution(filtered_data):
             legend_title="Size Category"
         )
         
-        st.plotly_chart(fig, use_container_width=True)
+        plotly_chart(fig, use_container_width=True)
 
     else:
         st.info("Insufficient data for Institution Size distribution plot.")
@@ -4,9 +4,15 @@ Outcomes visualizations for the Pathfinder application.
 
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
+import plotly.graph_objects as go
+from config import USE_PRECOMPUTED_BINS, FIXED_BIN_EDGES, SIMULATION_PERCENTILES, SIMULATION_PARAMS
+from core.binning import compute_histogram, counts_from_bins, fixed_bin_edges
+from ui.visualizations.common import scatter_render_mode, density_heatmap
+from perf import cached, plotly_chart
 
-@st.cache_data(ttl=300)
+@cached("chart", ttl=300)
 def plot_graduation_rate_histogram(filtered_data):
     """
     Create a histogram of 4-year graduation rates.
@@ -23,39 +29,49 @@ def plot_graduation_rate_histogram(filtered_data):
     if missing_data_pct > 10:
         st.caption(f"Note: {missing_data_pct:.0f}% of institutions in your filter are not shown due to missing graduation rate data.")
 
-    plot_data = filtered_data.dropna(subset=['C150_4'])
+    grad_rates = filtered_data['C150_4'].dropna()
+
+    if not grad_rates.empty:
+        # Bin on the server and send only edges and counts to the browser
+        bin_col = 'C150_4_BIN'
+        if USE_PRECOMPUTED_BINS and bin_col in filtered_data.columns and 'C150_4' in FIXED_BIN_EDGES:
+            start, stop, n_bins = FIXED_BIN_EDGES['C150_4']
+            edges = fixed_bin_edges(start, stop, n_bins)
+            counts = counts_from_bins(filtered_data[bin_col].to_numpy(), n_bins)
+        else:
+            edges, counts = compute_histogram(grad_rates.to_numpy())
 
-    if not plot_data.empty:
         # Convert to percentage for display
-        plot_data = plot_data.copy()
-        plot_data['C150_4_PCT'] = plot_data['C150_4'] * 100
+        edges = edges * 100
 
-        fig = px.histogram(
-            plot_data,
-            x='C150_4_PCT',
-            nbins=30,
-            title="Distribution of 4-Year Graduation Rates (Bachelor's)",
-            labels={'C150_4_PCT': '4-Year Graduation Rate (%)'},
-            color_discrete_sequence=['#4682B4']  # Steel blue for monochromatic theme
-        )
+        fig = go.Figure(go.Bar(
+            x=(edges[:-1] + edges[1:]) / 2,
+            y=counts,
+            width=np.diff(edges),
+            customdata=np.column_stack([edges[:-1], edges[1:]]),
+            marker_color='#4682B4',  # Steel blue for monochromatic theme
+            hovertemplate='%{customdata[0]:.1f}% - %{customdata[1]:.1f}%<br>%{y} universities<extra></extra>'
+        ))
 
         fig.update_layout(
+            title="Distribution of 4-Year Graduation Rates (Bachelor's)",
             xaxis_title="4-Year Graduation Rate (%)",
             yaxis_title="Number of Universities",
-            xaxis_tickformat=".0f"
+            xaxis_tickformat=".0f",
+            bargap=0
         )
 
         # Add a vertical line for the average graduation rate
-        avg_grad_rate = plot_data['C150_4_PCT'].mean()
+        avg_grad_rate = grad_rates.mean() * 100
         fig.add_vline(x=avg_grad_rate, line_dash="dash", line_color="#0047AB",  # Darker blue for the line
                      annotation_text=f"Average: {avg_grad_rate:.1f}%",
                      annotation_position="top right")
 
-        st.plotly_chart(fig, use_container_width=True)
+        plotly_chart(fig, use_container_width=True)
     else:
         st.info("Insufficient data for 4-Year Graduation Rate histogram.")
 
-@st.cache_data(ttl=300)
+@cached("chart", ttl=300)
 def plot_debt_earnings_scatter(filtered_data):
     """
     Create a scatter plot of median debt vs. median earnings.
@@ -78,32 +94,40 @@ def plot_debt_earnings_scatter(filtered_data):
     plot_data = filtered_data.dropna(subset=[debt_col, 'MD_EARN_WNE_P10'])
 
     if not plot_data.empty:
-        # Calculate debt-to-earnings ratio
-        plot_data = plot_data.copy()
-        plot_data['Debt_to_Earnings'] = plot_data[debt_col] / plot_data['MD_EARN_WNE_P10']
-
-        # Create a scatter plot with debt-to-earnings ratio as color
-        fig = px.scatter(
-            plot_data,
-            x=debt_col,
-            y='MD_EARN_WNE_P10',
-            color='Debt_to_Earnings',
-            color_continuous_scale=['#0047AB', '#4682B4', '#87CEEB', '#B0E0E6'],  # Monochromatic blue
-            hover_name='INSTNM',
-            hover_data={
-                debt_col: ':$,.0f',
-                'MD_EARN_WNE_P10': ':$,.0f',
-                'Debt_to_Earnings': ':.2f',
-                'CONTROL_TYPE': True
-            },
-            title="Potential Return on Investment",
-            labels={
-                debt_col: 'Median Student Debt',
-                'MD_EARN_WNE_P10': 'Median Earnings (10 years after entry)',
-                'Debt_to_Earnings': 'Debt-to-Earnings Ratio',
-                'CONTROL_TYPE': 'Type'
-            }
-        )
+        # Debt-to-earnings ratio is precomputed at load time
+        plot_data = plot_data.rename(columns={'DEBT_TO_EARNINGS': 'Debt_to_Earnings'})
+
+        render_mode = scatter_render_mode(len(plot_data))
+
+        if render_mode == 'density':
+            # Too many points to draw individually, show a server-computed density instead
+            st.caption(f"Showing the density of {len(plot_data):,} institutions. Narrow your filters to see individual universities.")
+            fig = density_heatmap(plot_data[debt_col], plot_data['MD_EARN_WNE_P10'])
+            fig.update_layout(title="Potential Return on Investment")
+        else:
+            # Create a scatter plot with debt-to-earnings ratio as color
+            fig = px.scatter(
+                plot_data,
+                x=debt_col,
+                y='MD_EARN_WNE_P10',
+                color='Debt_to_Earnings',
+                color_continuous_scale=['#0047AB', '#4682B4', '#87CEEB', '#B0E0E6'],  # Monochromatic blue
+                hover_name='INSTNM',
+                hover_data={
+                    debt_col: ':$,.0f',
+                    'MD_EARN_WNE_P10': ':$,.0f',
+                    'Debt_to_Earnings': ':.2f',
+                    'CONTROL_TYPE': True
+                },
+                title="Potential Return on Investment",
+                labels={
+                    debt_col: 'Median Student Debt',
+                    'MD_EARN_WNE_P10': 'Median Earnings (10 years after entry)',
+                    'Debt_to_Earnings': 'Debt-to-Earnings Ratio',
+                    'CONTROL_TYPE': 'Type'
+                },
+                render_mode=render_mode
+            )
 
         # Add a diagonal reference line for 1:1 debt-to-earnings ratio
         max_val = max(plot_data[debt_col].max(), plot_data['MD_EARN_WNE_P10'].max())
@@ -131,11 +155,11 @@ def plot_debt_earnings_scatter(filtered_data):
             height=600
         )
 
-        st.plotly_chart(fig, use_container_width=True)
+        plotly_chart(fig, use_container_width=True)
     else:
         st.info("Insufficient data for Debt vs. Earnings plot with current filters.")
 
-@st.cache_data(ttl=300)
+@cached("chart", ttl=300)
 def plot_graduation_trend(uni_data, hist_data, unitid):
     """
     Create a line chart showing historical graduation rate trend for a university.
@@ -202,9 +226,9 @@ def plot_graduation_trend(uni_data, hist_data, unitid):
                     )
                 )
 
-                st.plotly_chart(fig, use_container_width=True)
+                plotly_chart(fig, use_container_width=True)
 
-@st.cache_data(ttl=300)
+@cached("chart", ttl=300)
 def plot_detailed_debt(uni_data):
     """
     Create a comprehensive visualization of student debt data by different categories.
@@ -270,7 +294,7 @@ def plot_detailed_debt(uni_data):
             textposition='outside'
         )
 
-        st.plotly_chart(fig, use_container_width=True)
+        plotly_chart(fig, use_container_width=True)
 
         # Add context about borrowing rate if available
         if 'FTFTPCTFLOAN' in uni_data.index and pd.notna(uni_data['FTFTPCTFLOAN']):
@@ -297,7 +321,7 @@ def plot_detailed_debt(uni_data):
     else:
         st.info("Detailed debt information by category is not available for this institution.")
 
-@st.cache_data(ttl=300)
+@cached("chart", ttl=300)
 def plot_debt_comparison(uni_data, hist_data, unitid):
     """
     Create a visualization comparing debt levels across years if historical data is available.
@@ -350,7 +374,7 @@ def plot_debt_comparison(uni_data, hist_data, unitid):
                     )
                 )
 
-                st.plotly_chart(fig, use_container_width=True)
+                plotly_chart(fig, use_container_width=True)
             else:
                 st.info("Historical debt trend data not available for this institution.")
         else:
@@ -358,7 +382,7 @@ def plot_debt_comparison(uni_data, hist_data, unitid):
     else:
         st.info("Historical data not available.")
 
-@st.cache_data(ttl=300)
+@cached("chart", ttl=300)
 def plot_graduation_rate_card(uni_data, key_prefix=""):
     """
     Display a graduation rate card with visual gauge.
@@ -413,7 +437,7 @@ def plot_graduation_rate_card(uni_data, key_prefix=""):
         """, unsafe_allow_html=True)
 
 
-@st.cache_data(ttl=300)
+@cached("chart", ttl=300)
 def plot_detailed_debt_comparison(filtered_data):
     """
     Create a comprehensive visualization comparing student debt data by different categories
@@ -448,7 +472,7 @@ def plot_detailed_debt_comparison(filtered_data):
         st.info("No detailed debt data available for the filtered universities.")
         return
 
-@st.cache_data(ttl=300)
+@cached("chart", ttl=300)
 def plot_admission_debt_earnings_ratio(filtered_data):
     """
     Create a visualization showing the relationship between admission rates
@@ -469,39 +493,53 @@ def plot_admission_debt_earnings_ratio(filtered_data):
     plot_data = filtered_data.dropna(subset=['ADM_RATE', debt_col, 'MD_EARN_WNE_P10']).copy()
 
     if not plot_data.empty:
-        # Calculate debt-to-earnings ratio
-        plot_data['Debt_to_Earnings'] = plot_data[debt_col] / plot_data['MD_EARN_WNE_P10']
-
-        # Convert admission rate to percentage for display
-        plot_data['Admission_Rate_Pct'] = plot_data['ADM_RATE'] * 100
+        # Debt-to-earnings ratio and admission rate percentage are precomputed at load time
+        plot_data = plot_data.rename(columns={
+            'DEBT_TO_EARNINGS': 'Debt_to_Earnings',
+            'ADM_RATE_PCT': 'Admission_Rate_Pct'
+        })
 
         # Create a categorical variable for institution type
         plot_data['Institution_Type'] = plot_data['CONTROL_TYPE'].fillna('Unknown')
 
-        # Create the scatter plot
-        fig = px.scatter(
-            plot_data,
-            x='Admission_Rate_Pct',
-            y='Debt_to_Earnings',
-            color='Institution_Type',
-            size='UGDS',  # Size by undergraduate enrollment
-            size_max=20,
-            hover_name='INSTNM',
-            hover_data={
-                'Admission_Rate_Pct': ':.1f',
-                'Debt_to_Earnings': ':.2f',
-                debt_col: ':$,.0f',
-                'MD_EARN_WNE_P10': ':$,.0f',
-                'UGDS': ':,.0f',
-                'Institution_Type': True
-            },
-            labels={
-                'Admission_Rate_Pct': 'Admission Rate (%)',
-                'Debt_to_Earnings': 'Debt-to-Earnings Ratio',
-                'Institution_Type': 'Institution Type',
-                'UGDS': 'Undergraduate Enrollment'
-            }
-        )
+        render_mode = scatter_render_mode(len(plot_data))
+
+        if render_mode == 'density':
+            # Too many points to draw individually, show a server-computed density instead
+            st.caption(f"Showing the density of {len(plot_data):,} institutions. Narrow your filters to see individual universities.")
+            fig = density_heatmap(plot_data['Admission_Rate_Pct'], plot_data['Debt_to_Earnings'])
+            x_axis_title = "Admission Rate (%)"
+        else:
+            # Size markers by enrollment, using the median for institutions that do not report it
+            plot_data['Marker_Size'] = plot_data['UGDS'].fillna(plot_data['UGDS'].median()).fillna(1)
+
+            # Create the scatter plot
+            fig = px.scatter(
+                plot_data,
+                x='Admission_Rate_Pct',
+                y='Debt_to_Earnings',
+                color='Institution_Type',
+                size='Marker_Size',  # Size by undergraduate enrollment
+                size_max=20,
+                hover_name='INSTNM',
+                hover_data={
+                    'Admission_Rate_Pct': ':.1f',
+                    'Debt_to_Earnings': ':.2f',
+                    debt_col: ':$,.0f',
+                    'MD_EARN_WNE_P10': ':$,.0f',
+                    'UGDS': ':,.0f',
+                    'Institution_Type': True,
+                    'Marker_Size': False
+                },
+                labels={
+                    'Admission_Rate_Pct': 'Admission Rate (%)',
+                    'Debt_to_Earnings': 'Debt-to-Earnings Ratio',
+                    'Institution_Type': 'Institution Type',
+                    'UGDS': 'Undergraduate Enrollment'
+                },
+                render_mode=render_mode
+            )
+            x_axis_title = "Admission Rate (%). Size of points represents undergraduate enrollment."
 
         # Add a reference line for 1:1 debt-to-earnings ratio
         fig.add_shape(
@@ -514,7 +552,7 @@ def plot_admission_debt_earnings_ratio(filtered_data):
         # Update layout
         fig.update_layout(
             title="Relationship Between Selectivity and Financial Outcomes",
-            xaxis_title="Admission Rate (%). Size of points represents undergraduate enrollment.",
+            xaxis_title=x_axis_title,
             yaxis_title="Debt-to-Earnings Ratio",
             height=600,
             legend=dict(
@@ -539,7 +577,47 @@ def plot_admission_debt_earnings_ratio(filtered_data):
         )
 
         # Display the plot
-        st.plotly_chart(fig, use_container_width=True)
+        plotly_chart(fig, use_container_width=True)
     else:
         st.info("Insufficient data for Admission Rate vs. Debt-to-Earnings plot with current filters.")
 
+@cached("chart", ttl=300)
+def plot_roi_simulation(simulation, names):
+    """
+    Draws simulated net return and years-to-repay bands, one row per university.
+    """
+    from plotly.subplots import make_subplots
+
+    low, mid, high = SIMULATION_PERCENTILES[0], SIMULATION_PERCENTILES[len(SIMULATION_PERCENTILES) // 2], SIMULATION_PERCENTILES[-1]
+    max_years = SIMULATION_PARAMS['max_repay_years']
+    rows = np.arange(len(simulation))
+    labels = [names.get(unitid, str(unitid)) for unitid in simulation.index]
+
+    fig = make_subplots(rows=1, cols=2, shared_yaxes=True, horizontal_spacing=0.04,
+                        subplot_titles=[f"Net Return (P{low}–P{high})", f"Years to Repay Debt (P{low}–P{high})"])
+
+    # Each panel is one trace: the median as a marker, the band as asymmetric error bars
+    for col, prefix, cap, hover in [
+        (1, 'Net', None, "%{customdata}<br>Median: $%{x:,.0f}<extra></extra>"),
+        (2, 'Repay', max_years, "%{customdata}<br>Median: %{x:.1f} years<extra></extra>")
+    ]:
+        band = simulation[[f"{prefix}_P{low}", f"{prefix}_P{mid}", f"{prefix}_P{high}"]].to_numpy()
+        if cap is not None:
+            # Repayments longer than the cap are drawn at the cap
+            band = np.minimum(band, cap)
+        fig.add_trace(go.Scatter(
+            x=band[:, 1],
+            y=rows,
+            customdata=labels,
+            mode='markers',
+            marker=dict(size=9, color='#1f77b4'),
+            error_x=dict(type='data', symmetric=False, array=band[:, 2] - band[:, 1], arrayminus=band[:, 1] - band[:, 0]),
+            showlegend=False,
+            hovertemplate=hover
+        ), row=1, col=col)
+
+    fig.update_xaxes(title_text="Net return ($)", row=1, col=1)
+    fig.update_xaxes(title_text="Years", range=[0, max_years * 1.05], row=1, col=2)
+    fig.update_yaxes(tickvals=rows, ticktext=labels, autorange="reversed", row=1, col=1)
+    fig.update_layout(height=140 + 30 * len(simulation), margin=dict(l=10, r=10, t=50, b=10))
+    plotly_chart(fig, use_container_width=True)
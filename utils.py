@@ -6,23 +6,42 @@ import streamlit as st
 import pandas as pd
 import io
 import base64
+import importlib.util
+import re
+import uuid
 from datetime import datetime
+from functools import partial, lru_cache
+from config import EXPORT_FORMATS, SHORTLIST_TOKEN_PARAM, ROI_DEFAULT_ASSUMPTIONS
+from core.export import export_bytes, export_filename
+from core.idset import IdSet
+from shortlist_store import get_store
 
-# Try to import kaleido, but don't fail if it's not available
-try:
-    import kaleido
-    KALEIDO_AVAILABLE = True
-except ImportError:
-    KALEIDO_AVAILABLE = False
+# Session state keys of the id sets saved by the shortlist store
+PERSISTED_ID_SETS = ('shortlisted_universities', 'selected_universities')
 
-def get_download_link(df, filename, link_text):
+@lru_cache(maxsize=1)
+def kaleido_available():
     """
-    Generates a link to download the provided dataframe as a CSV file.
+    Whether kaleido is installed, checked without importing it.
     """
-    csv = df.to_csv(index=False)
-    b64 = base64.b64encode(csv.encode()).decode()
-    href = f'<a href="data:file/csv;base64,{b64}" download="{filename}">{link_text}</a>'
-    return href
+    return importlib.util.find_spec("kaleido") is not None
+
+def display_export_button(df, file_stem, label, key):
+    """
+    Displays a download menu for the dataframe with one button per export format.
+    Files are only generated when a download button is clicked.
+    """
+    with st.popover(label, use_container_width=True):
+        for export_format, (_, mime) in EXPORT_FORMATS.items():
+            st.download_button(
+                export_format,
+                data=partial(export_bytes, df, export_format),
+                file_name=export_filename(file_stem, export_format),
+                mime=mime,
+                key=f"{key}_{export_format.lower()}",
+                on_click="ignore",
+                use_container_width=True
+            )
 
 def get_figure_download_link(fig, filename, link_text):
     """
@@ -31,7 +50,7 @@ def get_figure_download_link(fig, filename, link_text):
     **At the end, I did not use this method because I had problems with Kaleido I could not resolve. 
     Maybe in the future :)**
     """
-    if not KALEIDO_AVAILABLE:
+    if not kaleido_available():
         # Silently return a styled link without warning
         return f'<span style="color: #ff9800; cursor: not-allowed;" title="Image download requires kaleido package">{link_text}</span>'
 
@@ -50,11 +69,12 @@ def initialize_session_state():
     """
     Initialize session state variables if they don't exist.
     """
-    if 'selected_universities' not in st.session_state:
-        st.session_state.selected_universities = []
-
-    if 'shortlisted_universities' not in st.session_state:
-        st.session_state.shortlisted_universities = []
+    # Shortlist and comparison selection are ordered id sets; lists set by older
+    # code or tests are converted
+    for key in PERSISTED_ID_SETS:
+        if not isinstance(st.session_state.get(key), IdSet):
+            st.session_state[key] = IdSet(st.session_state.get(key) or ())
+    attach_shortlist_store()
 
     if 'active_tab' not in st.session_state:
         st.session_state.active_tab = "Explore"
@@ -74,9 +94,9 @@ def initialize_session_state():
     if 'coming_from_find_my_fit' not in st.session_state:
         st.session_state.coming_from_find_my_fit = False
 
-    # Store search results from Find My Fit
-    if 'find_my_fit_results' not in st.session_state:
-        st.session_state.find_my_fit_results = None
+    # Store search results from Find My Fit as UNITIDs and scores (see compact_matches)
+    if 'find_my_fit_matches' not in st.session_state:
+        st.session_state.find_my_fit_matches = None
 
     # Flag to indicate if we have search results to display
     if 'has_find_my_fit_results' not in st.session_state:
@@ -86,28 +106,114 @@ def initialize_session_state():
     if 'find_my_fit_view_mode' not in st.session_state:
         st.session_state.find_my_fit_view_mode = "Card View"
 
+    # ROI assumptions shared by Explore, Find My Fit and Details, edited in the sidebar
+    if 'roi_assumptions' not in st.session_state:
+        st.session_state.roi_assumptions = dict(ROI_DEFAULT_ASSUMPTIONS)
+
+def attach_shortlist_store():
+    """
+    Restores this browser's shortlist and comparison selection when a session starts
+    and saves them whenever they change. Does nothing unless persistence is on.
+    """
+    store = get_store()
+    if store is None:
+        return
+
+    restored = set()
+    if 'shortlist_token' not in st.session_state:
+        # Anonymous token kept in the URL, so a refresh finds the same lists
+        token = st.query_params.get(SHORTLIST_TOKEN_PARAM)
+        if not token or not re.fullmatch(r"[0-9a-f]{32}", token):
+            token = uuid.uuid4().hex
+            st.query_params[SHORTLIST_TOKEN_PARAM] = token
+        st.session_state.shortlist_token = token
+
+        saved = store.load(token)
+        for key in PERSISTED_ID_SETS:
+            if key in saved:
+                st.session_state[key] = IdSet(saved[key])
+            restored.add(key)
+
+    # Sets replaced since the last run are saved now; changes are saved as they happen
+    token = st.session_state.shortlist_token
+    for key in PERSISTED_ID_SETS:
+        ids = st.session_state[key]
+        if ids.on_change is None:
+            ids.on_change = partial(store.save, token, key)
+            if key not in restored:
+                store.save(token, key, ids)
+
 def add_to_shortlist(unitid):
     """
     Add a university to the shortlist.
     """
-    if unitid not in st.session_state.shortlisted_universities:
-        st.session_state.shortlisted_universities.append(unitid)
+    st.session_state.shortlisted_universities.add(unitid)
 
 def remove_from_shortlist(unitid):
     """
     Remove a university from the shortlist.
     """
-    if unitid in st.session_state.shortlisted_universities:
-        st.session_state.shortlisted_universities.remove(unitid)
+    st.session_state.shortlisted_universities.discard(unitid)
+
+def add_to_shortlist_with_toast(unitid, uni_name):
+    """
+    Add a university to the shortlist and comparison, with a toast notification.
+    Meant to be used as a button callback.
+    """
+    add_to_shortlist(unitid)
+    # Also add to selected universities for comparison
+    st.session_state.selected_universities.add(unitid)
+    queue_toast(f"Added {uni_name} to your shortlist", icon="✅")
+
+def remove_from_shortlist_with_toast(unitid, uni_name):
+    """
+    Remove a university from the shortlist and comparison, with a toast notification.
+    Meant to be used as a button callback.
+    """
+    remove_from_shortlist(unitid)
+    # Also remove from selected universities
+    st.session_state.selected_universities.discard(unitid)
+    queue_toast(f"Removed {uni_name} from your shortlist", icon="🗑️")
+
+def queue_toast(message, icon=None):
+    """
+    Queue a toast to show on the next run.
+
+    Callbacks run before a fragment rerun and should not display elements themselves.
+    """
+    st.session_state.setdefault('pending_toasts', []).append((message, icon))
+
+def show_pending_toasts():
+    """
+    Show and clear any toasts queued by callbacks.
+    """
+    for message, icon in st.session_state.pop('pending_toasts', []):
+        st.toast(message, icon=icon)
 
 def toggle_university_selection(unitid):
     """
     Toggle a university's selection status for comparison.
     """
-    if unitid in st.session_state.selected_universities:
-        st.session_state.selected_universities.remove(unitid)
-    else:
-        st.session_state.selected_universities.append(unitid)
+    st.session_state.selected_universities.toggle(unitid)
+
+def lazy_tabs(labels, key):
+    """
+    Display a tab bar that only runs the body of the tab being viewed.
+
+    st.tabs executes every tab body on each rerun, even hidden ones. This returns the
+    label of the selected tab instead, so callers can render just that tab. The choice
+    is remembered in session state under the given key.
+    """
+    if st.session_state.get(key) not in labels:
+        st.session_state[key] = labels[0]
+
+    return st.radio(
+        "Section",
+        labels,
+        key=key,
+        horizontal=True,
+        label_visibility="collapsed"
+    )
 
 def set_active_tab(tab_name):
     """
@@ -135,11 +241,11 @@ def set_selected_university(unitid):
 
 def clear_shortlist():
     """Clear the shortlist of universities."""
-    st.session_state.shortlisted_universities = []
+    st.session_state.shortlisted_universities.clear()
 
 def clear_comparison():
     """Clear the comparison list of universities."""
-    st.session_state.selected_universities = []
+    st.session_state.selected_universities.clear()
 
 def generate_timestamp():
     """